@@ -160,4 +160,46 @@ describe("ChatInterface", () => {
       expect(screen.getByText(/let's file an incident/i)).toBeInTheDocument();
     });
   });
+
+  it("sends the flow token from the last reply with the next message", async () => {
+    mockSendChatMessage
+      .mockResolvedValueOnce({
+        session_id: "test-session",
+        reply: "What's the title of the incident?",
+        flow_token: "token-1",
+      })
+      .mockResolvedValueOnce({
+        session_id: "test-session",
+        reply: "Which category?",
+        flow_token: null,
+      });
+
+    render(<ChatInterface role="resident" />);
+    const input = screen.getByPlaceholderText(/type your message/i);
+    const sendButton = screen.getByRole("button", { name: /send/i });
+
+    await userEvent.type(input, "Report a pothole");
+    fireEvent.click(sendButton);
+    await screen.findByText(/title of the incident/i);
+
+    await userEvent.type(input, "Pothole on Main Street");
+    fireEvent.click(sendButton);
+    await screen.findByText(/which category/i);
+
+    expect(mockSendChatMessage).toHaveBeenNthCalledWith(
+      1,
+      "Report a pothole",
+      "resident",
+      expect.any(String),
+      null
+    );
+    expect(mockSendChatMessage).toHaveBeenNthCalledWith(
+      2,
+      "Pothole on Main Street",
+      "resident",
+      expect.any(String),
+      "token-1"
+    );
+    expect(localStorage.getItem("civic_flow_token")).toBeNull();
+  });
 });
@@ -44,6 +44,10 @@ export default function ChatInterface({
   const [sessionId, setSessionId] = useState<string>(() => {
     return localStorage.getItem("civic_session_id") || crypto.randomUUID();
   });
+  // Echoed back so a pending flow survives a restarted or stateless backend
+  const [flowToken, setFlowToken] = useState<string | null>(() => {
+    return localStorage.getItem("civic_flow_token");
+  });
   const [incidentStep, setIncidentStep] = useState<IncidentStep>("idle");
   const [incidentData, setIncidentData] =
     useState<IncidentFormData>(initialIncident);
@@ -71,7 +75,12 @@ export default function ChatInterface({
   useEffect(() => {
     localStorage.setItem("civic_session_id", sessionId);
     localStorage.setItem("civic_messages", JSON.stringify(messages));
-  }, [sessionId, messages]);
+    if (flowToken) {
+      localStorage.setItem("civic_flow_token", flowToken);
+    } else {
+      localStorage.removeItem("civic_flow_token");
+    }
+  }, [sessionId, messages, flowToken]);
 
   const addMessage = (
     role: "user" | "bot" | "system",
@@ -217,8 +226,10 @@ export default function ChatInterface({
       const response: ChatResponse = await sendChatMessage(
         userText,
         role,
-        sessionId
+        sessionId,
+        flowToken
       );
+      setFlowToken(response.flow_token ?? null);
       addMessage("bot", response.reply);
 
       if (response.citations?.length) {
@@ -237,9 +248,11 @@ export default function ChatInterface({
     setMessages([]);
     setIncidentStep("idle");
     setIncidentData(initialIncident);
+    setFlowToken(null);
     const newSession = crypto.randomUUID();
     setSessionId(newSession);
     localStorage.removeItem("civic_messages");
+    localStorage.removeItem("civic_flow_token");
     localStorage.setItem("civic_session_id", newSession);
     addMessage("bot", "👋 New chat started. How can I help you?");
   };
@@ -56,6 +56,8 @@ export interface ChatResponse {
   citations?: Citation[];
   confidence?: number;
   session_id: string;
+  /** Set while a multi-turn flow is pending; send it back with the next message */
+  flow_token?: string | null;
 }
 
 /** Local chat UI message (frontend only) */
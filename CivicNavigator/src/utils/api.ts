@@ -83,12 +83,14 @@ async function patchJSON<T>(
 export async function sendChatMessage(
   message: string,
   role: string,
-  session_id?: string
+  session_id?: string,
+  flow_token?: string | null
 ): Promise<ChatResponse> {
   return postJSON<ChatResponse>("/api/chat/message", {
     message,
     role,
     session_id: session_id || crypto.randomUUID(),
+    ...(flow_token ? { flow_token } : {}),
   });
 }
 
@@ -0,0 +1,29 @@
+"""incident history change cursor index
+
+Revision ID: 2c7d9e4f6a80
+Revises: 8f4c2b6e9a1d
+Create Date: 2026-10-19 13:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '2c7d9e4f6a80'
+down_revision: Union[str, Sequence[str], None] = '8f4c2b6e9a1d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Resuming the staff-wide event feed reads history after (timestamp, id)
+    op.create_index(
+        'ix_incidenthistory_timestamp_id', 'incidenthistory', ['timestamp', 'id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_incidenthistory_timestamp_id', table_name='incidenthistory')
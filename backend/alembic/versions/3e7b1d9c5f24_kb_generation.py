@@ -0,0 +1,34 @@
+"""kb generation counter for index staleness checks
+
+Revision ID: 3e7b1d9c5f24
+Revises: 9a4d6c2e8b15
+Create Date: 2026-10-19 18:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '3e7b1d9c5f24'
+down_revision: Union[str, Sequence[str], None] = '9a4d6c2e8b15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # One row, bumped by every transaction that writes KB chunks
+    kbgeneration = op.create_table(
+        'kbgeneration',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('generation', sa.Integer(), server_default='0', nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.bulk_insert(kbgeneration, [{'id': 1, 'generation': 0}])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('kbgeneration')
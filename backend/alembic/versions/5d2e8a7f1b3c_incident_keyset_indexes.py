@@ -0,0 +1,36 @@
+"""incident keyset pagination indexes
+
+Revision ID: 5d2e8a7f1b3c
+Revises: c4fba991f252
+Create Date: 2026-10-19 10:12:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2e8a7f1b3c'
+down_revision: Union[str, Sequence[str], None] = 'c4fba991f252'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Staff incident list: ORDER BY (updated_at, id), optionally filtered by one column
+INDEXES = {
+    'ix_incident_updated_at_id': ['updated_at', 'id'],
+    'ix_incident_status_updated_at_id': ['status', 'updated_at', 'id'],
+    'ix_incident_category_updated_at_id': ['category', 'updated_at', 'id'],
+    'ix_incident_priority_updated_at_id': ['priority', 'updated_at', 'id'],
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, columns in INDEXES.items():
+        op.create_index(name, 'incident', columns, unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name in reversed(list(INDEXES)):
+        op.drop_index(name, table_name='incident')
@@ -0,0 +1,32 @@
+"""conversation version for cached write-through
+
+Revision ID: 6b1e3f5a7c92
+Revises: 2c7d9e4f6a80
+Create Date: 2026-10-19 15:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '6b1e3f5a7c92'
+down_revision: Union[str, Sequence[str], None] = '2c7d9e4f6a80'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Flow-state writes are conditional on the version the turn read
+    op.add_column(
+        'conversation',
+        sa.Column('version', sa.Integer(), server_default='0', nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('conversation') as batch_op:
+        batch_op.drop_column('version')
@@ -0,0 +1,69 @@
+"""align incident history column and hot-path indexes with the models
+
+Revision ID: 8f4c2b6e9a1d
+Revises: 5d2e8a7f1b3c
+Create Date: 2026-10-19 11:40:00.000000
+
+"""
+from typing import List, Sequence, Set, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '8f4c2b6e9a1d'
+down_revision: Union[str, Sequence[str], None] = '5d2e8a7f1b3c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, index name, columns). The composites also serve lookups on their
+# leading column, so no separate incident_id / conversation_id indexes.
+# incident(status, updated_at) is covered by ix_incident_status_updated_at_id.
+INDEXES = [
+    ('conversation', 'ix_conversation_user_id', ['user_id']),
+    ('incidenthistory', 'ix_incidenthistory_actor_user_id', ['actor_user_id']),
+    ('incidenthistory', 'ix_incidenthistory_incident_id_timestamp', ['incident_id', 'timestamp']),
+    ('kbchunk', 'ix_kbchunk_doc_id', ['doc_id']),
+    ('message', 'ix_message_conversation_id_timestamp', ['conversation_id', 'timestamp']),
+]
+
+
+def _columns(table: str) -> Set[str]:
+    return {col['name'] for col in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def _indexes(table: str) -> List[Union[str, None]]:
+    return [ix['name'] for ix in sa.inspect(op.get_bind()).get_indexes(table)]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The initial schema named the history foreign key `incident_fk`; the
+    # models (and databases created with create_all) use `incident_id`.
+    if 'incident_fk' in _columns('incidenthistory'):
+        with op.batch_alter_table('incidenthistory') as batch_op:
+            batch_op.alter_column(
+                'incident_fk',
+                new_column_name='incident_id',
+                existing_type=sa.String(length=36),
+                existing_nullable=False,
+            )
+
+    for table, name, columns in INDEXES:
+        if name not in _indexes(table):
+            op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, name, _ in reversed(INDEXES):
+        if name in _indexes(table):
+            op.drop_index(name, table_name=table)
+
+    with op.batch_alter_table('incidenthistory') as batch_op:
+        batch_op.alter_column(
+            'incident_id',
+            new_column_name='incident_fk',
+            existing_type=sa.String(length=36),
+            existing_nullable=False,
+        )
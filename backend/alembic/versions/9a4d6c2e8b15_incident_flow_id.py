@@ -0,0 +1,31 @@
+"""incident flow id for idempotent chat filing
+
+Revision ID: 9a4d6c2e8b15
+Revises: 6b1e3f5a7c92
+Create Date: 2026-10-19 16:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4d6c2e8b15'
+down_revision: Union[str, Sequence[str], None] = '6b1e3f5a7c92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The chat flow that filed an incident; unique so a replay cannot refile
+    op.add_column('incident', sa.Column('flow_id', sa.String(), nullable=True))
+    op.create_index('ix_incident_flow_id', 'incident', ['flow_id'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_incident_flow_id', table_name='incident')
+    with op.batch_alter_table('incident') as batch_op:
+        batch_op.drop_column('flow_id')
@@ -0,0 +1,101 @@
+# backend/benchmarks/bench_pca.py
+"""
+Recall@k and latency of the PCA-reduced KB index against the full-dimension
+baseline, on a synthetic clustered embedding set.
+
+    python -m backend.benchmarks.bench_pca --chunks 20000 --pca-dim 128
+"""
+import argparse
+import json
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+from numpy.typing import NDArray
+
+from backend.benchmarks.common import percentiles, synthetic_vectors
+from backend.utils.kb_index import KBIndex
+
+
+def timed_search(
+    index: KBIndex, queries: NDArray[np.float32], k: int
+) -> tuple[List[List[str]], List[float]]:
+    hits: List[List[str]] = []
+    latencies: List[float] = []
+    for q in queries:
+        start = time.perf_counter()
+        res = index.search_many(q[None, :], top_k=k, min_score=-1.0)[0]
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits.append([doc_id for doc_id, _ in res])
+    return hits, latencies
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    rng = np.random.default_rng(args.seed)
+    vectors = synthetic_vectors(
+        args.chunks, args.dim, args.clusters, args.latent_dim, rng
+    )
+    chunk_ids = [f"c{i}" for i in range(args.chunks)]
+    doc_ids = [f"d{i // args.chunks_per_doc}" for i in range(args.chunks)]
+
+    picks = rng.integers(0, args.chunks, size=args.queries)
+    queries = vectors[picks] + rng.normal(
+        scale=0.3, size=(args.queries, args.dim)
+    ).astype(np.float32)
+
+    start = time.perf_counter()
+    full = KBIndex(chunk_ids, doc_ids, vectors)
+    full_build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    reduced = KBIndex(chunk_ids, doc_ids, vectors, pca_dim=args.pca_dim)
+    reduced_build = time.perf_counter() - start
+
+    truth, full_lat = timed_search(full, queries, args.k)
+    approx, reduced_lat = timed_search(reduced, queries, args.k)
+
+    recall = float(
+        np.mean(
+            [
+                len(set(t) & set(a)) / max(len(t), 1)
+                for t, a in zip(truth, approx, strict=True)
+            ]
+        )
+    )
+
+    return {
+        "chunks": args.chunks,
+        "dim": args.dim,
+        "pca_dim": args.pca_dim,
+        "queries": args.queries,
+        "k": args.k,
+        f"recall@{args.k}": round(recall, 4),
+        "full": {
+            "build_s": round(full_build, 4),
+            "matrix_mb": round(full.matrix.nbytes / 2**20, 2),
+            "latency_ms": percentiles(full_lat),
+        },
+        "pca": {
+            "build_s": round(reduced_build, 4),
+            "matrix_mb": round(reduced.matrix.nbytes / 2**20, 2),
+            "latency_ms": percentiles(reduced_lat),
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunks", type=int, default=10_000)
+    parser.add_argument("--chunks-per-doc", type=int, default=3)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--pca-dim", type=int, default=128)
+    parser.add_argument("--clusters", type=int, default=50)
+    parser.add_argument("--latent-dim", type=int, default=96)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    print(json.dumps(run(parser.parse_args()), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+# backend/benchmarks/chat_load.py
+"""
+Chat load generator.
+
+Simulates N concurrent residents against `/api/chat/message`. Each resident
+runs `--sessions` chat sessions drawn from a weighted scenario mix, echoing
+back `session_id` (and `flow_token`, when issued) like the frontend does.
+Prints throughput, latency percentiles per intent, error counts and database
+row growth as JSON.
+
+    python -m backend.benchmarks.chat_load --residents 50 --sessions 4 --out load.json
+    python -m backend.benchmarks.chat_load --url http://127.0.0.1:8000 --residents 200
+
+Scenarios:
+    general   one knowledge-base question
+    status    "check status" followed by an incident ID
+    incident  the full in-chat filing: choice, title, category, location,
+              email and description
+
+By default the app runs in-process (one event loop, like one worker) against
+DATABASE_URL; every run files real incidents and messages, so pass
+`--database-url` to point it at a scratch database. With `--url`, row growth
+is only meaningful if DATABASE_URL matches the server's database.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from backend.benchmarks.common import elapsed_ms, git_revision, percentiles
+
+# A turn is (intent label, message); a script is the turns of one session
+Turn = Tuple[str, str]
+ScenarioFn = Callable[[random.Random, List[str]], List[Turn]]
+
+KB_DOCS: List[Tuple[str, str]] = [
+    (
+        "Trash Collection Schedule",
+        "Trash collection happens every Monday and Thursday at 8am in residential areas.",
+    ),
+    (
+        "Water Service Outages",
+        "Residents can expect scheduled water maintenance on the first Saturday "
+        "of every month between 10am and 4pm.",
+    ),
+    (
+        "Parking Permits",
+        "Apply for a residential parking permit online or at the city office.",
+    ),
+]
+
+GENERAL_QUESTIONS = [
+    "When is trash collected in my area?",
+    "When is the next scheduled water maintenance?",
+    "How do I apply for a parking permit?",
+    "Where can I pay my water bill?",
+]
+
+INCIDENT_OPENERS = [
+    "I want to report a pothole on my street",
+    "The streetlight outside my house is broken",
+    "There is a water leak on the main road",
+]
+
+
+# ---------- Scenarios ----------
+def general_scenario(rng: random.Random, _public_ids: List[str]) -> List[Turn]:
+    return [("general_query", rng.choice(GENERAL_QUESTIONS))]
+
+
+def status_scenario(rng: random.Random, public_ids: List[str]) -> List[Turn]:
+    public_id = rng.choice(public_ids) if public_ids else "UNKNOWN1"
+    return [("status_check", "Check status"), ("status_check", public_id)]
+
+
+def incident_scenario(rng: random.Random, _public_ids: List[str]) -> List[Turn]:
+    n = rng.randrange(10_000)
+    return [
+        ("incident_report", rng.choice(INCIDENT_OPENERS)),
+        ("incident_report_flow", "chat"),
+        ("incident_report_flow", f"Load test report {n}"),
+        ("incident_report_flow", rng.choice(["road", "water", "streetlight"])),
+        ("incident_report_flow", f"{n} Main Street"),
+        ("incident_report_flow", f"resident{n}@example.com"),
+        ("incident_report_flow", "Filed by the chat load generator"),
+    ]
+
+
+SCENARIOS: Dict[str, ScenarioFn] = {
+    "general": general_scenario,
+    "status": status_scenario,
+    "incident": incident_scenario,
+}
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    """Relative scenario weights from e.g. "general=6,status=2,incident=2"."""
+    mix: Dict[str, float] = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(
+                f"unknown scenario {name!r}; available: {sorted(SCENARIOS)}"
+            )
+        try:
+            mix[name] = float(weight or 1)
+        except ValueError as exc:
+            raise argparse.ArgumentTypeError(
+                f"bad weight for {name!r}: {weight!r}"
+            ) from exc
+    if not any(w > 0 for w in mix.values()):
+        raise argparse.ArgumentTypeError(
+            "at least one scenario needs a positive weight"
+        )
+    return mix
+
+
+# ---------- Load ----------
+@dataclass
+class Stats:
+    latencies: Dict[str, List[float]] = field(default_factory=dict)
+    errors: Dict[str, int] = field(default_factory=dict)
+    sessions: Dict[str, int] = field(default_factory=dict)
+
+    def record(self, intent: str, ms: float) -> None:
+        self.latencies.setdefault(intent, []).append(ms)
+
+    def error(self, kind: str) -> None:
+        self.errors[kind] = self.errors.get(kind, 0) + 1
+
+
+async def resident(
+    client: httpx.AsyncClient,
+    rng: random.Random,
+    mix: Dict[str, float],
+    sessions: int,
+    public_ids: List[str],
+    stats: Stats,
+) -> None:
+    names = list(mix)
+    weights = [mix[n] for n in names]
+    for _ in range(sessions):
+        name = rng.choices(names, weights)[0]
+        stats.sessions[name] = stats.sessions.get(name, 0) + 1
+        session_id: Optional[str] = None
+        flow_token: Optional[str] = None
+        for intent, message in SCENARIOS[name](rng, public_ids):
+            payload: Dict[str, Any] = {"message": message}
+            if session_id:
+                payload["session_id"] = session_id
+            if flow_token:
+                payload["flow_token"] = flow_token
+            start = time.perf_counter()
+            try:
+                response = await client.post("/api/chat/message", json=payload)
+            except httpx.HTTPError as exc:
+                stats.error(type(exc).__name__)
+                break
+            stats.record(intent, elapsed_ms(start))
+            if response.status_code != 200:
+                stats.error(str(response.status_code))
+                break
+            data = response.json()
+            session_id = data["session_id"]
+            flow_token = data.get("flow_token")
+
+
+async def drive(
+    client: httpx.AsyncClient, args: argparse.Namespace, public_ids: List[str]
+) -> Tuple[Stats, float]:
+    """Run all residents concurrently; returns their stats and wall time in ms."""
+    stats = Stats()
+    rngs = [random.Random(args.seed + i) for i in range(args.residents)]
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            resident(client, rng, args.mix, args.sessions, public_ids, stats)
+            for rng in rngs
+        )
+    )
+    return stats, elapsed_ms(start)
+
+
+# ---------- Database ----------
+def row_counts() -> Dict[str, int]:
+    from sqlmodel import Session, func, select
+
+    from backend.db import engine
+    from backend.models import Conversation, Incident, IncidentHistory, Message
+
+    # Keyed by table name, which SQLModel derives from the class name
+    with Session(engine) as session:
+        return {
+            model.__name__.lower(): session.exec(
+                select(func.count()).select_from(model)
+            ).one()
+            for model in (Conversation, Message, Incident, IncidentHistory)
+        }
+
+
+def seed(n_incidents: int) -> List[str]:
+    """
+    Make sure the KB has something to retrieve and there are incidents to
+    check the status of; returns the public IDs status checks draw from.
+    """
+    from sqlmodel import Session, select
+
+    from backend.db import engine
+    from backend.models import Incident, KBChunk, KBDoc
+    from backend.utils.public_ids import incident_ids
+    from backend.utils.search import embed_queries
+
+    with Session(engine) as session:
+        if session.exec(select(KBDoc.id).limit(1)).first() is None:
+            vecs = embed_queries([body for _, body in KB_DOCS])
+            for (title, body), vec in zip(KB_DOCS, vecs, strict=True):
+                doc = KBDoc(title=title, body=body)
+                session.add(doc)
+                session.flush()
+                session.add(
+                    KBChunk(
+                        doc_id=doc.id, text=body, embedding=json.dumps(vec.tolist())
+                    )
+                )
+
+        public_ids = list(session.exec(select(Incident.public_id).limit(100)).all())
+        while len(public_ids) < n_incidents:
+            incident = Incident(
+                public_id=incident_ids.next_id(),
+                title="Load test seed",
+                description="Seeded by the chat load generator",
+                category="other",
+            )
+            session.add(incident)
+            public_ids.append(incident.public_id)
+        session.commit()
+    return public_ids
+
+
+# ---------- Report ----------
+def report(
+    args: argparse.Namespace,
+    stats: Stats,
+    wall_ms: float,
+    rows_before: Dict[str, int],
+    rows_after: Dict[str, int],
+) -> Dict[str, Any]:
+    all_ms = [ms for values in stats.latencies.values() for ms in values]
+    turns = len(all_ms)
+    sessions = sum(stats.sessions.values())
+    wall_s = wall_ms / 1000
+    growth = {table: rows_after[table] - rows_before[table] for table in rows_after}
+    return {
+        "revision": git_revision(),
+        "params": {
+            key: value for key, value in vars(args).items() if key not in ("out",)
+        },
+        "wall_s": round(wall_s, 3),
+        "turns": turns,
+        "sessions": stats.sessions,
+        "errors": stats.errors,
+        "throughput": {
+            "turns_per_s": round(turns / wall_s, 2) if wall_s else None,
+            "sessions_per_s": round(sessions / wall_s, 2) if wall_s else None,
+        },
+        "latency_ms": {
+            "all": percentiles(all_ms),
+            **{
+                intent: percentiles(ms)
+                for intent, ms in sorted(stats.latencies.items())
+            },
+        },
+        "db_rows": {
+            "growth": growth,
+            "per_turn": {
+                table: round(n / turns, 3) if turns else None
+                for table, n in growth.items()
+            },
+        },
+    }
+
+
+async def run_async(args: argparse.Namespace) -> Dict[str, Any]:
+    if args.url:
+        public_ids = seed(args.incidents)
+        rows_before = row_counts()
+        async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout) as client:
+            stats, wall_ms = await drive(client, args, public_ids)
+        return report(args, stats, wall_ms, rows_before, row_counts())
+
+    # Imported here so --database-url takes effect before the engines are built
+    from backend.main import app
+
+    async with app.router.lifespan_context(app):
+        public_ids = seed(args.incidents)
+        rows_before = row_counts()
+        transport = httpx.ASGITransport(app=app)  # type: ignore[arg-type]
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://loadtest", timeout=args.timeout
+        ) as client:
+            stats, wall_ms = await drive(client, args, public_ids)
+    # Rows are counted after shutdown so write-behind batches are flushed
+    return report(args, stats, wall_ms, rows_before, row_counts())
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--residents", type=int, default=20, help="concurrent residents"
+    )
+    parser.add_argument("--sessions", type=int, default=3, help="sessions per resident")
+    parser.add_argument(
+        "--mix",
+        type=parse_mix,
+        default=parse_mix("general=6,status=2,incident=2"),
+        help="scenario weights, e.g. general=6,status=2,incident=2",
+    )
+    parser.add_argument(
+        "--incidents", type=int, default=10, help="incidents to seed for status checks"
+    )
+    parser.add_argument(
+        "--url", help="target a running server instead of the in-process app"
+    )
+    parser.add_argument("--database-url", help="overrides DATABASE_URL for this run")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="also write the JSON report to this path")
+    args = parser.parse_args(argv)
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+
+    result = json.dumps(asyncio.run(run_async(args)), indent=2)
+    print(result)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(result + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# backend/benchmarks/common.py
+"""Shared helpers for the benchmark scripts."""
+import subprocess
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+from numpy.typing import NDArray
+
+
+def synthetic_vectors(
+    n: int, dim: int, clusters: int, latent_dim: int, rng: np.random.Generator
+) -> NDArray[np.float32]:
+    """
+    Clustered vectors living mostly in a `latent_dim` subspace, roughly the
+    shape sentence embeddings of a small KB take.
+    """
+    basis = rng.normal(size=(latent_dim, dim)).astype(np.float32)
+    centers = rng.normal(size=(clusters, latent_dim)).astype(np.float32)
+    out = np.empty((n, dim), dtype=np.float32)
+    step = 50_000  # generate in slabs so 1M-row runs don't double peak memory
+    for start in range(0, n, step):
+        size = min(step, n - start)
+        labels = rng.integers(0, clusters, size=size)
+        latent = centers[labels] + rng.normal(scale=0.6, size=(size, latent_dim))
+        noise = rng.normal(scale=0.3, size=(size, dim))
+        out[start : start + size] = latent @ basis + noise
+    return out
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    """p50/p95/p99 of a list of millisecond timings."""
+    if not values:
+        return {}
+    return {f"p{p}": round(float(np.percentile(values, p)), 4) for p in (50, 95, 99)}
+
+
+def elapsed_ms(start: float) -> float:
+    return (time.perf_counter() - start) * 1000
+
+
+def git_revision() -> Optional[str]:
+    """Current commit, so saved results can be compared between commits."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
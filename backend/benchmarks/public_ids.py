@@ -0,0 +1,117 @@
+# backend/benchmarks/public_ids.py
+"""
+Public incident ID uniqueness benchmark.
+
+Generates IDs in several processes at once (like several API workers) and
+checks the union for duplicates, bad check symbols and per-process ordering.
+The legacy random 8-character generator runs at the same volume for
+comparison, with the birthday-bound expected collision count.
+
+    python -m backend.benchmarks.public_ids --processes 8 --per-process 200000
+
+By default each process gets a worker slot 0..N-1, as gunicorn_conf.py gives
+the API's workers; `--pid-worker-ids` uses the process-id fallback instead.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.benchmarks.common import git_revision
+
+LEGACY_ALPHABET = 36
+LEGACY_LENGTH = 8
+
+
+def generate(job: Tuple[str, Optional[int], int]) -> Dict[str, Any]:
+    """Runs in a child process; returns its IDs and timing."""
+    kind, worker_id, count = job
+    if kind == "legacy":
+        from backend.utils.helpers import generate_public_id
+
+        start = time.perf_counter()
+        ids = [generate_public_id() for _ in range(count)]
+    else:
+        from backend.utils.public_ids import PublicIdGenerator, incident_ids
+
+        if worker_id is None:
+            gen = incident_ids  # the process-wide generator, pid-derived
+        else:
+            os.environ["PUBLIC_ID_WORKER_INDEX"] = str(worker_id)
+            gen = PublicIdGenerator()
+        start = time.perf_counter()
+        ids = [gen.next_id() for _ in range(count)]
+    return {"ids": ids, "seconds": time.perf_counter() - start, "pid": os.getpid()}
+
+
+def summarise(kind: str, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    all_ids = [i for r in results for i in r["ids"]]
+    total = len(all_ids)
+    seconds = max(r["seconds"] for r in results)
+    out: Dict[str, Any] = {
+        "ids": total,
+        "duplicates": total - len(set(all_ids)),
+        "ids_per_s_per_process": round(
+            sum(len(r["ids"]) / r["seconds"] for r in results if r["seconds"])
+            / len(results)
+        ),
+        "wall_s": round(seconds, 3),
+    }
+    if kind == "legacy":
+        space = LEGACY_ALPHABET**LEGACY_LENGTH
+        out["expected_duplicates"] = round(total * (total - 1) / (2 * space), 4)
+        return out
+
+    from backend.utils.public_ids import parse_public_id
+
+    bad_check = 0
+    workers = set()
+    for r in results:
+        for public_id in r["ids"]:
+            try:
+                workers.add(parse_public_id(public_id).worker_id)
+            except ValueError:
+                bad_check += 1
+    out["bad_check_symbols"] = bad_check
+    out["distinct_worker_ids"] = len(workers)
+    out["ordered_within_process"] = all(r["ids"] == sorted(r["ids"]) for r in results)
+    return out
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    report: Dict[str, Any] = {
+        "revision": git_revision(),
+        "params": {key: value for key, value in vars(args).items() if key != "out"},
+    }
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(args.processes) as pool:
+        for kind in ("public_ids", "legacy"):
+            jobs = [
+                (kind, None if args.pid_worker_ids else i, args.per_process)
+                for i in range(args.processes)
+            ]
+            report[kind] = summarise(kind, pool.map(generate, jobs, chunksize=1))
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--per-process", type=int, default=100_000)
+    parser.add_argument("--pid-worker-ids", action="store_true")
+    parser.add_argument("--out", help="also write the JSON report to this path")
+    args = parser.parse_args(argv)
+
+    report = json.dumps(run(args), indent=2)
+    print(report)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(report + "\n")
+
+
+if __name__ == "__main__":
+    main()
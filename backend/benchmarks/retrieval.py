@@ -0,0 +1,357 @@
+# backend/benchmarks/retrieval.py
+"""
+Retrieval quality and latency harness.
+
+Generates a synthetic KB (chunk embeddings grouped into documents, each
+document with a few keyword terms as its text) and a labeled query set (each
+query is a perturbed copy of one chunk plus some of its document's terms,
+labeled with that document), runs every selected retrieval mode over it, and
+prints p50/p95/p99 latency, QPS, memory footprint and recall@k/MRR as JSON.
+
+    python -m backend.benchmarks.retrieval --chunks 100000 --out results.json
+
+Modes:
+    loop   the per-document JSON-decode + cosine loop behind `score_text`
+    exact  the in-memory chunk matrix (`KBIndex`)
+    pca    `KBIndex` with the PCA projection (`--pca-dim`)
+    int8   the chunk matrix quantized to int8 with a per-row scale
+    hybrid exact vector scores fused with `keyword_docs` over an in-memory
+           SQLite KB (`--hybrid-weight` is the vector share)
+
+Query encoding is left out of every mode (queries are already vectors), so
+the numbers compare scoring alone. New modes register in `MODES`.
+"""
+import argparse
+import json
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine
+
+from backend.benchmarks.common import (
+    elapsed_ms,
+    git_revision,
+    percentiles,
+    synthetic_vectors,
+)
+from backend.models import KBDoc
+from backend.utils.kb_index import KBIndex, keyword_docs, normalize_rows
+
+# A search function takes a (Q, dim) batch and the queries' texts and returns
+# ranked doc ids per query
+SearchFn = Callable[[NDArray[np.float32], List[str], int], List[List[str]]]
+
+# Chunk rows the int8 mode dequantizes at a time
+INT8_SLAB = 16_384
+
+# Candidates per query the hybrid mode takes from each ranking, per result
+HYBRID_DEPTH = 3
+
+
+@dataclass
+class Corpus:
+    vectors: NDArray[np.float32]
+    chunk_ids: List[str]
+    chunk_doc_ids: List[str]
+    doc_texts: Dict[str, str]
+    queries: NDArray[np.float32]
+    query_texts: List[str]
+    labels: List[str]
+
+
+def make_corpus(args: argparse.Namespace) -> Corpus:
+    rng = np.random.default_rng(args.seed)
+    vectors = synthetic_vectors(
+        args.chunks, args.dim, args.clusters, args.latent_dim, rng
+    )
+    chunk_doc_ids = [f"d{i // args.chunks_per_doc}" for i in range(args.chunks)]
+
+    picks = rng.integers(0, args.chunks, size=args.queries)
+    queries = vectors[picks] + rng.normal(
+        scale=args.query_noise, size=(args.queries, args.dim)
+    ).astype(np.float32)
+
+    # Fixed-width terms, so no term is a substring of another for LIKE
+    n_docs = -(-args.chunks // args.chunks_per_doc)
+    doc_terms = rng.integers(0, args.vocab, size=(n_docs, args.doc_terms))
+    query_terms = doc_terms[picks // args.chunks_per_doc, : args.query_terms]
+    noisy = rng.random(query_terms.shape) < args.term_noise
+    query_terms = np.where(
+        noisy, rng.integers(0, args.vocab, size=query_terms.shape), query_terms
+    )
+
+    def text(terms: NDArray[np.int64]) -> str:
+        return " ".join(f"t{term:06d}" for term in terms)
+
+    return Corpus(
+        vectors=vectors,
+        chunk_ids=[f"c{i}" for i in range(args.chunks)],
+        chunk_doc_ids=chunk_doc_ids,
+        doc_texts={f"d{i}": text(terms) for i, terms in enumerate(doc_terms)},
+        queries=queries,
+        query_texts=[text(terms) for terms in query_terms],
+        labels=[chunk_doc_ids[i] for i in picks],
+    )
+
+
+# ---------- Modes ----------
+def _cosine(vec_a: NDArray[np.float32], vec_b: NDArray[np.float32]) -> float:
+    denom = float(np.linalg.norm(vec_a) * np.linalg.norm(vec_b))
+    return 0.0 if denom == 0.0 else float(np.dot(vec_a, vec_b) / denom)
+
+
+def _score_text_loop(
+    query_vec: NDArray[np.float32], embeddings_json: List[str]
+) -> float:
+    """`score_text` minus its model call (search.py loads the model at import)."""
+    max_score = 0.0
+    for emb_json in embeddings_json:
+        vec = np.array(json.loads(emb_json), dtype=np.float32)
+        max_score = max(max_score, _cosine(query_vec, vec))
+    return max_score
+
+
+def build_loop(corpus: Corpus, _args: argparse.Namespace) -> SearchFn:
+    per_doc: Dict[str, List[str]] = {}
+    for doc_id, vec in zip(corpus.chunk_doc_ids, corpus.vectors, strict=True):
+        per_doc.setdefault(doc_id, []).append(json.dumps(vec.tolist()))
+
+    def search(
+        queries: NDArray[np.float32], _texts: List[str], k: int
+    ) -> List[List[str]]:
+        out: List[List[str]] = []
+        for q in queries:
+            scored = [(d, _score_text_loop(q, embs)) for d, embs in per_doc.items()]
+            scored.sort(key=lambda t: t[1], reverse=True)
+            out.append([d for d, _ in scored[:k]])
+        return out
+
+    return search
+
+
+def _index_search(index: KBIndex) -> SearchFn:
+    def search(
+        queries: NDArray[np.float32], _texts: List[str], k: int
+    ) -> List[List[str]]:
+        hits = index.search_many(queries, top_k=k, min_score=-1.0)
+        return [[doc_id for doc_id, _ in row] for row in hits]
+
+    return search
+
+
+def build_exact(corpus: Corpus, _args: argparse.Namespace) -> SearchFn:
+    return _index_search(
+        KBIndex(corpus.chunk_ids, corpus.chunk_doc_ids, corpus.vectors)
+    )
+
+
+def build_pca(corpus: Corpus, args: argparse.Namespace) -> SearchFn:
+    return _index_search(
+        KBIndex(
+            corpus.chunk_ids,
+            corpus.chunk_doc_ids,
+            corpus.vectors,
+            pca_dim=args.pca_dim,
+        )
+    )
+
+
+def _ranked_docs(
+    doc_scores: NDArray[np.float32], doc_ids: List[str], k: int
+) -> List[List[str]]:
+    """Top-k doc ids per row of a (Q, docs) score matrix, best first."""
+    k = min(k, doc_scores.shape[1])
+    top = np.argpartition(-doc_scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(doc_scores, top, axis=1), axis=1)
+    ranked = np.take_along_axis(top, order, axis=1)
+    return [[doc_ids[c] for c in row] for row in ranked]
+
+
+def build_int8(corpus: Corpus, _args: argparse.Namespace) -> SearchFn:
+    """
+    The exact index's rows stored as int8 codes with a float32 scale per row
+    (about a quarter of the memory), dequantized slab by slab per search.
+    """
+    index = KBIndex(corpus.chunk_ids, corpus.chunk_doc_ids, corpus.vectors)
+    scale = np.abs(index.matrix).max(axis=1) / 127
+    scale[scale == 0.0] = 1.0
+    codes = np.round(index.matrix / scale[:, None]).astype(np.int8)
+    doc_ids, doc_starts = index.doc_ids, index.doc_starts
+    del index  # only the codes stay resident
+
+    def search(
+        queries: NDArray[np.float32], _texts: List[str], k: int
+    ) -> List[List[str]]:
+        queries = normalize_rows(np.asarray(queries, dtype=np.float32))
+        sims = np.empty((queries.shape[0], codes.shape[0]), dtype=np.float32)
+        for start in range(0, codes.shape[0], INT8_SLAB):
+            slab = codes[start : start + INT8_SLAB]
+            stop = start + slab.shape[0]
+            dequantized = slab.astype(np.float32) * scale[start:stop, None]
+            sims[:, start:stop] = queries @ dequantized.T
+        return _ranked_docs(np.maximum.reduceat(sims, doc_starts, axis=1), doc_ids, k)
+
+    return search
+
+
+def build_hybrid(corpus: Corpus, args: argparse.Namespace) -> SearchFn:
+    """
+    Exact vector scores plus `keyword_docs` scores over the document texts,
+    weighted `--hybrid-weight` : 1 - `--hybrid-weight` and summed over the
+    union of both rankings' candidates.
+    """
+    index = KBIndex(corpus.chunk_ids, corpus.chunk_doc_ids, corpus.vectors)
+    # One shared connection, so the in-memory database outlives each session
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all(
+            KBDoc(id=doc_id, title=text, body="")
+            for doc_id, text in corpus.doc_texts.items()
+        )
+        session.commit()
+    weight = args.hybrid_weight
+
+    def search(
+        queries: NDArray[np.float32], texts: List[str], k: int
+    ) -> List[List[str]]:
+        depth = k * HYBRID_DEPTH
+        vector_hits = index.search_many(queries, top_k=depth, min_score=-1.0)
+        out: List[List[str]] = []
+        with Session(engine) as session:
+            for hits, text in zip(vector_hits, texts, strict=True):
+                scores = {doc_id: weight * score for doc_id, score in hits}
+                for doc, score in keyword_docs(session, text, top_k=depth):
+                    scores[doc.id] = scores.get(doc.id, 0.0) + (1 - weight) * score
+                out.append(sorted(scores, key=scores.__getitem__, reverse=True)[:k])
+        return out
+
+    return search
+
+
+MODES: Dict[str, Callable[[Corpus, argparse.Namespace], SearchFn]] = {
+    "loop": build_loop,
+    "exact": build_exact,
+    "pca": build_pca,
+    "int8": build_int8,
+    "hybrid": build_hybrid,
+}
+
+
+# ---------- Measurement ----------
+def quality(ranked: List[List[str]], labels: List[str]) -> Tuple[float, float]:
+    """recall@k and MRR@k against the single labeled doc per query."""
+    hits = 0
+    rr = 0.0
+    for row, label in zip(ranked, labels, strict=True):
+        if label in row:
+            hits += 1
+            rr += 1.0 / (row.index(label) + 1)
+    n = max(len(labels), 1)
+    return hits / n, rr / n
+
+
+def run_mode(name: str, corpus: Corpus, args: argparse.Namespace) -> Dict[str, Any]:
+    if name == "loop" and args.chunks > args.loop_max_chunks:
+        return {"skipped": f"more than --loop-max-chunks={args.loop_max_chunks}"}
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    search = MODES[name](corpus, args)
+    build_ms = elapsed_ms(start)
+    resident, build_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    ranked: List[List[str]] = []
+    latencies: List[float] = []
+    for q, text in zip(corpus.queries, corpus.query_texts, strict=True):
+        start = time.perf_counter()
+        ranked.extend(search(q[None, :], [text], args.k))
+        latencies.append(elapsed_ms(start))
+
+    start = time.perf_counter()
+    search(corpus.queries, corpus.query_texts, args.k)
+    batch_ms = elapsed_ms(start)
+
+    recall, mrr = quality(ranked, corpus.labels)
+    total_s = sum(latencies) / 1000
+    return {
+        "build_ms": round(build_ms, 2),
+        "memory_mb": round(resident / 2**20, 2),
+        "build_peak_mb": round(build_peak / 2**20, 2),
+        "latency_ms": percentiles(latencies),
+        "qps": round(len(latencies) / total_s, 2) if total_s else None,
+        "batch_qps": round(len(latencies) / (batch_ms / 1000), 2) if batch_ms else None,
+        f"recall@{args.k}": round(recall, 4),
+        f"mrr@{args.k}": round(mrr, 4),
+    }
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    corpus = make_corpus(args)
+    modes: Dict[str, Any] = {}
+    for name in args.modes:
+        modes[name] = run_mode(name, corpus, args)
+    return {
+        "revision": git_revision(),
+        "params": {
+            key: value
+            for key, value in vars(args).items()
+            if key not in ("out", "modes")
+        },
+        "modes": modes,
+    }
+
+
+def parse_modes(value: str) -> List[str]:
+    names = [m.strip() for m in value.split(",") if m.strip()]
+    unknown = [m for m in names if m not in MODES]
+    if unknown:
+        raise argparse.ArgumentTypeError(
+            f"unknown mode(s) {unknown}; available: {sorted(MODES)}"
+        )
+    return names
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--chunks", type=int, default=1_000, help="1k .. 1M")
+    parser.add_argument("--chunks-per-doc", type=int, default=3)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--latent-dim", type=int, default=96)
+    parser.add_argument("--clusters", type=int, default=50)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--query-noise", type=float, default=0.3)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--pca-dim", type=int, default=128)
+    parser.add_argument("--vocab", type=int, default=5_000, help="distinct terms")
+    parser.add_argument("--doc-terms", type=int, default=8)
+    parser.add_argument("--query-terms", type=int, default=3)
+    parser.add_argument(
+        "--term-noise", type=float, default=0.3, help="share of query terms replaced"
+    )
+    parser.add_argument(
+        "--hybrid-weight", type=float, default=0.5, help="vector share of hybrid"
+    )
+    parser.add_argument("--loop-max-chunks", type=int, default=5_000)
+    parser.add_argument("--modes", type=parse_modes, default=list(MODES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="also write the JSON report to this path")
+    args = parser.parse_args(argv)
+
+    report = json.dumps(run(args), indent=2)
+    print(report)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(report + "\n")
+
+
+if __name__ == "__main__":
+    main()
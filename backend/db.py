@@ -1,6 +1,10 @@
 # db.py
-from typing import Generator
+from typing import AsyncGenerator, Generator, List, Optional
+from sqlalchemy import inspect
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlmodel import SQLModel, Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 from backend.settings import settings
 
 # SQLite needs special connect args
@@ -21,10 +25,91 @@ def get_session() -> Generator[Session, None, None]:
     with Session(engine) as session:
         yield session
 
+# --- Async engine (request handlers); the sync engine stays for scripts/migrations ---
+# Drivers create_async_engine can use as they are
+ASYNC_DRIVERS = {"sqlite+aiosqlite", "postgresql+asyncpg", "postgresql+psycopg"}
+
+
+def async_database_url(url: str) -> str:
+    """
+    Map a sync DATABASE_URL onto its async driver: aiosqlite for SQLite,
+    asyncpg for PostgreSQL (whatever sync driver the URL names, e.g.
+    psycopg2). Raises ValueError for other databases; set
+    ASYNC_DATABASE_URL for those.
+    """
+    scheme, sep, rest = url.partition(":")
+    if not sep:
+        raise ValueError(f"Not a database URL: {url!r}")
+    if scheme in ASYNC_DRIVERS:
+        return url
+    dialect = scheme.split("+", 1)[0]
+    if dialect == "sqlite":
+        return "sqlite+aiosqlite:" + rest
+    if dialect in ("postgresql", "postgres"):
+        return "postgresql+asyncpg:" + rest
+    raise ValueError(
+        f"No async driver known for {scheme!r}; set ASYNC_DATABASE_URL"
+    )
+
+
+_async_engine: Optional[AsyncEngine] = None
+
+
+def get_async_engine() -> AsyncEngine:
+    """
+    The async engine, created on first use so that scripts and migrations,
+    which only need `engine`, import this module without an async driver.
+    """
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = create_async_engine(
+            settings.ASYNC_DATABASE_URL or async_database_url(str(settings.DATABASE_URL)),
+            echo=(getattr(settings, "ENV", "development") == "development"),
+        )
+    return _async_engine
+
+
+async def dispose_async_engine() -> None:
+    """Close the async engine's pooled connections, if it was ever created."""
+    if _async_engine is not None:
+        await _async_engine.dispose()
+
+
+async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+    """Yields an async SQLModel session (FastAPI dependency)."""
+    async with AsyncSession(get_async_engine(), expire_on_commit=False) as session:
+        yield session
+
+
 def init_db() -> None:
     """
     Create tables (can be called from anywhere).
     Importing models ensures all SQLModel tables are registered before create_all().
     """
-    from backend import models   # type: ignore  # intentional import for table registration
+    from backend import models  # noqa: F401  # type: ignore  # intentional import for table registration
     SQLModel.metadata.create_all(bind=engine)
+
+
+def missing_indexes(bind: Engine = engine) -> List[str]:
+    """
+    Indexes declared on the models that the live schema lacks, as
+    "table(col, ...)". Matched on columns rather than names; an existing index
+    whose leading columns match also counts. Missing tables are skipped.
+    """
+    from backend import models  # noqa: F401  # type: ignore  # intentional import for table registration
+    inspector = inspect(bind)
+    tables = set(inspector.get_table_names())
+    missing: List[str] = []
+    for table in SQLModel.metadata.sorted_tables:
+        if table.name not in tables:
+            continue
+        have = [tuple(ix["column_names"]) for ix in inspector.get_indexes(table.name)]
+        have += [
+            tuple(uc["column_names"])
+            for uc in inspector.get_unique_constraints(table.name)
+        ]
+        for index in table.indexes:
+            cols = tuple(col.name for col in index.columns)
+            if not any(h[: len(cols)] == cols for h in have):
+                missing.append(f"{table.name}({', '.join(cols)})")
+    return missing
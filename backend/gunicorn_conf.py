@@ -0,0 +1,35 @@
+# backend/gunicorn_conf.py
+"""
+Gunicorn server hooks (`gunicorn --config gunicorn_conf.py`).
+
+Each worker gets a slot (0..workers-1) that no other live worker holds; a
+replacement worker takes over the slot of the one it replaces. The slot is
+exported to the worker as PUBLIC_ID_WORKER_INDEX, which makes its public ID
+worker id unique within the host (see backend/utils/public_ids.py).
+"""
+import os
+import sys
+from typing import Any, Iterable, Optional
+
+
+def free_slot(taken: Iterable[Optional[int]]) -> int:
+    """The lowest slot not held by a live worker."""
+    used = set(taken)
+    slot = 0
+    while slot in used:
+        slot += 1
+    return slot
+
+
+def pre_fork(server: Any, worker: Any) -> None:
+    # Runs in the arbiter; exited workers are already reaped from WORKERS
+    worker.slot = free_slot(getattr(w, "slot", None) for w in server.WORKERS.values())
+
+
+def post_fork(_server: Any, worker: Any) -> None:
+    os.environ["PUBLIC_ID_WORKER_INDEX"] = str(worker.slot)
+    # With --preload the app was imported (and its generator set up) in the arbiter
+    for name in ("backend.utils.public_ids", "utils.public_ids"):
+        module = sys.modules.get(name)
+        if module is not None:
+            module.incident_ids.after_fork()
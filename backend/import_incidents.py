@@ -0,0 +1,82 @@
+# import_incidents.py
+"""
+Bulk-import incidents from an NDJSON or CSV (header row) file, e.g. a
+backlog exported from a legacy system.
+
+    python -m backend.import_incidents backlog.ndjson
+    python -m backend.import_incidents backlog.csv --batch-size 1000
+    cat backlog.ndjson | python -m backend.import_incidents - --format ndjson
+
+Each record is validated like `POST /api/incidents`; valid ones are inserted
+with their initial history entry in batched transactions, and the report of
+rejected lines is printed as JSON. Set PUBLIC_ID_WORKER_ID to a worker id
+no running API worker uses (required with ENV=production).
+"""
+import argparse
+import contextlib
+import json
+import sys
+from typing import List, Optional
+
+
+def guess_format(path: str) -> str:
+    return "csv" if path.lower().endswith(".csv") else "ndjson"
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("path", help="file to import, or - for stdin")
+    parser.add_argument(
+        "--format", choices=["ndjson", "csv"], help="default: from the file extension"
+    )
+    parser.add_argument(
+        "--batch-size", type=int, help="default: INCIDENT_IMPORT_BATCH_SIZE"
+    )
+    parser.add_argument("--database-url", help="overrides DATABASE_URL for this run")
+    args = parser.parse_args(argv)
+
+    if args.database_url:
+        import os
+
+        os.environ["DATABASE_URL"] = args.database_url
+
+    # Imported here so --database-url takes effect before the engine is built
+    from sqlmodel import Session
+
+    from backend.db import engine
+    from backend.settings import settings
+    from backend.utils.incident_import import import_incidents
+
+    fmt = args.format or guess_format(args.path)
+    batch_size = args.batch_size or settings.INCIDENT_IMPORT_BATCH_SIZE
+    with contextlib.ExitStack() as stack:
+        lines = (
+            sys.stdin
+            if args.path == "-"
+            else stack.enter_context(
+                open(args.path, encoding="utf-8-sig", newline="")
+            )
+        )
+        session = stack.enter_context(Session(engine))
+        report = import_incidents(session, lines, fmt, batch_size)  # type: ignore[arg-type]
+
+    print(
+        json.dumps(
+            {
+                "imported": report.imported,
+                "failed": report.failed,
+                "errors": [
+                    {"line": line, "error": error} for line, error in report.errors
+                ],
+            },
+            indent=2,
+        )
+    )
+    if report.failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
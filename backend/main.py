@@ -11,9 +11,13 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
-from backend.db import init_db
+from backend.db import dispose_async_engine, get_async_engine, init_db, missing_indexes
 from backend.routes import api_router
+from backend.routes.chat import classifier
 from backend.settings import settings
+from backend.utils.kb_index import warm_kb_index
+from backend.utils.public_ids import incident_ids
+from backend.utils.write_behind import message_writer
 
 # --- Logging configuration ---
 logging.basicConfig(
@@ -43,7 +47,24 @@ async def lifespan(app: FastAPI):
     # Only init DB in non-test environments
     if os.getenv("TESTING") != "1":
         init_db()
+        get_async_engine()  # fail here, not on the first request, without an async driver
+        missing = missing_indexes()
+        if missing:
+            logger.warning(
+                f"Database is missing expected indexes: {', '.join(missing)}. "
+                "Run `alembic upgrade head`."
+            )
+        warm_kb_index()
+        if settings.INTENT_MODE == "embedding":
+            classifier.fit_centroids()  # before the first chat turn needs them
+    # Fail at startup, not on the first incident, if no worker id is configured
+    logger.info(f"Public ID worker id: {incident_ids.worker_id}")
+    if settings.MESSAGE_WRITE_BEHIND:
+        message_writer.start()
     yield
+    # Flush buffered chat messages before the worker exits
+    message_writer.stop()
+    await dispose_async_engine()
 
 app = FastAPI(
     title="CivicNavigator API",
@@ -82,6 +103,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
     allow_headers=["Authorization", "Content-Type"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # --- Routes ---
@@ -0,0 +1,86 @@
+# backend/metrics.py
+"""
+Application metrics. They register with the default prometheus_client
+registry, so they are served by the Instrumentator's `/metrics` endpoint.
+"""
+from prometheus_client import Counter, Gauge, Histogram
+
+# --- Conversation cache ---
+CONVERSATION_CACHE_HITS = Counter(
+    "civicnav_conversation_cache_hits_total",
+    "Chat turns served from the in-process conversation cache",
+)
+CONVERSATION_CACHE_MISSES = Counter(
+    "civicnav_conversation_cache_misses_total",
+    "Chat turns that had to load the conversation from the database",
+)
+CONVERSATION_CACHE_HIT_RATIO = Gauge(
+    "civicnav_conversation_cache_hit_ratio",
+    "Conversation cache hits / lookups since process start",
+)
+CONVERSATION_CACHE_SIZE = Gauge(
+    "civicnav_conversation_cache_size",
+    "Active conversations held in the in-process cache",
+)
+
+# --- Public incident status cache ---
+STATUS_CACHE_HITS = Counter(
+    "civicnav_status_cache_hits_total",
+    "Incident status lookups served from the in-process cache",
+)
+STATUS_CACHE_MISSES = Counter(
+    "civicnav_status_cache_misses_total",
+    "Incident status lookups that had to query the database",
+)
+
+# --- Message write-behind queue ---
+MESSAGE_FLUSH_SIZE = Histogram(
+    "civicnav_message_flush_size",
+    "Message rows written per write-behind flush",
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500),
+)
+MESSAGE_FLUSH_LAG = Histogram(
+    "civicnav_message_flush_lag_seconds",
+    "Time from enqueueing a message to its row being committed",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+MESSAGE_QUEUE_DEPTH = Gauge(
+    "civicnav_message_queue_depth",
+    "Message rows waiting in the write-behind queue",
+)
+MESSAGE_QUEUE_REJECTED = Counter(
+    "civicnav_message_queue_rejected_total",
+    "Messages written synchronously because the write-behind queue was full",
+)
+MESSAGE_FLUSH_FAILURES = Counter(
+    "civicnav_message_flush_failures_total",
+    "Write-behind batch inserts that failed (retried, then written row by row)",
+)
+MESSAGE_ROWS_DROPPED = Counter(
+    "civicnav_message_rows_dropped_total",
+    "Write-behind message rows that could not be written even one at a time",
+)
+
+# --- Retrieval admission control ---
+RETRIEVAL_IN_FLIGHT = Gauge(
+    "civicnav_retrieval_in_flight",
+    "Chat embedding/retrieval calls currently running",
+)
+RETRIEVAL_QUEUED = Counter(
+    "civicnav_retrieval_queued_total",
+    "Chat retrieval calls that had to wait for a free slot",
+)
+RETRIEVAL_SHED = Counter(
+    "civicnav_retrieval_shed_total",
+    "Chat retrieval calls refused after the max queue wait",
+)
+RETRIEVAL_QUEUE_WAIT = Histogram(
+    "civicnav_retrieval_queue_wait_seconds",
+    "Time chat retrieval calls waited for a slot (admitted or shed)",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+RETRIEVAL_DEADLINE_FALLBACKS = Counter(
+    "civicnav_retrieval_deadline_fallbacks_total",
+    "Chat retrievals answered by keyword match because the model call "
+    "would not fit in the latency budget",
+)
@@ -1,12 +1,14 @@
 from enum import Enum
+from itertools import chain
 import uuid
 from datetime import datetime, timezone
 from typing import List, Optional, Dict, Any
 
-from sqlalchemy import Column, Integer, String, Text, event
+from sqlalchemy import Column, Index, Integer, String, Table, Text, event
 from sqlalchemy.dialects.sqlite import JSON
 from sqlalchemy.engine import Connection
 from sqlalchemy.orm import DeclarativeBase, Mapper  # type: ignore
+from sqlalchemy.orm import Session as OrmSession, UOWTransaction
 from sqlmodel import Field, Relationship, SQLModel  # type: ignore
 
 
@@ -71,6 +73,8 @@ class Conversation(SQLModel, table=True):
         default=None,
         sa_column=Column(JSON, nullable=True)
     )
+    # Bumped on every flow-state write; cached copies compare it on write
+    version: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
 
     user: Optional["User"] = Relationship(back_populates="conversations")
     messages: List["Message"] = Relationship(back_populates="conversation")
@@ -78,8 +82,13 @@ class Conversation(SQLModel, table=True):
 
 # ---------- Messages ----------
 class Message(SQLModel, table=True):
+    # Covers lookups by conversation_id as well as its messages in order
+    __table_args__ = (
+        Index("ix_message_conversation_id_timestamp", "conversation_id", "timestamp"),
+    )
+
     id: str = Field(default_factory=lambda: str(uuid.uuid4()), primary_key=True)
-    conversation_id: str = Field(foreign_key="conversation.id", index=True)
+    conversation_id: str = Field(foreign_key="conversation.id")
     sender: Sender
     text: str
     timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
@@ -89,6 +98,14 @@ class Message(SQLModel, table=True):
 
 # ---------- Incidents ----------
 class Incident(SQLModel, table=True):
+    # Staff list keyset order is (updated_at, id), optionally within one filter value
+    __table_args__ = (
+        Index("ix_incident_updated_at_id", "updated_at", "id"),
+        Index("ix_incident_status_updated_at_id", "status", "updated_at", "id"),
+        Index("ix_incident_category_updated_at_id", "category", "updated_at", "id"),
+        Index("ix_incident_priority_updated_at_id", "priority", "updated_at", "id"),
+    )
+
     id: str = Field(default_factory=lambda: str(uuid.uuid4()), primary_key=True)
     public_id: str = Field(index=True, unique=True)
     title: str
@@ -100,6 +117,8 @@ class Incident(SQLModel, table=True):
     status: IncidentStatus = Field(default=IncidentStatus.new)
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    # Chat flow that filed it; a replayed final step finds it instead of refiling
+    flow_id: Optional[str] = Field(default=None, index=True, unique=True)
 
     history: List["IncidentHistory"] = Relationship(back_populates="incident")
 
@@ -112,8 +131,15 @@ def update_timestamp(mapper: Mapper, connection: Connection, target: Incident) -
 
 # ---------- Incident History ----------
 class IncidentHistory(SQLModel, table=True):
+    # Covers lookups by incident_id as well as the latest entry per incident
+    __table_args__ = (
+        Index("ix_incidenthistory_incident_id_timestamp", "incident_id", "timestamp"),
+        # Change cursor of the staff-wide incident event feed
+        Index("ix_incidenthistory_timestamp_id", "timestamp", "id"),
+    )
+
     id: str = Field(default_factory=lambda: str(uuid.uuid4()), primary_key=True)
-    incident_id: str = Field(foreign_key="incident.id", index=True)
+    incident_id: str = Field(foreign_key="incident.id")
     status: IncidentStatus
     note: Optional[str] = Field(default=None)
     actor_user_id: Optional[str] = Field(default=None, foreign_key="user.id", index=True)
@@ -157,3 +183,38 @@ class KBChunk(SQLModel, table=True):
         """Deserialize the stored embedding JSON string."""
         import json
         return json.loads(self.embedding) if self.embedding else None
+
+
+# ---------- KB generation ----------
+class KBGeneration(SQLModel, table=True):
+    """
+    Single-row counter bumped by every transaction that writes `KBChunk`
+    rows, so a process can tell its in-memory KB index is stale with one
+    primary-key read.
+    """
+    id: int = Field(default=1, primary_key=True)
+    generation: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+
+
+@event.listens_for(KBGeneration.__table__, "after_create")  # type: ignore
+def seed_kb_generation(target: Table, connection: Connection, **_kw: Any) -> None:
+    connection.execute(target.insert().values(id=1, generation=0))
+
+
+@event.listens_for(OrmSession, "after_flush")
+def bump_kb_generation(session: OrmSession, _flush_context: UOWTransaction) -> None:
+    """
+    Bump the KB generation in the transaction of any ORM flush that inserts,
+    changes or deletes chunks. Bulk `update()`/`delete()` statements skip
+    the flush, so callers issuing them on `KBChunk` bump it themselves.
+    """
+    touched = chain(session.new, session.dirty, session.deleted)
+    if not any(isinstance(obj, KBChunk) for obj in touched):
+        return
+    table = KBGeneration.__table__  # type: ignore[attr-defined]
+    result = session.connection().execute(
+        table.update().values(generation=table.c.generation + 1)
+    )
+    if result.rowcount == 0:
+        session.connection().execute(table.insert().values(id=1, generation=1))
+    session.info["kb_changed"] = True
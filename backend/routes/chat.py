@@ -1,53 +1,226 @@
-from fastapi import APIRouter, Depends
-from sqlmodel import Session, select
+import asyncio
+import json
+import logging
+import time
+from dataclasses import replace
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from jose import JWTError
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session as OrmSession
+from sqlmodel import Session, col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from uuid import uuid4
 from datetime import datetime, timezone
-from typing import List, Tuple
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, cast
 
-from backend.db import get_session
-from backend.utils.helpers import generate_public_id
+import numpy as np
+from numpy.typing import NDArray
+
+from backend.db import get_async_session
+from backend.metrics import RETRIEVAL_DEADLINE_FALLBACKS
+from backend.settings import settings
 from backend.models import Conversation, Message, Sender, KBDoc, Incident, IncidentStatus
 from backend.schemas import ChatIn, ChatOut, Citation
-from backend.utils.search import score_text, best_snippet
+from backend.utils.admission import OverloadedError, retrieval_admission
+from backend.utils.conversation_cache import CachedConversation, conversation_cache
+from backend.utils.deadline import Deadline, LatencyEstimate
+from backend.utils.kb_index import keyword_docs, top_docs
+from backend.utils.public_ids import incident_ids
+from backend.utils.search import best_snippet, embed_queries
+from backend.utils.write_behind import message_writer
 from backend.utils.intent import IntentClassifier
+from backend.utils.security import create_flow_token, decode_flow_token
+
+logger = logging.getLogger("civicnavigator")
 
 router = APIRouter(prefix="/api/chat", tags=["chat"])
 
-classifier = IntentClassifier()
+classifier = IntentClassifier(encode=embed_queries)
 
+# How long a single-message model call takes, to know whether one still fits
+embed_latency = LatencyEstimate()
 
-@router.post("/message", response_model=ChatOut)
-async def chat_message(payload: ChatIn, session: Session = Depends(get_session)):
-    session_id = payload.session_id or str(uuid4())
+# Keyword matches are weaker evidence than embedding similarity
+DEGRADED_CONFIDENCE_FACTOR = 0.5
+
+
+async def load_conversation(
+    session: AsyncSession, session_id: str
+) -> CachedConversation:
+    """Find or create the conversation for a session (cache first, then DB)."""
+    convo = conversation_cache.get(session_id)
+    if convo is None:
+        row = (
+            await session.exec(
+                select(Conversation).where(Conversation.session_id == session_id)
+            )
+        ).first()
+        if not row:
+            row = Conversation(
+                session_id=session_id, user_id=None, pending_intent=None, state={}
+            )
+            session.add(row)
+            await session.flush()
+        convo = CachedConversation.from_row(row)
+    return convo
+
+
+async def embed_message(
+    message: str, deadline: Deadline
+) -> Tuple[Optional[NDArray[np.float32]], Optional[str]]:
+    """
+    Embed one message off the event loop, under retrieval admission control
+    and within the turn's latency budget.
+
+    Returns (vector, None), or (None, reason) when the model was skipped:
+    "deadline" if the call would not fit in the remaining budget, "shed" if
+    admission control refused it.
+    """
+    if not deadline.allows(embed_latency.value_ms):
+        RETRIEVAL_DEADLINE_FALLBACKS.inc()
+        return None, "deadline"
+    max_wait_ms = deadline.remaining_ms() - embed_latency.value_ms
+    async with retrieval_admission.slot(max_wait_ms) as admitted:
+        if not admitted:
+            return None, "shed"
+        start = time.perf_counter()
+        vec = (await asyncio.to_thread(embed_queries, [message]))[0]
+        embed_latency.observe((time.perf_counter() - start) * 1000)
+        return vec, None
+
+
+def _sqlmodel(sync_session: OrmSession) -> Session:
+    """
+    The session `run_sync` hands over. SQLModel's AsyncSession wraps a SQLModel
+    Session, but SQLAlchemy types it as the plain ORM one.
+    """
+    return cast(Session, sync_session)
+
+
+def flow_from_token(
+    token: str, session_id: Optional[str]
+) -> Optional[CachedConversation]:
+    """
+    The conversation and pending flow carried by a signed flow token, or None
+    if the token is invalid, expired or issued for another session.
+    """
+    try:
+        claims = decode_flow_token(token)
+    except JWTError:
+        return None
+    if session_id and claims.get("sid") != session_id:
+        return None
+    return CachedConversation(
+        id=claims["cid"],
+        session_id=claims["sid"],
+        pending_intent=claims.get("pi"),
+        state=dict(claims.get("st") or {}),
+    )
+
+
+class StaleConversationError(Exception):
+    """The conversation, or its flow, moved on after this turn read it."""
+
+    def __init__(self, session_id: str) -> None:
+        super().__init__(session_id)
+        self.session_id = session_id
+
+
+async def chat_turn(
+    payload: ChatIn,
+    session: AsyncSession,
+    convo: Optional[CachedConversation] = None,
+) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Run one chat turn, yielding (event, data) pairs as each stage completes:
+    "ack", "intent", one "citation" per ranked KB doc, and finally "final"
+    with the `ChatOut`.
+
+    Callers that already hold the conversation (e.g. a WebSocket bound to
+    it) pass `convo`; it is updated in place.
+
+    With `CHAT_FLOW_TOKENS` on (and no `convo` passed), pending flow state
+    is returned to the client as `ChatOut.flow_token` instead of being
+    written to the conversation row; a valid token on the next turn replaces
+    the cache/DB lookup entirely.
+
+    If the conversation was advanced elsewhere (another worker, another
+    socket) since it was read, the turn's writes are rolled back and it
+    re-runs on the row as it is now, or on its flow token, which a
+    concurrent replay of the same step cannot change. "ack" is not repeated;
+    if the discarded attempt already yielded events, a "reset" comes first so
+    streaming clients drop them.
+    """
+    deadline = Deadline(settings.CHAT_LATENCY_BUDGET_MS)
+    stateless = convo is None and settings.CHAT_FLOW_TOKENS
+    retried = False
+    while True:
+        emitted = False
+        try:
+            async for event, data in _run_turn(
+                payload, session, convo, stateless, deadline
+            ):
+                if event == "ack":
+                    if retried:
+                        continue
+                else:
+                    emitted = True
+                yield event, data
+            return
+        except StaleConversationError as exc:
+            # Each conflict means another turn committed, so this terminates
+            await session.rollback()
+            conversation_cache.invalidate(exc.session_id)
+            fresh = await load_conversation(session, exc.session_id)
+            if convo is not None:
+                vars(convo).update(vars(fresh))
+            elif not (stateless and payload.flow_token):
+                convo = fresh
+            retried = True
+            if emitted:
+                yield "reset", {}
+
+
+async def _run_turn(
+    payload: ChatIn,
+    session: AsyncSession,
+    convo: Optional[CachedConversation],
+    stateless: bool,
+    deadline: Deadline,
+) -> AsyncIterator[Tuple[str, Any]]:
+    if convo is None and stateless and payload.flow_token:
+        convo = flow_from_token(payload.flow_token, payload.session_id)
+    session_id = convo.session_id if convo else payload.session_id or str(uuid4())
+    yield "ack", {"session_id": session_id}
 
     # === 1. Find or create conversation ===
-    convo = session.exec(
-        select(Conversation).where(Conversation.session_id == session_id)
-    ).first()
-    if not convo:
-        convo = Conversation(
-            session_id=session_id, user_id=None, pending_intent=None, state={}
-        )
-        session.add(convo)
-        session.flush()
+    if convo is None:
+        convo = await load_conversation(session, session_id)
+    # Flow state as stored on the conversation row (a flow token's is not)
+    stored: Tuple[Optional[str], Dict[str, Any]] = (
+        (convo.pending_intent, dict(convo.state))
+        if convo.version is not None
+        else (None, {})
+    )
 
-    # === 2. Save user message ===
+    # === 2. Record user message (persisted with the bot reply in step 5) ===
     msg_user = Message(
         conversation_id=convo.id,
         sender=payload.role or Sender.resident,
         text=payload.message,
     )
-    session.add(msg_user)
 
     reply: str = ""
     confidence: float = 0.5
     citations: List[Citation] = []
 
-    # Ensure convo.state dict exists
-    if convo.state is None:
-        convo.state = {}
-
     # === 3. Handle pending intent (multi-turn state machine) ===
+    if convo.pending_intent:
+        yield "intent", {"intent": convo.pending_intent}
+
     if convo.pending_intent == "incident_report_flow":
         step = convo.state.get("step", "title")
 
@@ -69,19 +242,45 @@ async def chat_message(payload: ChatIn, session: Session = Depends(get_session))
 
         elif step == "description":
             convo.state = {**convo.state, "description": payload.message}
+            flow_id = convo.state.get("flow_id")
 
-            # Save incident
-            incident = Incident(
-                public_id=generate_public_id(),
-                title=convo.state.get("title") or "No Title",
-                category=convo.state.get("category") or "other",
-                location_text=convo.state.get("location_text"),
-                contact_email=convo.state.get("email"),
-                description=convo.state.get("description") or "",
-                status=IncidentStatus.open,
-                created_at=datetime.now(timezone.utc),
-            )
-            session.add(incident)
+            # A replayed final step (e.g. the same flow token sent twice)
+            # finds the incident its flow already filed
+            filed: Optional[Incident] = None
+            if flow_id:
+                filed = (
+                    await session.exec(select(Incident).where(Incident.flow_id == flow_id))
+                ).first()
+            if filed:
+                incident = filed
+            else:
+                # Save incident
+                incident = Incident(
+                    public_id=incident_ids.next_id(),
+                    title=convo.state.get("title") or "No Title",
+                    category=convo.state.get("category") or "other",
+                    location_text=convo.state.get("location_text"),
+                    contact_email=convo.state.get("email"),
+                    description=convo.state.get("description") or "",
+                    status=IncidentStatus.open,
+                    created_at=datetime.now(timezone.utc),
+                    flow_id=flow_id,
+                )
+                session.add(incident)
+                try:
+                    await session.flush()
+                except IntegrityError:
+                    # A concurrent replay of this step filed the flow's
+                    # incident after the check above; re-run to report it
+                    await session.rollback()
+                    replayed = (
+                        await session.exec(
+                            select(Incident.id).where(Incident.flow_id == flow_id)
+                        )
+                    ).first()
+                    if not flow_id or replayed is None:
+                        raise
+                    raise StaleConversationError(session_id) from None
 
             reply = (
                 f"✅ Thanks, I’ve filed your incident report: *{incident.title}*.\n"
@@ -96,7 +295,7 @@ async def chat_message(payload: ChatIn, session: Session = Depends(get_session))
         if "chat" in choice:
             reply = "Great — let’s file it here. What’s the title of this report?"
             convo.pending_intent = "incident_report_flow"
-            convo.state = {"step": "title"}
+            convo.state = {"step": "title", "flow_id": str(uuid4())}
         elif "form" in choice:
             reply = "Okay, opening the incident form for you…"
             convo.pending_intent = None
@@ -106,8 +305,10 @@ async def chat_message(payload: ChatIn, session: Session = Depends(get_session))
 
     elif convo.pending_intent == "status_check":
         # User should provide an incident ID
-        incident = session.exec(
-            select(Incident).where(Incident.public_id == payload.message.strip())
+        incident = (
+            await session.exec(
+                select(Incident).where(Incident.public_id == payload.message.strip())
+            )
         ).first()
         if incident:
             reply = f"ℹ️ The status of incident **{incident.public_id}** is: *{incident.status.value}*."
@@ -118,8 +319,19 @@ async def chat_message(payload: ChatIn, session: Session = Depends(get_session))
 
     else:
         # === 4. Detect intent on fresh message ===
-        intent, intent_conf = await classifier.classify_intent(payload.message)
+        # In embedding mode the message is encoded once, here, and the same
+        # vector serves both intent centroids and KB retrieval.
+        query_vec: Optional[NDArray[np.float32]] = None
+        skipped: Optional[str] = None  # why the model was not called, if it wasn't
+        if settings.INTENT_MODE == "embedding":
+            # Without a vector, intent falls back to the keyword rules
+            query_vec, skipped = await embed_message(payload.message, deadline)
+
+        intent, intent_conf = await classifier.classify_intent(
+            payload.message, query_vec=query_vec
+        )
         confidence = intent_conf
+        yield "intent", {"intent": intent, "confidence": intent_conf}
 
         if intent == "incident_report":
             reply = "Would you like to file this in chat, or open the incident form?"
@@ -131,33 +343,44 @@ async def chat_message(payload: ChatIn, session: Session = Depends(get_session))
 
         elif intent == "general_query":
             # === Knowledge base search (embedding-based) ===
-            docs: List[KBDoc] = session.exec(select(KBDoc)).all()
-
-            scored: List[Tuple[KBDoc, float]] = []
-            for d in docs:
-                kb_embeddings: List[str] = [c.embedding for c in d.chunks if c.embedding]
-                sim: float = score_text(payload.message, kb_embeddings)
-                scored.append((d, sim))
-
-            # filter out very low scores
-            scored = [t for t in scored if t[1] > 0.3]
-            scored.sort(key=lambda x: x[1], reverse=True)
-            top: List[Tuple[KBDoc, float]] = scored[:3]
+            if query_vec is None and skipped is None:
+                query_vec, skipped = await embed_message(payload.message, deadline)
+            vec = query_vec
+            # The index code is sync; run_sync drives it over the async connection
+            top: List[Tuple[KBDoc, float]]
+            if vec is not None:
+                top = await session.run_sync(
+                    lambda sync_session: top_docs(_sqlmodel(sync_session), vec, top_k=3)[0]
+                )
+            elif skipped == "shed" and settings.RETRIEVAL_SHED_MODE == "busy":
+                raise OverloadedError(settings.RETRIEVAL_RETRY_AFTER_SECONDS)
+            else:
+                # Shed or out of budget: keyword-only match, no model call
+                top = await session.run_sync(
+                    lambda sync_session: keyword_docs(
+                        _sqlmodel(sync_session), payload.message, top_k=3
+                    )
+                )
 
-            citations = [
-                Citation(
+            for d, _ in top:
+                # Past the deadline, cite the opening words instead of searching
+                citation = Citation(
                     title=d.title,
-                    snippet=best_snippet(payload.message, d.body),
+                    snippet=best_snippet(payload.message, d.body)
+                    if not deadline.expired()
+                    else " ".join(d.body.split()[:20]),
                     source_link=d.source_url,
                 )
-                for d, _ in top
-            ]
+                citations.append(citation)
+                yield "citation", citation
 
             if top:
                 reply = "Here’s what I found:\n" + "\n".join(
                     f"{i+1}. {c.title}" for i, c in enumerate(citations)
                 )
                 confidence = float(top[0][1])
+                if vec is None:
+                    confidence *= DEGRADED_CONFIDENCE_FACTOR
             else:
                 reply = "I couldn’t find a reliable answer in the KB. Could you clarify?"
                 confidence = 0.2
@@ -165,18 +388,172 @@ async def chat_message(payload: ChatIn, session: Session = Depends(get_session))
         else:
             reply = "I’m not sure I understood. Could you clarify?"
 
-    # === 5. Save bot reply ===
+    # === 5. Save bot reply, writing conversation changes through ===
     msg_bot = Message(
         conversation_id=convo.id,
         sender=Sender.bot,
         text=reply,
     )
-    session.add(msg_bot)
-    session.commit()
+    # With write-behind on, message rows are batched off the request path and
+    # queued only after the conversation row is committed.
+    write_behind = message_writer.running
+    if not write_behind:
+        session.add_all([msg_user, msg_bot])
+    # Flow tokens keep pending state off the row; only clear what a turn
+    # before the option was enabled may have left there.
+    persisted = replace(convo, pending_intent=None, state={}) if stateless else convo
+    if (persisted.pending_intent, persisted.state) != stored:
+        # Only write over the version this turn read; a cached copy may be stale
+        result = await session.exec(  # type: ignore[call-overload]
+            update(Conversation)
+            .where(
+                col(Conversation.id) == convo.id,
+                col(Conversation.version) == persisted.version,
+            )
+            .values(
+                pending_intent=persisted.pending_intent,
+                state=persisted.state,
+                version=Conversation.version + 1,
+            )
+        )
+        if persisted.version is None or result.rowcount == 0:
+            raise StaleConversationError(session_id)
+        persisted.version += 1
+    await session.commit()
+    if write_behind and not message_writer.submit([msg_user, msg_bot]):
+        session.add_all([msg_user, msg_bot])
+        await session.commit()
+    if persisted.version is not None:
+        conversation_cache.put(persisted)
+
+    flow_token: Optional[str] = None
+    if stateless and convo.pending_intent:
+        flow_token = create_flow_token(
+            convo.id, session_id, convo.pending_intent, convo.state
+        )
 
-    return ChatOut(
+    yield "final", ChatOut(
         reply=reply,
         citations=citations,
         confidence=confidence,
         session_id=session_id,
+        flow_token=flow_token,
     )
+
+
+@router.post("/message", response_model=ChatOut)
+async def chat_message(
+    payload: ChatIn, session: AsyncSession = Depends(get_async_session)
+):
+    try:
+        async for event, data in chat_turn(payload, session):
+            if event == "final":
+                return data
+    except OverloadedError as exc:
+        raise HTTPException(
+            status_code=503,
+            detail="The assistant is busy, please retry shortly",
+            headers={"Retry-After": str(exc.retry_after)},
+        ) from exc
+    raise RuntimeError("chat turn ended without a reply")
+
+
+def _sse(event: str, data: Any) -> str:
+    body = data.model_dump_json() if isinstance(data, BaseModel) else json.dumps(data)
+    return f"event: {event}\ndata: {body}\n\n"
+
+
+@router.post("/message/stream")
+async def chat_message_stream(
+    payload: ChatIn, session: AsyncSession = Depends(get_async_session)
+) -> StreamingResponse:
+    """
+    Same turn as `/message`, streamed as Server-Sent Events so the client can
+    render the acknowledgement, intent and each citation before the reply.
+    A turn shed by admission control in "busy" mode ends with a "busy" event;
+    one that fails after the response has started ends with an "error" event
+    (its writes rolled back), since the status code is already sent. A
+    "reset" event means the turn is re-running on a conversation changed
+    elsewhere: discard the intent and citations received so far.
+    """
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            async for event, data in chat_turn(payload, session):
+                yield _sse(event, data)
+        except OverloadedError as exc:
+            await session.rollback()
+            yield _sse("busy", {"retry_after": exc.retry_after})
+        except Exception:
+            logger.exception("Streamed chat turn failed")
+            await session.rollback()
+            yield _sse("error", {"detail": "Something went wrong, please retry"})
+        finally:
+            await session.close()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/ws")
+async def chat_ws(
+    websocket: WebSocket,
+    session_id: Optional[str] = None,
+    session: AsyncSession = Depends(get_async_session),
+) -> None:
+    """
+    Chat over one WebSocket bound to one conversation. The conversation is
+    loaded once on connect and kept in memory for the life of the connection;
+    each incoming {"message": ...} runs the same turn as `/message`, and its
+    events are sent back as {"event": ..., "data": ...} frames. A turn that
+    fails is rolled back and answered with an "error" frame; the socket
+    stays open. As on the stream endpoint, a "reset" frame voids the turn's
+    earlier frames.
+    """
+    await websocket.accept()
+    convo = await load_conversation(session, session_id or str(uuid4()))
+    await session.commit()  # persist a new conversation; idle sockets hold no transaction
+
+    try:
+        while True:
+            raw = await websocket.receive_text()
+            try:
+                payload = ChatIn.model_validate_json(raw)
+            except ValidationError as exc:
+                detail = exc.errors(include_url=False, include_context=False)
+                await websocket.send_json({"event": "error", "data": {"detail": detail}})
+                continue
+            payload.session_id = convo.session_id
+
+            # A failed turn is rolled back, so its in-place changes are undone too
+            before = replace(convo, state=dict(convo.state))
+            try:
+                async for event, data in chat_turn(payload, session, convo=convo):
+                    await websocket.send_json(
+                        {
+                            "event": event,
+                            "data": data.model_dump(mode="json")
+                            if isinstance(data, BaseModel)
+                            else data,
+                        }
+                    )
+            except OverloadedError as exc:
+                await session.rollback()
+                vars(convo).update(vars(before))
+                await websocket.send_json(
+                    {"event": "busy", "data": {"retry_after": exc.retry_after}}
+                )
+            except WebSocketDisconnect:
+                raise
+            except Exception:
+                logger.exception("WebSocket chat turn failed")
+                await session.rollback()
+                vars(convo).update(vars(before))
+                await websocket.send_json(
+                    {"event": "error", "data": {"detail": "Something went wrong, please retry"}}
+                )
+    except WebSocketDisconnect:
+        pass
@@ -1,13 +1,27 @@
 from datetime import datetime, timezone
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
+from itertools import groupby
+from typing import AsyncIterator, Dict, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session, col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from backend.db import get_session
-from backend.utils.helpers import generate_public_id
+from backend.db import get_async_session, get_session
+from backend.utils.helpers import decode_cursor
+from backend.utils.incident_events import Cursor, event_stream, incident_events
+from backend.utils.public_ids import incident_ids
+from backend.utils.status_cache import (
+    CachedStatus,
+    etag_matches,
+    status_cache,
+    status_etag,
+)
 from backend.models import Incident, IncidentHistory, IncidentStatus
 from backend.schemas import (
     IncidentCreate,
     IncidentCreated,
+    IncidentStatusBatchIn,
+    IncidentStatusBatchOut,
     IncidentStatusOut,
     IncidentHistoryItem,
 )
@@ -17,7 +31,7 @@ router = APIRouter(prefix="/api", tags=["incidents"])
 
 @router.post("/incidents", response_model=IncidentCreated)
 def create_incident(payload: IncidentCreate, session: Session = Depends(get_session)):
-    public_id = generate_public_id()
+    public_id = incident_ids.next_id()
     now = datetime.now(timezone.utc)
 
     inc = Incident(
@@ -44,6 +58,7 @@ def create_incident(payload: IncidentCreate, session: Session = Depends(get_sess
     session.add(hist)
     session.commit()
     session.refresh(inc)
+    incident_events.publish(inc.public_id)
 
     return IncidentCreated(
         incident_id=inc.public_id,
@@ -53,33 +68,156 @@ def create_incident(payload: IncidentCreate, session: Session = Depends(get_sess
 
 
 @router.get("/incidents/{public_id}/status", response_model=IncidentStatusOut)
-def get_status(public_id: str, session: Session = Depends(get_session)):
-    # ✅ Modern SQLModel query
-    inc = session.exec(select(Incident).where(Incident.public_id == public_id)).first()
-    if not inc:
+async def get_status(
+    public_id: str,
+    request: Request,
+    response: Response,
+    session: AsyncSession = Depends(get_async_session),
+):
+    """
+    Public status of an incident, served from the status cache when possible.
+    Carries a strong ETag; a matching If-None-Match gets 304 Not Modified.
+    """
+    cached = status_cache.get(public_id)
+    if cached is None:
+        generation = status_cache.generation
+        cached = await load_status(session, public_id)
+        status_cache.put(public_id, cached, generation)
+
+    headers = {"ETag": cached.etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), cached.etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return cached.status
+
+
+@router.post("/incidents/status:batch", response_model=IncidentStatusBatchOut)
+async def get_status_batch(
+    payload: IncidentStatusBatchIn,
+    session: AsyncSession = Depends(get_async_session),
+) -> IncidentStatusBatchOut:
+    """
+    Public status of many incidents at once. IDs in the status cache are
+    answered from it; the rest are loaded with one query for the incidents
+    and one for all of their history.
+    """
+    public_ids = list(dict.fromkeys(pid.strip() for pid in payload.incident_ids))
+    found: Dict[str, CachedStatus] = {}
+    misses: List[str] = []
+    for public_id in public_ids:
+        cached = status_cache.get(public_id)
+        if cached is None:
+            misses.append(public_id)
+        else:
+            found[public_id] = cached
+
+    if misses:
+        generation = status_cache.generation
+        loaded = await load_statuses(session, misses)
+        for public_id, cached in loaded.items():
+            status_cache.put(public_id, cached, generation)
+        found.update(loaded)
+
+    return IncidentStatusBatchOut(
+        results={
+            pid: found[pid].status if pid in found else None for pid in public_ids
+        },
+        not_found=[pid for pid in public_ids if pid not in found],
+    )
+
+
+async def load_status(session: AsyncSession, public_id: str) -> CachedStatus:
+    cached = (await load_statuses(session, [public_id])).get(public_id)
+    if cached is None:
         raise HTTPException(status_code=404, detail="Unknown incident ID")
+    return cached
+
+
+async def load_statuses(
+    session: AsyncSession, public_ids: List[str]
+) -> Dict[str, CachedStatus]:
+    """Status of each existing incident in `public_ids`, in two queries."""
+    incidents = (
+        await session.exec(
+            select(Incident).where(Incident.public_id.in_(public_ids))  # type: ignore[attr-defined]
+        )
+    ).all()
+    if not incidents:
+        return {}
 
     history = (
-        session.exec(
+        await session.exec(
             select(IncidentHistory)
-            .where(IncidentHistory.incident_id == inc.id)
-            .order_by(IncidentHistory.timestamp)
-        ).all()
-    )
+            .where(
+                IncidentHistory.incident_id.in_([inc.id for inc in incidents])  # type: ignore[attr-defined]
+            )
+            .order_by(col(IncidentHistory.incident_id), col(IncidentHistory.timestamp))
+        )
+    ).all()
+    history_by_incident = {
+        incident_id: [
+            IncidentHistoryItem(
+                note=h.note,
+                status=h.status.value,
+                timestamp=h.timestamp,
+            )
+            for h in rows
+        ]
+        for incident_id, rows in groupby(history, key=lambda h: h.incident_id)
+    }
 
-    items = [
-        IncidentHistoryItem(
-            note=h.note,
-            status=h.status.value,
-            timestamp=h.timestamp,
+    out: Dict[str, CachedStatus] = {}
+    for inc in incidents:
+        items = history_by_incident.get(inc.id, [])
+        last_update = items[-1].timestamp if items else inc.updated_at
+        out[inc.public_id] = CachedStatus(
+            IncidentStatusOut(
+                status=inc.status.value,
+                last_update=last_update,
+                history=items,
+            ),
+            status_etag(inc.id, inc.updated_at, len(items)),
         )
-        for h in history
-    ]
+    return out
 
-    last_update = items[-1].timestamp if items else inc.updated_at
 
-    return IncidentStatusOut(
-        status=inc.status.value,
-        last_update=last_update,
-        history=items,
+def resume_cursor(request: Request, cursor: Optional[str]) -> Optional[Cursor]:
+    """Where an event stream resumes: the SSE Last-Event-ID header, else `cursor`."""
+    raw = request.headers.get("last-event-id") or cursor
+    if not raw:
+        return None
+    try:
+        return decode_cursor(raw)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
+
+
+def sse_response(frames: AsyncIterator[str]) -> StreamingResponse:
+    return StreamingResponse(
+        frames,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/incidents/{public_id}/events")
+async def incident_events_stream(
+    public_id: str,
+    request: Request,
+    cursor: Optional[str] = None,
+    session: AsyncSession = Depends(get_async_session),
+) -> StreamingResponse:
+    """
+    Server-Sent Events for one incident: a "status" event for each history
+    entry recorded after the client connected (or after `Last-Event-ID` /
+    `cursor`, when resuming), pushed as soon as it is committed.
+    """
+    incident_id = (
+        await session.exec(select(Incident.id).where(Incident.public_id == public_id))
+    ).first()
+    if not incident_id:
+        raise HTTPException(status_code=404, detail="Unknown incident ID")
+    after = resume_cursor(request, cursor)
+    return sse_response(
+        event_stream(session, public_id=public_id, incident_id=incident_id, after=after)
     )
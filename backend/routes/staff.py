@@ -1,54 +1,145 @@
+import io
+import tempfile
+import uuid
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, Iterator, List, Optional, Sequence, Tuple, TypeVar
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlmodel import Session, select
-from sqlalchemy import desc
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session, col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import func, insert, tuple_, update
+from sqlalchemy.sql import ColumnElement
 
-from backend.db import get_session
+from backend.db import get_async_session, get_session
 from backend.models import Incident, IncidentHistory, IncidentStatus, KBDoc
 from backend.schemas import (
+    BULK_MAX_INCIDENTS,
+    IncidentImportError,
+    IncidentImportOut,
+    StaffIncidentBulkUpdateIn,
+    StaffIncidentBulkUpdateOut,
     StaffIncidentListItem,
     StaffIncidentUpdateIn,
     KBSearchOut,
     KBSearchResultItem,
+    KBBatchSearchIn,
+    KBBatchSearchOut,
+    KBBatchSearchResult,
 )
 from backend.deps import require_staff
-from backend.utils.search import score_text, best_snippet
+from backend.routes.incidents import resume_cursor, sse_response
+from backend.utils.helpers import decode_cursor, encode_cursor
+from backend.settings import settings
+from backend.utils.incident_events import event_stream, incident_events
+from backend.utils.incident_export import (
+    ExportFormat,
+    encode_batches,
+    gzip_chunks,
+    iter_export,
+)
+from backend.utils.incident_import import ImportFormat, import_incidents
+from backend.utils.kb_index import MIN_SCORE, top_docs
+from backend.utils.search import score_text, best_snippet, embed_queries
+from backend.utils.status_cache import status_cache
 
 router = APIRouter(prefix="/api/staff", tags=["staff"])
 
+# Incidents per UPDATE / history executemany in bulk updates (keeps IN lists
+# under bind-parameter limits)
+BULK_CHUNK = 500
+
+T = TypeVar("T")
+
+
+def chunked(items: Sequence[T], size: int) -> List[Sequence[T]]:
+    return [items[i : i + size] for i in range(0, len(items), size)]
+
 
 # ---- Incidents ----
+def parse_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        return decode_cursor(cursor)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
+
+
+def incident_filters(
+    status: Optional[IncidentStatus] = None,
+    category: Optional[str] = None,
+    priority: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+) -> List[ColumnElement[bool]]:
+    """WHERE clauses for the staff incident filters; None means no filter."""
+    clauses: List[ColumnElement[bool]] = []
+    if status is not None:
+        clauses.append(col(Incident.status) == status)
+    if category is not None:
+        clauses.append(col(Incident.category) == category)
+    if priority is not None:
+        clauses.append(col(Incident.priority) == priority)
+    if created_from is not None:
+        clauses.append(col(Incident.created_at) >= created_from)
+    if created_to is not None:
+        clauses.append(col(Incident.created_at) < created_to)
+    return clauses
+
+
 @router.get("/incidents", response_model=list[StaffIncidentListItem])
-def list_incidents(
-    page: int = Query(1, ge=1),
+async def list_incidents(
+    response: Response,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
     page_size: int = Query(20, ge=1, le=100),
-    session: Session = Depends(get_session),
+    status: Optional[IncidentStatus] = None,
+    category: Optional[str] = None,
+    priority: Optional[str] = None,
+    created_from: Optional[datetime] = Query(None, description="created_at >= this"),
+    created_to: Optional[datetime] = Query(None, description="created_at < this"),
+    session: AsyncSession = Depends(get_async_session),
     staff_user: Any = Depends(require_staff),
 ) -> list[StaffIncidentListItem]:
-    """List all incidents with their latest update timestamp, paginated."""
-    offset = (page - 1) * page_size
-    rows = session.exec(
-        select(Incident).offset(offset).limit(page_size)
-    ).all()
+    """
+    List incidents, most recently updated first, with their latest update
+    timestamp. Pages are keyset-paginated on (updated_at, id): when more rows
+    follow, the `X-Next-Cursor` response header holds the `cursor` for the
+    next page.
+    """
+    # Latest history entry per incident, resolved in the same query as the page
+    last_history = (
+        select(func.max(IncidentHistory.timestamp))
+        .where(IncidentHistory.incident_id == Incident.id)
+        .correlate(Incident)
+        .scalar_subquery()
+    )
+    stmt = select(Incident, last_history).where(
+        *incident_filters(status, category, priority, created_from, created_to)
+    )
+    if cursor is not None:
+        after = tuple_(*parse_cursor(cursor))  # type: ignore[arg-type]
+        stmt = stmt.where(tuple_(col(Incident.updated_at), col(Incident.id)) < after)
+    stmt = stmt.order_by(
+        Incident.updated_at.desc(), Incident.id.desc()  # type: ignore[attr-defined]
+    ).limit(page_size + 1)
+    rows = (await session.exec(stmt)).all()
 
-    out: list[StaffIncidentListItem] = []
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1][0]
+        response.headers["X-Next-Cursor"] = encode_cursor(last.updated_at, last.id)
 
-    for inc in rows:
-        h = session.exec(
-            select(IncidentHistory)
-            .where(IncidentHistory.incident_id == inc.id)
-            .order_by(desc(IncidentHistory.timestamp))
-        ).first()
+    out: list[StaffIncidentListItem] = []
 
-        last_ts = h.timestamp if h else inc.updated_at
+    for inc, last_history_ts in rows:
+        last_ts = last_history_ts or inc.updated_at
 
         out.append(
             StaffIncidentListItem(
                 incident_id=inc.public_id,
                 title=inc.title,
                 category=inc.category,
+                priority=inc.priority,
                 description=inc.description,
                 status=inc.status.value
                 if isinstance(inc.status, IncidentStatus)
@@ -60,6 +151,108 @@ def list_incidents(
     return out
 
 
+@router.get("/incidents/events")
+async def staff_incident_events(
+    request: Request,
+    cursor: Optional[str] = None,
+    session: AsyncSession = Depends(get_async_session),
+    staff_user: Any = Depends(require_staff),
+) -> StreamingResponse:
+    """
+    Server-Sent Events feed of every incident change (creation and status
+    updates), resumable with `Last-Event-ID` / `cursor`.
+    """
+    return sse_response(event_stream(session, after=resume_cursor(request, cursor)))
+
+
+EXPORT_MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+@router.get("/incidents/export")
+def export_incidents(
+    export_format: ExportFormat = Query("csv", alias="format"),
+    gzip: bool = False,
+    status: Optional[IncidentStatus] = None,
+    category: Optional[str] = None,
+    priority: Optional[str] = None,
+    created_from: Optional[datetime] = Query(None, description="created_at >= this"),
+    created_to: Optional[datetime] = Query(None, description="created_at < this"),
+    session: Session = Depends(get_session),
+    staff_user: Any = Depends(require_staff),
+) -> StreamingResponse:
+    """
+    Download incidents (with their history) matching the staff list filters
+    as CSV or NDJSON, optionally gzipped. Rows are streamed in batches of
+    INCIDENT_EXPORT_BATCH_SIZE, so memory use does not grow with the export.
+    """
+    filters = incident_filters(status, category, priority, created_from, created_to)
+
+    def body() -> Iterator[str]:
+        try:
+            yield from encode_batches(
+                iter_export(session, filters, settings.INCIDENT_EXPORT_BATCH_SIZE),
+                export_format,
+            )
+        finally:
+            session.close()
+
+    filename = f"incidents.{export_format}"
+    media_type = EXPORT_MEDIA_TYPES[export_format]
+    content: Iterator[Any] = body()
+    if gzip:
+        filename, media_type, content = f"{filename}.gz", "application/gzip", gzip_chunks(content)
+    return StreamingResponse(
+        content,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.post("/incidents/import", response_model=IncidentImportOut)
+async def import_incidents_route(
+    request: Request,
+    import_format: Optional[ImportFormat] = Query(None, alias="format"),
+    session: Session = Depends(get_session),
+    staff_user: Any = Depends(require_staff),
+) -> IncidentImportOut:
+    """
+    Bulk-create incidents from an NDJSON or CSV (header row) body. The format
+    comes from `format`, else the Content-Type. Valid records are inserted in
+    batches of INCIDENT_IMPORT_BATCH_SIZE, one transaction each; invalid ones
+    are reported by line number.
+    """
+    fmt: ImportFormat = import_format or (
+        "csv" if "csv" in request.headers.get("content-type", "") else "ndjson"
+    )
+    # Spooled so large uploads hit disk, not memory; parsed lazily from there
+    with tempfile.SpooledTemporaryFile(
+        max_size=settings.INCIDENT_IMPORT_SPOOL_BYTES
+    ) as spool:
+        async for chunk in request.stream():
+            spool.write(chunk)
+        spool.seek(0)
+        text = io.TextIOWrapper(spool, encoding="utf-8-sig", newline="")  # type: ignore[arg-type]
+        try:
+            report = await run_in_threadpool(
+                import_incidents,
+                session,
+                text,
+                fmt,
+                settings.INCIDENT_IMPORT_BATCH_SIZE,
+                getattr(staff_user, "id", None),
+            )
+        except UnicodeDecodeError as exc:
+            raise HTTPException(status_code=400, detail="Body must be UTF-8") from exc
+        finally:
+            text.detach()
+
+    return IncidentImportOut(
+        imported=report.imported,
+        failed=report.failed,
+        errors=[IncidentImportError(line=line, error=error) for line, error in report.errors],
+    )
+
+
 @router.patch("/incidents/{public_id}")
 def update_incident(
     public_id: str,
@@ -89,6 +282,8 @@ def update_incident(
     )
     session.add(hist)
     session.commit()
+    status_cache.invalidate(inc.public_id)
+    incident_events.publish(inc.public_id)
 
     return {
         "incident_id": inc.public_id,
@@ -97,6 +292,83 @@ def update_incident(
     }
 
 
+@router.post("/incidents/status:bulk", response_model=StaffIncidentBulkUpdateOut)
+def bulk_update_incidents(
+    payload: StaffIncidentBulkUpdateIn,
+    session: Session = Depends(get_session),
+    staff_user: Any = Depends(require_staff),
+) -> StaffIncidentBulkUpdateOut:
+    """
+    Move many incidents (listed by `incident_ids`, or matching `filter`) to
+    one status in a single transaction: one UPDATE and one history insert
+    per BULK_CHUNK incidents. Incidents already in that status are left
+    untouched. A filter matching more than BULK_MAX_INCIDENTS incidents is
+    rejected with 422, the same cap as on `incident_ids`.
+    """
+    stmt = select(Incident.id, Incident.public_id, Incident.status)
+    rows: List[Tuple[str, str, str]] = []
+    not_found: List[str] = []
+    if payload.incident_ids is not None:
+        public_ids = list(dict.fromkeys(payload.incident_ids))
+        for id_chunk in chunked(public_ids, BULK_CHUNK):
+            rows += session.exec(
+                stmt.where(col(Incident.public_id).in_(id_chunk))
+            ).all()
+        found = {public_id for _, public_id, _ in rows}
+        not_found = [pid for pid in public_ids if pid not in found]
+    elif payload.filter is not None:
+        # One row over the cap tells a too-broad filter from one that fits
+        rows += session.exec(
+            stmt.where(*incident_filters(**payload.filter.model_dump())).limit(
+                BULK_MAX_INCIDENTS + 1
+            )
+        ).all()
+        if len(rows) > BULK_MAX_INCIDENTS:
+            raise HTTPException(
+                status_code=422,
+                detail=f"Filter matches more than {BULK_MAX_INCIDENTS} incidents; narrow it.",
+            )
+
+    targets = [(id_, public_id) for id_, public_id, status in rows if status != payload.status]
+    now = datetime.now(timezone.utc)
+    note = payload.note or f"Status changed to {payload.status.value}"
+    actor_user_id = getattr(staff_user, "id", None)
+    for target_chunk in chunked(targets, BULK_CHUNK):
+        ids = [id_ for id_, _ in target_chunk]
+        session.exec(
+            update(Incident)  # type: ignore[call-overload]
+            .where(Incident.id.in_(ids))  # type: ignore[attr-defined]
+            .values(status=payload.status, updated_at=now)
+        )
+        session.exec(
+            insert(IncidentHistory),  # type: ignore[call-overload]
+            params=[
+                {
+                    "id": str(uuid.uuid4()),
+                    "incident_id": id_,
+                    "status": payload.status,
+                    "note": note,
+                    "actor_user_id": actor_user_id,
+                    "timestamp": now,
+                }
+                for id_ in ids
+            ],
+        )
+    session.commit()
+
+    for _, public_id in targets:
+        status_cache.invalidate(public_id)
+        incident_events.publish(public_id)
+
+    return StaffIncidentBulkUpdateOut(
+        status=payload.status.value,
+        matched=len(rows),
+        updated=len(targets),
+        unchanged=len(rows) - len(targets),
+        not_found=not_found,
+    )
+
+
 # ---- KB ----
 @router.get("/kb/search", response_model=KBSearchOut)
 def kb_search(
@@ -146,3 +418,40 @@ def kb_search(
         )
 
     return {"results": out}
+
+
+@router.post("/kb/search:batch", response_model=KBBatchSearchOut)
+def kb_search_batch(
+    payload: KBBatchSearchIn,
+    session: Session = Depends(get_session),
+    _: Any = Depends(require_staff),
+) -> KBBatchSearchOut:
+    """
+    Search the knowledge base for many queries at once: one batched encode
+    and one matrix multiplication against the chunk index.
+    """
+    queries = [q.strip() for q in payload.queries]
+    active = [i for i, q in enumerate(queries) if q]
+    ranked: list[list[tuple[KBDoc, float]]] = [[] for _ in queries]
+
+    if active:
+        vecs = embed_queries([queries[i] for i in active])
+        hits = top_docs(session, vecs, top_k=payload.top_k, min_score=MIN_SCORE)
+        for i, doc_hits in zip(active, hits, strict=True):
+            ranked[i] = doc_hits
+
+    out: list[KBBatchSearchResult] = []
+    for q, doc_hits in zip(queries, ranked, strict=True):
+        items = [
+            KBSearchResultItem(
+                doc_id=str(d.id),
+                title=d.title,
+                snippet=best_snippet(q, d.body),
+                score=score,
+                source_url=d.source_url,
+            )
+            for d, score in doc_hits
+        ]
+        out.append(KBBatchSearchResult(query=q, results=items))
+
+    return KBBatchSearchOut(results=out)
@@ -4,10 +4,10 @@ from datetime import datetime
 from enum import Enum
 import re
 from typing import List, Optional, Dict
-from pydantic import BaseModel, EmailStr, Field, field_validator
+from pydantic import BaseModel, EmailStr, Field, field_validator, model_validator
 
 # Import Sender enum for consistency with models
-from backend.models import Sender  
+from backend.models import IncidentStatus, Sender  
 
 # ---------- Shared ----------
 class Citation(BaseModel):
@@ -61,6 +61,7 @@ class ChatIn(BaseModel):
     message: str = Field(min_length=1)
     role: Optional[Sender] = Sender.resident
     session_id: Optional[str] = None          
+    flow_token: Optional[str] = None  # echoed back from the previous ChatOut
 
 
 class ChatOut(BaseModel):
@@ -68,6 +69,7 @@ class ChatOut(BaseModel):
     citations: List["Citation"] = Field(default_factory=list)
     confidence: float = 0.0
     session_id: str 
+    flow_token: Optional[str] = None  # set while a multi-turn flow is pending
 
 
 # ---------- Incidents ----------
@@ -107,6 +109,28 @@ class IncidentStatusOut(BaseModel):
     history: List["IncidentHistoryItem"] = Field(default_factory=list)
 
 
+class IncidentStatusBatchIn(BaseModel):
+    incident_ids: List[str] = Field(min_length=1, max_length=500)
+
+
+class IncidentStatusBatchOut(BaseModel):
+    # Keyed by the requested ID; null for IDs that do not exist
+    results: Dict[str, Optional["IncidentStatusOut"]] = Field(default_factory=dict)
+    not_found: List[str] = Field(default_factory=list)
+
+
+class IncidentImportError(BaseModel):
+    line: int
+    error: str
+
+
+class IncidentImportOut(BaseModel):
+    imported: int
+    failed: int
+    # Capped; `failed` counts every rejected line
+    errors: List["IncidentImportError"] = Field(default_factory=list)
+
+
 class StaffIncidentListItem(BaseModel):
     incident_id: str
     title: Optional[str] = None
@@ -123,6 +147,49 @@ class StaffIncidentUpdateIn(BaseModel):
     note: Optional[str] = None
 
 
+# Most incidents one bulk status update may touch
+BULK_MAX_INCIDENTS = 5000
+
+
+class StaffIncidentFilter(BaseModel):
+    # Same filters as the staff incident list
+    status: Optional[IncidentStatus] = None
+    category: Optional[str] = None
+    priority: Optional[str] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+
+    @model_validator(mode="after")
+    def require_criterion(self) -> "StaffIncidentFilter":
+        if not any(value is not None for value in self.model_dump().values()):
+            raise ValueError("Filter needs at least one criterion.")
+        return self
+
+
+class StaffIncidentBulkUpdateIn(BaseModel):
+    status: IncidentStatus
+    note: Optional[str] = None
+    incident_ids: Optional[List[str]] = Field(
+        default=None, min_length=1, max_length=BULK_MAX_INCIDENTS
+    )
+    filter: Optional[StaffIncidentFilter] = None
+
+    @model_validator(mode="after")
+    def require_one_target(self) -> "StaffIncidentBulkUpdateIn":
+        if (self.incident_ids is None) == (self.filter is None):
+            raise ValueError("Give exactly one of incident_ids and filter.")
+        return self
+
+
+class StaffIncidentBulkUpdateOut(BaseModel):
+    status: str
+    matched: int
+    updated: int
+    # Matched incidents already in the target status
+    unchanged: int
+    not_found: List[str] = Field(default_factory=list)
+
+
 # ---------- KB ----------
 class KBSearchResultItem(BaseModel):
     doc_id: str
@@ -136,6 +203,20 @@ class KBSearchOut(BaseModel):
     results: List["KBSearchResultItem"] = Field(default_factory=list)
 
 
+class KBBatchSearchIn(BaseModel):
+    queries: List[str] = Field(min_length=1, max_length=100)
+    top_k: int = Field(default=10, ge=1, le=50)
+
+
+class KBBatchSearchResult(BaseModel):
+    query: str
+    results: List["KBSearchResultItem"] = Field(default_factory=list)
+
+
+class KBBatchSearchOut(BaseModel):
+    results: List["KBBatchSearchResult"] = Field(default_factory=list)
+
+
 # ---------- Health ----------
 class HealthLive(BaseModel):
     ok: bool = True
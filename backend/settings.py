@@ -22,6 +22,8 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL: AnyUrl | str = f"sqlite:///{BASE_DIR}/dev.db"
+    # Async driver URL for request handlers; derived from DATABASE_URL if unset
+    ASYNC_DATABASE_URL: Optional[str] = None
 
     # JWT
     JWT_SECRET_KEY: Optional[str] = None
@@ -35,6 +37,69 @@ class Settings(BaseSettings):
         "https://civic-navigator-nine.vercel.app/"
     ]
 
+    # Knowledge base search
+    KB_PCA_DIM: Optional[int] = None  # e.g. 128; None keeps full embedding dim
+    KB_SNAPSHOT_PATH: Optional[str] = None  # e.g. backend/kb_index.npz; None disables
+    # How often a worker re-reads the KB generation to spot chunks written by
+    # another process (its own writes take effect at once)
+    KB_VERSION_TTL_SECONDS: float = 5.0
+
+    # Intent classification
+    INTENT_MODE: str = "keyword"  # "keyword" | "embedding" (centroids + keyword fallback)
+    INTENT_MIN_SIMILARITY: float = 0.5
+
+    # Chat conversation cache (0 disables). Per process: only enable it with
+    # sticky sessions or a single worker, or turns may read stale flow state.
+    CONVERSATION_CACHE_SIZE: int = 0
+    CONVERSATION_CACHE_TTL_SECONDS: int = 30 * 60
+
+    # Public incident status cache (0 disables); TTL bounds staleness across workers
+    STATUS_CACHE_SIZE: int = 10_000
+    STATUS_CACHE_TTL_SECONDS: int = 30
+
+    # Incident SSE feeds: keepalive interval, which is also how often a stream
+    # re-checks the DB for changes made by other workers
+    INCIDENT_EVENTS_HEARTBEAT_SECONDS: int = 15
+    # How far behind its cursor a feed re-reads history, for rows whose
+    # transaction committed after later-stamped rows were already sent
+    INCIDENT_EVENTS_OVERLAP_SECONDS: int = 30
+
+    # Base worker id for incident public IDs. Under gunicorn each worker adds
+    # its slot (0..workers-1, from gunicorn_conf.py), so hosts sharing one
+    # database need bases at least `--workers` apart (e.g. pod ordinal *
+    # workers), and base + slot must stay below 768. Any other process that
+    # mints IDs (import CLI, `uvicorn --workers`) needs its own unused id
+    # (0-1023); production refuses to run it unset, elsewhere one is derived
+    # from the process id in 768-1023, clear of every gunicorn worker.
+    PUBLIC_ID_WORKER_ID: Optional[int] = None
+
+    # Bulk incident import: records per transaction, and how much of an
+    # upload is buffered in memory before spilling to a temp file
+    INCIDENT_IMPORT_BATCH_SIZE: int = 500
+    INCIDENT_IMPORT_SPOOL_BYTES: int = 8 * 1024 * 1024
+    # Incidents fetched per round trip by the staff export
+    INCIDENT_EXPORT_BATCH_SIZE: int = 1000
+
+    # Write-behind persistence of chat messages
+    MESSAGE_WRITE_BEHIND: bool = False
+    MESSAGE_WRITE_BEHIND_BATCH: int = 100
+    MESSAGE_WRITE_BEHIND_INTERVAL_MS: int = 50
+    MESSAGE_WRITE_BEHIND_MAX_QUEUE: int = 10_000
+
+    # Admission control for chat embedding/retrieval (max in-flight 0 disables)
+    RETRIEVAL_MAX_IN_FLIGHT: int = 4
+    RETRIEVAL_MAX_QUEUE_WAIT_MS: int = 500
+    RETRIEVAL_SHED_MODE: str = "degrade"  # "degrade" (keyword-only KB match) | "busy" (503)
+    RETRIEVAL_RETRY_AFTER_SECONDS: int = 2
+    # Per-turn latency budget for retrieval; past it, cheaper stages are used (0 disables)
+    CHAT_LATENCY_BUDGET_MS: int = 300
+
+    # Multi-turn flow state carried by the client as a signed token (needs
+    # JWT_SECRET_KEY). Tokens are signed, not encrypted: the state, including
+    # the reporter's contact email, is readable by whoever holds the token.
+    CHAT_FLOW_TOKENS: bool = False
+    CHAT_FLOW_TOKEN_EXPIRE_MINUTES: int = 60
+
     # Optional integrations
     SENTRY_DSN: Optional[str] = None
     AI_PROVIDER: str = "none"
@@ -59,6 +124,8 @@ class Settings(BaseSettings):
             raise ValueError("JWT_SECRET_KEY must be set in production environment")
         if self.ENV == "development" and not self.JWT_SECRET_KEY:
             self.JWT_SECRET_KEY = None
+        if self.CHAT_FLOW_TOKENS and not self.JWT_SECRET_KEY:
+            raise ValueError("JWT_SECRET_KEY must be set when CHAT_FLOW_TOKENS is on")
         return self
 
     @model_validator(mode="after")
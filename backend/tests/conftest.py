@@ -8,9 +8,12 @@ import uuid
 from fastapi.testclient import TestClient
 from sqlmodel import SQLModel, Session, create_engine
 from sqlalchemy.engine import Engine
-from collections.abc import Generator
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlmodel.ext.asyncio.session import AsyncSession
+from collections.abc import AsyncGenerator, Generator
 
-from backend.db import get_session
+from backend.db import get_async_session, get_session
 from backend.settings import Settings
 from backend.utils.security import create_access_token, hash_password
 from backend.models import User, UserRole
@@ -48,6 +51,12 @@ def engine(test_settings: Settings) -> Engine:
     return engine
 
 
+@pytest.fixture(scope="session")
+def async_engine(engine: Engine) -> AsyncEngine:
+    # Same file as `engine`; NullPool because each TestClient runs its own loop
+    return create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+
+
 @pytest.fixture
 def session(engine: Engine) -> Generator[Session, None, None]:
     with Session(engine) as session:
@@ -58,16 +67,21 @@ def session(engine: Engine) -> Generator[Session, None, None]:
 # FastAPI Test Client
 # -------------------------
 @pytest.fixture
-def client(engine: Engine, session: Session):
+def client(engine: Engine, async_engine: AsyncEngine, session: Session):
     def _get_test_session():
         yield session
 
+    async def _get_test_async_session() -> AsyncGenerator[AsyncSession, None]:
+        async with AsyncSession(async_engine, expire_on_commit=False) as s:
+            yield s
+
     # Ensure schema exists for this session
     SQLModel.metadata.create_all(engine)
     from backend import models
     models.Base.metadata.create_all(engine)
 
     app.dependency_overrides[get_session] = _get_test_session
+    app.dependency_overrides[get_async_session] = _get_test_async_session
     with TestClient(app) as c:
         yield c
     app.dependency_overrides.clear()
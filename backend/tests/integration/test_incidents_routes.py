@@ -32,7 +32,7 @@ def test_create_incident_success(client: TestClient, session: Session):
 
     # Response fields
     assert "incident_id" in data
-    assert len(data["incident_id"]) == 8  # public_id length
+    assert len(data["incident_id"]) == 12  # public_id length
     assert data["status"] == IncidentStatus.new.value
 
     # DB check
@@ -86,3 +86,289 @@ def test_get_status_unknown_incident(client: TestClient):
     response = client.get("/api/incidents/UNKNOWN99/status")
     assert response.status_code == 404
     assert response.json()["detail"] == "Unknown incident ID"
+
+
+def test_get_status_etag_304_and_invalidation(
+    client: TestClient, session: Session, staff_token: str, async_engine
+):
+    from sqlalchemy import event
+
+    created = client.post("/api/incidents", json=create_incident_payload()).json()
+    public_id = created["incident_id"]
+    url = f"/api/incidents/{public_id}/status"
+
+    first = client.get(url)
+    etag = first.headers["ETag"]
+    assert first.status_code == 200
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        not_modified = client.get(url, headers={"If-None-Match": etag})
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert statements == []  # served from the status cache
+
+    client.patch(
+        f"/api/staff/incidents/{public_id}",
+        json={"status": "in_progress"},
+        headers={"Authorization": f"Bearer {staff_token}"},
+    )
+    changed = client.get(url, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["status"] == "in_progress"
+    assert changed.headers["ETag"] != etag
+
+
+def test_incident_events_replay_live_and_keepalive(session: Session, async_engine):
+    import asyncio
+    import json
+    from datetime import datetime, timedelta, timezone
+
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+    from backend.utils.helpers import decode_cursor
+    from backend.utils.incident_events import event_stream, incident_events
+
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    inc = Incident(
+        public_id=f"EV{uuid.uuid4().hex[:6].upper()}",
+        title="Leak",
+        description="Water leak",
+        category="water",
+    )
+    session.add(inc)
+    session.add(IncidentHistory(incident_id=inc.id, status=IncidentStatus.new, timestamp=start))
+    session.commit()
+
+    def add_history(status: IncidentStatus, minutes: int) -> None:
+        session.add(
+            IncidentHistory(
+                incident_id=inc.id, status=status, timestamp=start + timedelta(minutes=minutes)
+            )
+        )
+        session.commit()
+
+    def stream(after=None):
+        return event_stream(
+            AsyncSession(async_engine),
+            public_id=inc.public_id,
+            incident_id=inc.id,
+            after=after,
+            heartbeat_seconds=0.05,
+        )
+
+    def parse(frame: str):
+        fields = dict(line.split(": ", 1) for line in frame.strip().splitlines())
+        return fields["id"], json.loads(fields["data"])
+
+    async def go():
+        live = stream()
+        assert await live.__anext__() == ": keepalive\n\n"  # nothing new yet
+
+        add_history(IncidentStatus.in_progress, 1)
+        incident_events.publish(inc.public_id)
+        cursor, data = parse(await live.__anext__())
+        assert data["incident_id"] == inc.public_id
+        assert data["status"] == IncidentStatus.in_progress.value
+        await live.aclose()
+
+        # A client reconnecting with that cursor only sees what came after it
+        add_history(IncidentStatus.resolved, 2)
+        resumed = stream(after=decode_cursor(cursor))
+        _, data = parse(await resumed.__anext__())
+        assert data["status"] == IncidentStatus.resolved.value
+        assert await resumed.__anext__() == ": keepalive\n\n"
+        await resumed.aclose()
+
+    asyncio.run(go())
+
+
+def test_incident_events_deliver_rows_that_commit_late(session: Session, async_engine):
+    import asyncio
+    import json
+    from datetime import datetime, timedelta, timezone
+
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+    from backend.utils.incident_events import event_stream, incident_events
+
+    now = datetime.now(timezone.utc)
+    inc = Incident(
+        public_id=f"LT{uuid.uuid4().hex[:6].upper()}",
+        title="Outage",
+        description="Power outage",
+        category="power",
+    )
+    session.add(inc)
+    session.add(IncidentHistory(incident_id=inc.id, status=IncidentStatus.new, timestamp=now))
+    session.commit()
+
+    def add_history(status: IncidentStatus, timestamp: datetime) -> None:
+        session.add(IncidentHistory(incident_id=inc.id, status=status, timestamp=timestamp))
+        session.commit()
+        incident_events.publish(inc.public_id)
+
+    def status(frame: str) -> str:
+        fields = dict(line.split(": ", 1) for line in frame.strip().splitlines())
+        return json.loads(fields["data"])["status"]
+
+    async def go():
+        live = event_stream(
+            AsyncSession(async_engine),
+            public_id=inc.public_id,
+            incident_id=inc.id,
+            heartbeat_seconds=0.05,
+        )
+        assert await live.__anext__() == ": keepalive\n\n"
+
+        add_history(IncidentStatus.resolved, now + timedelta(seconds=2))
+        assert status(await live.__anext__()) == IncidentStatus.resolved.value
+
+        # Stamped earlier but committed after the row above was sent
+        add_history(IncidentStatus.in_progress, now + timedelta(seconds=1))
+        assert status(await live.__anext__()) == IncidentStatus.in_progress.value
+
+        # Each row is sent once
+        assert await live.__anext__() == ": keepalive\n\n"
+        await live.aclose()
+
+    asyncio.run(go())
+
+
+def test_incident_events_page_a_burst_with_bounded_queries(
+    session: Session, async_engine, monkeypatch
+):
+    import asyncio
+    import json
+    from datetime import datetime, timedelta, timezone
+
+    from sqlalchemy import event
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+    from backend.utils import incident_events as events_module
+    from backend.utils.incident_events import event_stream, incident_events
+
+    monkeypatch.setattr(events_module, "REPLAY_BATCH", 5)
+    now = datetime.now(timezone.utc)
+    burst = [
+        Incident(
+            public_id=f"BU{uuid.uuid4().hex[:6].upper()}",
+            title="Outage",
+            description="Power outage",
+            category="power",
+        )
+        for _ in range(12)
+    ]
+
+    param_counts = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if "FROM incidenthistory" in statement:
+            param_counts.append(len(parameters))
+
+    async def go():
+        live = event_stream(AsyncSession(async_engine), heartbeat_seconds=0.05)
+        assert await live.__anext__() == ": keepalive\n\n"
+
+        # A bulk update: many rows inside one overlap window
+        for i, inc in enumerate(burst):
+            session.add(inc)
+            session.add(
+                IncidentHistory(
+                    incident_id=inc.id,
+                    status=IncidentStatus.in_progress,
+                    timestamp=now + timedelta(milliseconds=i),
+                )
+            )
+        session.commit()
+        incident_events.publish(burst[0].public_id)
+
+        frames = [await live.__anext__() for _ in burst]
+        sent = [
+            json.loads(dict(line.split(": ", 1) for line in f.strip().splitlines())["data"])
+            for f in frames
+        ]
+        assert sorted(d["incident_id"] for d in sent) == sorted(i.public_id for i in burst)
+
+        # Woken again, the stream re-reads the window but sends nothing twice
+        incident_events.publish(burst[0].public_id)
+        assert await live.__anext__() == ": keepalive\n\n"
+        await live.aclose()
+
+    engine = async_engine.sync_engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        asyncio.run(go())
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    # No query carries the ids already sent
+    assert param_counts and max(param_counts) <= 4
+
+
+def test_incident_events_unknown_incident_and_bad_cursor(client: TestClient):
+    response = client.get("/api/incidents/UNKNOWN99/events")
+    assert response.status_code == 404
+
+    created = client.post("/api/incidents", json=create_incident_payload()).json()
+    response = client.get(
+        f"/api/incidents/{created['incident_id']}/events",
+        headers={"Last-Event-ID": "not-a-cursor"},
+    )
+    assert response.status_code == 400
+
+
+def test_get_status_batch_two_queries_with_not_found(client: TestClient, async_engine):
+    from sqlalchemy import event
+
+    from backend.utils.status_cache import status_cache
+
+    first = client.post("/api/incidents", json=create_incident_payload()).json()
+    second = client.post("/api/incidents", json=create_incident_payload()).json()
+    ids = [first["incident_id"], "UNKNOWN99", second["incident_id"], first["incident_id"]]
+    status_cache.clear()
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        response = client.post("/api/incidents/status:batch", json={"incident_ids": ids})
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert list(data["results"]) == [first["incident_id"], "UNKNOWN99", second["incident_id"]]
+    assert data["results"]["UNKNOWN99"] is None
+    assert data["not_found"] == ["UNKNOWN99"]
+    assert data["results"][first["incident_id"]]["status"] == IncidentStatus.new.value
+    assert len(data["results"][second["incident_id"]]["history"]) == 1
+    assert len(statements) == 2
+
+    # Answered from the status cache the second time round
+    statements.clear()
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        again = client.post(
+            "/api/incidents/status:batch", json={"incident_ids": [second["incident_id"]]}
+        )
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+    assert again.json()["results"] == {second["incident_id"]: data["results"][second["incident_id"]]}
+    assert statements == []
+
+
+def test_get_status_batch_validates_size(client: TestClient):
+    assert client.post("/api/incidents/status:batch", json={"incident_ids": []}).status_code == 422
+    too_many = {"incident_ids": [f"ID{i}" for i in range(501)]}
+    assert client.post("/api/incidents/status:batch", json=too_many).status_code == 422
@@ -1,4 +1,5 @@
 import json
+import uuid
 from typing import Dict, Any, List
 from fastapi.testclient import TestClient
 from sqlmodel import Session, select
@@ -34,6 +35,117 @@ def test_list_incidents_returns_results(client: TestClient, session: Session, st
     assert any(inc["incident_id"] == "STAFF2" for inc in data)
 
 
+def test_list_incidents_uses_one_query_per_page(
+    client: TestClient, session: Session, staff_token: str, async_engine
+):
+    from datetime import datetime, timedelta, timezone
+    from sqlalchemy import event
+
+    base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    incidents = [
+        Incident(public_id=f"NPLUS{i}", title=f"N+1 {i}", description="d", category="road")
+        for i in range(5)
+    ]
+    session.add_all(incidents)
+    session.commit()
+    for i, inc in enumerate(incidents):
+        for step in range(3):
+            session.add(
+                IncidentHistory(
+                    incident_id=inc.id,
+                    status=IncidentStatus.in_progress,
+                    timestamp=base + timedelta(days=i, hours=step),
+                )
+            )
+    session.commit()
+
+    statements: List[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = async_engine.sync_engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = client.get(
+            "/api/staff/incidents?page_size=100", headers=auth_headers(staff_token)
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert response.status_code == 200
+    incident_queries = [s for s in statements if "FROM incident" in s]
+    assert len(incident_queries) == 1
+
+    by_id = {item["incident_id"]: item for item in response.json()}
+    last = datetime.fromisoformat(by_id["NPLUS3"]["last_update"])
+    assert last.replace(tzinfo=None) == (base + timedelta(days=3, hours=2)).replace(tzinfo=None)
+
+
+def test_list_incidents_keyset_pages_are_ordered_and_complete(
+    client: TestClient, session: Session, staff_token: str
+):
+    from datetime import datetime, timedelta, timezone
+
+    base = datetime(2024, 6, 1, tzinfo=timezone.utc)
+    for i in range(5):
+        session.add(
+            Incident(
+                public_id=f"KEYSET{i}",
+                title=f"Keyset {i}",
+                description="d",
+                category="keyset-test",
+                priority="high" if i % 2 else "low",
+                status=IncidentStatus.open if i < 4 else IncidentStatus.closed,
+                created_at=base,
+                updated_at=base + timedelta(hours=i % 3),  # ties broken by id
+            )
+        )
+    session.commit()
+
+    seen: List[str] = []
+    cursor = None
+    pages = 0
+    while True:
+        params: Dict[str, Any] = {"category": "keyset-test", "page_size": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/staff/incidents", params=params, headers=auth_headers(staff_token))
+        assert response.status_code == 200
+        seen.extend(item["incident_id"] for item in response.json())
+        pages += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert pages == 3
+    assert sorted(seen) == [f"KEYSET{i}" for i in range(5)]
+    rows = {inc.public_id: inc for inc in session.exec(select(Incident).where(Incident.category == "keyset-test"))}
+    keys = [(rows[p].updated_at, rows[p].id) for p in seen]
+    assert keys == sorted(keys, reverse=True)
+
+    filtered = client.get(
+        "/api/staff/incidents",
+        params={"category": "keyset-test", "status": "open", "priority": "high"},
+        headers=auth_headers(staff_token),
+    ).json()
+    assert sorted(item["incident_id"] for item in filtered) == ["KEYSET1", "KEYSET3"]
+
+    none_created = client.get(
+        "/api/staff/incidents",
+        params={"category": "keyset-test", "created_from": "2024-06-02T00:00:00"},
+        headers=auth_headers(staff_token),
+    ).json()
+    assert none_created == []
+
+
+def test_list_incidents_rejects_bad_cursor(client: TestClient, staff_token: str):
+    response = client.get(
+        "/api/staff/incidents", params={"cursor": "not-a-cursor"}, headers=auth_headers(staff_token)
+    )
+    assert response.status_code == 400
+
+
 def test_update_incident_status_success(client: TestClient, session: Session, staff_token: str):
     inc = Incident(
         public_id="UPD123",
@@ -127,3 +239,257 @@ def test_staff_kb_search_no_results(client: TestClient, staff_token: str):
     assert response.status_code == 200
     data = response.json()
     assert data["results"] == []
+
+
+def test_staff_kb_batch_search(client: TestClient, session: Session, staff_token: str):
+    doc = KBDoc(
+        title="Water Outages",
+        body="Scheduled water maintenance happens on the first Saturday.",
+        source_url="http://kb.local/water",
+    )
+    session.add(doc)
+    session.commit()
+
+    vec = _embedder.encode(doc.body, convert_to_numpy=True).tolist()
+    session.add(KBChunk(doc_id=doc.id, text=doc.body, embedding=json.dumps(vec)))
+    session.commit()
+
+    response = client.post(
+        "/api/staff/kb/search:batch",
+        json={"queries": [doc.body, "", "nonexistent"], "top_k": 3},
+        headers=auth_headers(staff_token),
+    )
+    assert response.status_code == 200
+    data = response.json()["results"]
+
+    assert [r["query"] for r in data] == [doc.body, "", "nonexistent"]
+    assert data[0]["results"][0]["title"] == "Water Outages"
+    assert len(data[0]["results"]) <= 3
+    assert data[1]["results"] == []
+
+
+def test_staff_kb_batch_search_requires_queries(client: TestClient, staff_token: str):
+    response = client.post(
+        "/api/staff/kb/search:batch",
+        json={"queries": []},
+        headers=auth_headers(staff_token),
+    )
+    assert response.status_code == 422
+
+
+def test_staff_incident_events_require_staff(client: TestClient, resident_token: str):
+    assert client.get("/api/staff/incidents/events").status_code == 401
+    response = client.get(
+        "/api/staff/incidents/events", headers=auth_headers(resident_token)
+    )
+    assert response.status_code == 403
+
+
+def test_import_incidents_ndjson_reports_bad_lines(
+    client: TestClient, session: Session, staff_token: str
+):
+    title = f"Imported {uuid.uuid4().hex[:8]}"
+    body = "\n".join(
+        [
+            json.dumps({"title": title, "description": "Burst pipe", "category": "water_supply"}),
+            json.dumps({"title": title, "description": "", "category": "water_supply"}),
+            "{not json",
+            json.dumps({"title": title, "description": "Pothole", "category": "road_maintenance"}),
+        ]
+    )
+    response = client.post(
+        "/api/staff/incidents/import",
+        content=body,
+        headers={**auth_headers(staff_token), "Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["imported"] == 2
+    assert data["failed"] == 2
+    assert [e["line"] for e in data["errors"]] == [2, 3]
+    assert data["errors"][0]["error"].startswith("description:")
+
+    imported = session.exec(select(Incident).where(Incident.title == title)).all()
+    assert len(imported) == 2
+    for inc in imported:
+        assert inc.status == IncidentStatus.new
+        history = session.exec(
+            select(IncidentHistory).where(IncidentHistory.incident_id == inc.id)
+        ).all()
+        assert [h.status for h in history] == [IncidentStatus.new]
+
+
+def test_import_incidents_csv_in_batches(
+    client: TestClient, session: Session, staff_token: str, monkeypatch
+):
+    from backend.settings import settings
+
+    monkeypatch.setattr(settings, "INCIDENT_IMPORT_BATCH_SIZE", 2)
+    title = f"Imported {uuid.uuid4().hex[:8]}"
+    rows = [f"{title},Broken light {i},street_lighting,,Main St" for i in range(5)]
+    body = "title,description,category,contact_email,location_text\n" + "\n".join(rows)
+    response = client.post(
+        "/api/staff/incidents/import?format=csv",
+        content=body,
+        headers=auth_headers(staff_token),
+    )
+    assert response.json() == {"imported": 5, "failed": 0, "errors": []}
+    imported = session.exec(select(Incident).where(Incident.title == title)).all()
+    assert {inc.location_text for inc in imported} == {"Main St"}
+    assert {inc.contact_email for inc in imported} == {None}
+
+
+def test_import_incidents_requires_staff(client: TestClient, resident_token: str):
+    response = client.post(
+        "/api/staff/incidents/import", content="{}", headers=auth_headers(resident_token)
+    )
+    assert response.status_code == 403
+
+
+def test_bulk_update_incidents_by_ids(
+    client: TestClient, session: Session, staff_token: str, engine
+):
+    from sqlalchemy import event
+
+    incidents = [
+        Incident(public_id=f"BU{uuid.uuid4().hex[:6].upper()}", title="Outage", description="d", category="electricity")
+        for _ in range(3)
+    ]
+    incidents[2].status = IncidentStatus.resolved
+    session.add_all(incidents)
+    session.commit()
+    ids = [inc.public_id for inc in incidents]
+    client.get(f"/api/incidents/{ids[0]}/status")  # warm the status cache
+
+    statements: List[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = client.post(
+            "/api/staff/incidents/status:bulk",
+            json={"incident_ids": ids + ["UNKNOWN99"], "status": "resolved", "note": "Outage fixed"},
+            headers=auth_headers(staff_token),
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "status": "resolved",
+        "matched": 3,
+        "updated": 2,
+        "unchanged": 1,
+        "not_found": ["UNKNOWN99"],
+    }
+    assert len([s for s in statements if s.startswith("UPDATE incident ")]) == 1
+    assert len([s for s in statements if s.startswith("INSERT INTO incidenthistory")]) == 1
+
+    status = client.get(f"/api/incidents/{ids[0]}/status").json()
+    assert status["status"] == "resolved"
+    assert status["history"][-1]["note"] == "Outage fixed"
+    for inc in incidents:
+        session.refresh(inc)
+        assert inc.status == IncidentStatus.resolved
+    history = session.exec(
+        select(IncidentHistory).where(IncidentHistory.incident_id == incidents[2].id)
+    ).all()
+    assert history == []  # already resolved: left untouched
+
+
+def test_bulk_update_incidents_by_filter(client: TestClient, session: Session, staff_token: str):
+    category = f"bulk-{uuid.uuid4().hex[:8]}"
+    session.add_all(
+        [Incident(public_id=f"BF{uuid.uuid4().hex[:6].upper()}", title="t", description="d", category=category) for _ in range(2)]
+    )
+    session.commit()
+
+    response = client.post(
+        "/api/staff/incidents/status:bulk",
+        json={"filter": {"category": category}, "status": "closed"},
+        headers=auth_headers(staff_token),
+    )
+    assert response.json()["updated"] == 2
+    statuses = session.exec(select(Incident.status).where(Incident.category == category)).all()
+    assert statuses == [IncidentStatus.closed, IncidentStatus.closed]
+
+
+def test_bulk_update_rejects_filter_matching_over_the_cap(
+    client: TestClient, session: Session, staff_token: str, monkeypatch
+):
+    from backend.routes import staff
+
+    monkeypatch.setattr(staff, "BULK_MAX_INCIDENTS", 2)
+    category = f"bulk-{uuid.uuid4().hex[:8]}"
+    session.add_all(
+        [Incident(public_id=f"BC{uuid.uuid4().hex[:6].upper()}", title="t", description="d", category=category) for _ in range(3)]
+    )
+    session.commit()
+
+    response = client.post(
+        "/api/staff/incidents/status:bulk",
+        json={"filter": {"category": category}, "status": "closed"},
+        headers=auth_headers(staff_token),
+    )
+    assert response.status_code == 422
+    statuses = session.exec(select(Incident.status).where(Incident.category == category)).all()
+    assert IncidentStatus.closed not in statuses
+
+
+def test_bulk_update_incidents_validation(client: TestClient, staff_token: str):
+    for body in (
+        {"status": "closed"},
+        {"status": "closed", "incident_ids": ["A"], "filter": {"category": "x"}},
+        {"status": "closed", "filter": {}},
+        {"status": "nope", "incident_ids": ["A"]},
+    ):
+        response = client.post(
+            "/api/staff/incidents/status:bulk", json=body, headers=auth_headers(staff_token)
+        )
+        assert response.status_code == 422, body
+
+
+def test_export_incidents_streams_filtered_rows_with_history(
+    client: TestClient, session: Session, staff_token: str, monkeypatch
+):
+    import csv
+    import gzip
+    import io
+
+    from backend.settings import settings
+
+    monkeypatch.setattr(settings, "INCIDENT_EXPORT_BATCH_SIZE", 2)
+    category = f"export-{uuid.uuid4().hex[:8]}"
+    public_ids = []
+    for i in range(3):
+        inc = Incident(public_id=f"EX{uuid.uuid4().hex[:6].upper()}", title=f"t{i}", description="d", category=category)
+        session.add(inc)
+        session.flush()
+        session.add(IncidentHistory(incident_id=inc.id, status=IncidentStatus.new, note="Incident created"))
+        public_ids.append(inc.public_id)
+    session.commit()
+
+    response = client.get(
+        f"/api/staff/incidents/export?format=ndjson&category={category}",
+        headers=auth_headers(staff_token),
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(r["incident_id"] for r in records) == sorted(public_ids)
+    assert all(r["history"][0]["note"] == "Incident created" for r in records)
+
+    response = client.get(
+        f"/api/staff/incidents/export?category={category}&gzip=true",
+        headers=auth_headers(staff_token),
+    )
+    assert response.headers["content-disposition"] == 'attachment; filename="incidents.csv.gz"'
+    rows = list(csv.DictReader(io.StringIO(gzip.decompress(response.content).decode())))
+    assert len(rows) == 3 and {r["category"] for r in rows} == {category}
+
+
+def test_export_incidents_requires_staff(client: TestClient, resident_token: str):
+    response = client.get("/api/staff/incidents/export", headers=auth_headers(resident_token))
+    assert response.status_code == 403
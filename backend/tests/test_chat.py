@@ -120,4 +120,460 @@ def test_kb_query_returns_citations(client: TestClient, session: Session):
 def test_fallback_reply_when_unclear(client: TestClient):
     r = send_message(client, "asldkfjweoiru")  # gibberish
     data = r.json()
-    assert "clarify" in data["reply"].lower()
\ No newline at end of file
+    assert "clarify" in data["reply"].lower()
+
+def test_embedding_intent_mode_encodes_message_once(client: TestClient, monkeypatch):
+    from backend.routes import chat
+    from backend.settings import settings
+    from backend.utils.deadline import LatencyEstimate
+
+    calls = []
+    real_embed = chat.embed_queries
+
+    def counting_embed(texts):
+        calls.append(list(texts))
+        return real_embed(texts)
+
+    monkeypatch.setattr(settings, "INTENT_MODE", "embedding")
+    monkeypatch.setattr(chat, "embed_queries", counting_embed)
+    # Earlier tests' timings must not push the embed out of the budget
+    monkeypatch.setattr(chat, "embed_latency", LatencyEstimate())
+    chat.classifier.fit_centroids()  # centroids are built once, outside the request
+
+    r = send_message(client, "When is trash collected?")
+    assert r.status_code == 200
+    assert calls == [["When is trash collected?"]]
+
+
+def test_shed_retrieval_degrades_to_keyword_match(client: TestClient, session: Session, monkeypatch):
+    import asyncio
+    from backend.routes import chat
+    from backend.utils.admission import AdmissionController
+
+    kb = KBDoc(title="Recycling Centre Hours", body="The recycling centre opens at 9am on weekdays.")
+    session.add(kb)
+    session.commit()
+
+    def no_embed(texts):
+        raise AssertionError("shed requests must not call the model")
+
+    busy = AdmissionController(max_in_flight=1, max_queue_wait_ms=0)
+    assert asyncio.run(busy.acquire())  # the only slot is taken
+    monkeypatch.setattr(chat, "retrieval_admission", busy)
+    monkeypatch.setattr(chat, "embed_queries", no_embed)
+
+    data = send_message(client, "When does the recycling centre open?").json()
+    assert data["citations"][0]["title"] == "Recycling Centre Hours"
+    assert data["confidence"] <= 0.5
+
+
+def test_shed_retrieval_in_busy_mode_returns_503(client: TestClient, monkeypatch):
+    import asyncio
+    from backend.routes import chat
+    from backend.settings import settings
+    from backend.utils.admission import AdmissionController
+
+    busy = AdmissionController(max_in_flight=1, max_queue_wait_ms=0)
+    assert asyncio.run(busy.acquire())
+    monkeypatch.setattr(chat, "retrieval_admission", busy)
+    monkeypatch.setattr(settings, "RETRIEVAL_SHED_MODE", "busy")
+
+    r = send_message(client, "When is trash collected?")
+    assert r.status_code == 503
+    assert r.headers["Retry-After"] == str(settings.RETRIEVAL_RETRY_AFTER_SECONDS)
+
+    metrics = client.get("/metrics").text
+    assert "civicnav_retrieval_shed_total" in metrics
+
+
+def test_model_call_over_latency_budget_falls_back_to_keywords(client: TestClient, session: Session, monkeypatch):
+    from backend.routes import chat
+    from backend.utils.deadline import LatencyEstimate
+
+    kb = KBDoc(title="Library Card Renewal", body="Renew a library card online or at any branch.")
+    session.add(kb)
+    session.commit()
+
+    def no_embed(texts):
+        raise AssertionError("the model call does not fit the budget")
+
+    monkeypatch.setattr(chat, "embed_latency", LatencyEstimate(initial_ms=60_000))
+    monkeypatch.setattr(chat, "embed_queries", no_embed)
+
+    data = send_message(client, "How do I renew my library card?").json()
+    assert data["citations"][0]["title"] == "Library Card Renewal"
+    assert data["confidence"] <= chat.DEGRADED_CONFIDENCE_FACTOR
+
+
+def test_multi_turn_flow_does_not_reselect_conversation(
+    client: TestClient, session: Session, async_engine, monkeypatch
+):
+    from sqlalchemy import event
+    from backend.utils.conversation_cache import conversation_cache
+
+    monkeypatch.setattr(conversation_cache, "max_size", 100)
+
+    r1 = send_message(client, "I want to report an incident")
+    session_id = r1.json()["session_id"]
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = async_engine.sync_engine  # chat routes run on the async engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        send_message(client, "chat", session_id=session_id)
+        send_message(client, "Broken streetlight", session_id=session_id)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert not any(s.lstrip().upper().startswith("SELECT") and "conversation" in s for s in statements)
+
+    # State changes were still written through to the DB
+    convo = session.exec(select(Conversation).where(Conversation.session_id == session_id)).first()
+    session.refresh(convo)
+    assert convo.pending_intent == "incident_report_flow"
+    assert convo.state["title"] == "Broken streetlight"
+
+    metrics = client.get("/metrics").text
+    assert "civicnav_conversation_cache_hit_ratio" in metrics
+
+
+def test_stale_cached_conversation_does_not_refile_incident(
+    client: TestClient, session: Session, monkeypatch
+):
+    from sqlalchemy import update
+    from backend.utils.conversation_cache import conversation_cache
+
+    monkeypatch.setattr(conversation_cache, "max_size", 100)
+
+    session_id = send_message(client, "I want to report an incident").json()["session_id"]
+    title = f"Flooded underpass {uuid.uuid4()}"
+    for message in ["chat", title, "road", "Elm Street", "user@example.com"]:
+        send_message(client, message, session_id=session_id)
+
+    # Another worker finishes the flow; this worker's cached copy still
+    # expects the description
+    session.exec(
+        update(Conversation)
+        .where(Conversation.session_id == session_id)
+        .values(pending_intent=None, state={}, version=Conversation.version + 1)
+    )
+    session.commit()
+
+    reply = send_message(client, "Water up to the wheels", session_id=session_id).json()["reply"]
+    assert "incident id" not in reply.lower()
+    assert session.exec(select(Incident).where(Incident.title == title)).first() is None
+
+    convo = session.exec(select(Conversation).where(Conversation.session_id == session_id)).first()
+    session.refresh(convo)
+    assert convo.pending_intent is None
+    assert conversation_cache.get(session_id).version == convo.version
+
+
+def test_flow_tokens_carry_incident_flow_without_conversation_writes(
+    client: TestClient, session: Session, async_engine, monkeypatch
+):
+    from sqlalchemy import event
+    from backend.settings import settings
+
+    monkeypatch.setattr(settings, "CHAT_FLOW_TOKENS", True)
+
+    r1 = send_message(client, "I want to report an incident").json()
+    session_id = r1["session_id"]
+    assert r1["flow_token"]
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    def turn(message: str, token: str):
+        payload = {"message": message, "session_id": session_id, "flow_token": token}
+        return client.post("/api/chat/message", json=payload).json()
+
+    engine = async_engine.sync_engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        token = r1["flow_token"]
+        for message in ["chat", "Broken streetlight", "streetlight", "Main Street", "user@example.com"]:
+            token = turn(message, token)["flow_token"]
+            assert token
+        final = turn("It has been out for days", token)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert "incident id" in final["reply"].lower()
+    assert final["flow_token"] is None
+    touched = [s for s in statements if "FROM conversation" in s or "UPDATE conversation" in s]
+    assert touched == []
+
+    convo = session.exec(select(Conversation).where(Conversation.session_id == session_id)).first()
+    session.refresh(convo)
+    assert convo.pending_intent is None
+    incident = session.exec(select(Incident).where(Incident.title == "Broken streetlight")).first()
+    assert incident is not None
+    assert incident.location_text == "Main Street"
+
+
+def test_replayed_final_flow_token_does_not_refile_incident(
+    client: TestClient, session: Session, monkeypatch
+):
+    from backend.settings import settings
+
+    monkeypatch.setattr(settings, "CHAT_FLOW_TOKENS", True)
+
+    r1 = send_message(client, "I want to report an incident").json()
+    session_id, token = r1["session_id"], r1["flow_token"]
+    title = f"Fallen tree {uuid.uuid4()}"
+    for message in ["chat", title, "road", "Oak Avenue", "user@example.com"]:
+        payload = {"message": message, "session_id": session_id, "flow_token": token}
+        token = client.post("/api/chat/message", json=payload).json()["flow_token"]
+
+    final = {"message": "Blocking both lanes", "session_id": session_id, "flow_token": token}
+    first = client.post("/api/chat/message", json=final).json()
+    replay = client.post("/api/chat/message", json=final).json()
+
+    incidents = session.exec(select(Incident).where(Incident.title == title)).all()
+    assert len(incidents) == 1
+    assert incidents[0].public_id in first["reply"]
+    assert incidents[0].public_id in replay["reply"]
+
+
+def test_concurrent_final_flow_token_replay_reports_the_filed_incident(
+    client: TestClient, session: Session, async_engine, monkeypatch
+):
+    from sqlalchemy import event
+
+    from backend.settings import settings
+
+    monkeypatch.setattr(settings, "CHAT_FLOW_TOKENS", True)
+
+    r1 = send_message(client, "I want to report an incident").json()
+    session_id, token = r1["session_id"], r1["flow_token"]
+    title = f"Flooded underpass {uuid.uuid4()}"
+    for message in ["chat", title, "road", "Elm Street", "user@example.com"]:
+        payload = {"message": message, "session_id": session_id, "flow_token": token}
+        token = client.post("/api/chat/message", json=payload).json()["flow_token"]
+
+    # The other replay files the incident just after this one checked for it
+    filed = []
+
+    def race(conn, cursor, statement, parameters, context, executemany):
+        if not filed and "incident.flow_id = " in statement:
+            flow_id = parameters[0]
+            other = Incident(
+                public_id=f"RACE{uuid.uuid4().hex[:8].upper()}",
+                title=title,
+                description="Filed by the other replay",
+                category="road",
+                flow_id=flow_id,
+            )
+            session.add(other)
+            session.commit()
+            filed.append(other.public_id)
+
+    engine = async_engine.sync_engine
+    event.listen(engine, "after_cursor_execute", race)
+    try:
+        final = {"message": "Knee-deep water", "session_id": session_id, "flow_token": token}
+        response = client.post("/api/chat/message", json=final)
+    finally:
+        event.remove(engine, "after_cursor_execute", race)
+
+    assert response.status_code == 200
+    incidents = session.exec(select(Incident).where(Incident.title == title)).all()
+    assert [i.public_id for i in incidents] == filed
+    assert filed[0] in response.json()["reply"]
+
+
+def test_tampered_flow_token_is_ignored(client: TestClient, monkeypatch):
+    from backend.settings import settings
+
+    monkeypatch.setattr(settings, "CHAT_FLOW_TOKENS", True)
+
+    r1 = send_message(client, "I want to report an incident").json()
+    payload = {"message": "chat", "session_id": r1["session_id"], "flow_token": r1["flow_token"] + "x"}
+    r2 = client.post("/api/chat/message", json=payload).json()
+    # Without valid flow state the message is classified afresh
+    assert "title" not in r2["reply"].lower()
+
+
+def test_write_behind_persists_messages_after_flush(client: TestClient, session: Session, monkeypatch):
+    from backend.routes import chat
+    from backend.utils.write_behind import MessageWriteBehind
+
+    writer = MessageWriteBehind(session.get_bind(), flush_interval_ms=60_000)
+    monkeypatch.setattr(chat, "message_writer", writer)
+    writer.start()
+    try:
+        data = send_message(client, "Hello there!").json()
+        convo = session.exec(select(Conversation).where(Conversation.session_id == data["session_id"])).first()
+        assert convo is not None
+    finally:
+        writer.stop()
+
+    msgs = session.exec(select(Message).where(Message.conversation_id == convo.id)).all()
+    assert len(msgs) == 2
+
+
+def parse_sse(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_stream_endpoint_emits_ack_intent_citations_and_final(client: TestClient, session: Session):
+    kb = KBDoc(title="Recycling Days", body="Recycling is picked up every Wednesday.")
+    session.add(kb)
+    session.commit()
+    vec = _embedder.encode(kb.body, convert_to_numpy=True).tolist()
+    session.add(KBChunk(doc_id=kb.id, text=kb.body, embedding=json.dumps(vec)))
+    session.commit()
+
+    r = client.post("/api/chat/message/stream", json={"message": "When is recycling picked up?"})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/event-stream")
+
+    events = parse_sse(r.text)
+    names = [name for name, _ in events]
+    assert names[0] == "ack"
+    assert names[1] == "intent"
+    assert names[-1] == "final"
+    assert events[1][1]["intent"] == "general_query"
+
+    citations = [data for name, data in events if name == "citation"]
+    final = events[-1][1]
+    assert citations == final["citations"]
+    assert any(c["title"] == "Recycling Days" for c in citations)
+    assert final["session_id"] == events[0][1]["session_id"]
+
+
+def test_stream_endpoint_ends_with_error_event_and_rolls_back(
+    client: TestClient, session: Session, monkeypatch
+):
+    from backend.routes import chat
+
+    async def broken_classifier(message, query_vec=None):
+        raise RuntimeError("classifier down")
+
+    monkeypatch.setattr(chat.classifier, "classify_intent", broken_classifier)
+    session_id = f"stream-error-{uuid.uuid4()}"
+    r = client.post(
+        "/api/chat/message/stream", json={"message": "Hello", "session_id": session_id}
+    )
+    assert r.status_code == 200
+
+    names = [name for name, _ in parse_sse(r.text)]
+    assert names == ["ack", "error"]
+    # The conversation created by the failed turn was rolled back
+    assert session.exec(select(Conversation).where(Conversation.session_id == session_id)).first() is None
+
+
+def test_stream_endpoint_resets_events_of_a_stale_retry(
+    client: TestClient, session: Session, monkeypatch
+):
+    from sqlalchemy import update
+    from backend.utils.conversation_cache import conversation_cache
+
+    monkeypatch.setattr(conversation_cache, "max_size", 100)
+
+    session_id = send_message(client, "Check status").json()["session_id"]
+    assert conversation_cache.get(session_id).pending_intent == "status_check"
+
+    # Another worker answers the status check; the cached copy still expects an ID
+    session.exec(
+        update(Conversation)
+        .where(Conversation.session_id == session_id)
+        .values(pending_intent=None, state={}, version=Conversation.version + 1)
+    )
+    session.commit()
+
+    r = client.post(
+        "/api/chat/message/stream", json={"message": "Hello", "session_id": session_id}
+    )
+    events = parse_sse(r.text)
+    names = [name for name, _ in events]
+    assert names.count("ack") == 1
+    assert names[:3] == ["ack", "intent", "reset"]
+    assert events[1][1] == {"intent": "status_check"}
+    # Everything after the reset comes from the re-run on the current row
+    rerun = events[names.index("reset") + 1:]
+    assert {"intent": "status_check"} not in [data for _, data in rerun]
+    assert rerun[-1][0] == "final"
+    assert "status" not in rerun[-1][1]["reply"].lower()
+
+
+def ws_turn(ws, message: str):
+    ws.send_json({"message": message})
+    events = []
+    while True:
+        frame = ws.receive_json()
+        events.append(frame)
+        if frame["event"] in ("final", "error"):
+            return events
+
+
+def test_websocket_incident_flow_on_one_connection(client: TestClient, session: Session):
+    with client.websocket_connect("/api/chat/ws") as ws:
+        first = ws_turn(ws, "I want to report an incident")
+        session_id = first[0]["data"]["session_id"]
+        assert first[-1]["data"]["session_id"] == session_id
+
+        ws_turn(ws, "chat")
+        for answer in ["Flooded underpass", "drainage", "Kenyatta Ave", "a@example.com"]:
+            ws_turn(ws, answer)
+        final = ws_turn(ws, "Water is knee deep")[-1]["data"]
+
+    assert final["session_id"] == session_id
+    assert "incident id" in final["reply"].lower()
+
+    incident = session.exec(select(Incident).where(Incident.title == "Flooded underpass")).first()
+    assert incident is not None
+    assert incident.category == "drainage"
+
+    convo = session.exec(select(Conversation).where(Conversation.session_id == session_id)).first()
+    msgs = session.exec(select(Message).where(Message.conversation_id == convo.id)).all()
+    assert len(msgs) == 14
+
+
+def test_websocket_rejects_invalid_message_and_stays_open(client: TestClient):
+    with client.websocket_connect("/api/chat/ws?session_id=ws-invalid-test") as ws:
+        assert ws_turn(ws, "")[-1]["event"] == "error"
+        events = ws_turn(ws, "Hello there!")
+        ws.send_text("not json")
+        assert ws.receive_json()["event"] == "error"
+    assert events[0]["data"]["session_id"] == "ws-invalid-test"
+    assert events[-1]["event"] == "final"
+
+
+def test_websocket_failed_turn_sends_error_and_keeps_flow_state(client: TestClient, monkeypatch):
+    from backend.routes import chat
+
+    session_id = f"ws-error-{uuid.uuid4()}"
+    with client.websocket_connect(f"/api/chat/ws?session_id={session_id}") as ws:
+        ws_turn(ws, "I want to report an incident")
+        ws_turn(ws, "chat")
+
+        real_next_id = chat.incident_ids.next_id
+        calls = []
+
+        def failing_next_id():
+            calls.append(1)
+            if len(calls) == 1:
+                raise RuntimeError("id service down")
+            return real_next_id()
+
+        monkeypatch.setattr(chat.incident_ids, "next_id", failing_next_id)
+        for answer in ["Blocked drain", "drainage", "River Road", "a@example.com"]:
+            ws_turn(ws, answer)
+        assert ws_turn(ws, "Overflowing onto the road")[-1]["event"] == "error"
+
+        # Same socket, same step: the description is asked for again and accepted
+        final = ws_turn(ws, "Overflowing onto the road")[-1]
+    assert final["event"] == "final"
+    assert "incident id" in final["data"]["reply"].lower()
@@ -10,7 +10,8 @@ from backend.models import Incident, IncidentHistory, IncidentStatus
 # Helpers
 # -------------------------
 def is_valid_public_id(value: str) -> bool:
-    return bool(re.fullmatch(r"[A-Z0-9]{8}", value))
+    # 11 Crockford base32 symbols + check symbol
+    return bool(re.fullmatch(r"[0-9A-HJKMNP-TV-Z]{12}", value))
 
 
 # -------------------------
@@ -0,0 +1,69 @@
+import asyncio
+
+from backend.utils.admission import AdmissionController
+
+
+# -------------------------
+# Admission
+# -------------------------
+def test_admits_up_to_max_in_flight_then_sheds():
+    ctrl = AdmissionController(max_in_flight=2, max_queue_wait_ms=0)
+
+    async def go():
+        return [await ctrl.acquire() for _ in range(3)]
+
+    assert asyncio.run(go()) == [True, True, False]
+    assert ctrl.in_flight == 2
+
+
+def test_waiter_gets_released_slot():
+    ctrl = AdmissionController(max_in_flight=1, max_queue_wait_ms=1000)
+
+    async def go():
+        assert await ctrl.acquire()
+        waiter = asyncio.create_task(ctrl.acquire())
+        await asyncio.sleep(0.01)
+        ctrl.release()
+        return await waiter
+
+    assert asyncio.run(go()) is True
+    assert ctrl.in_flight == 1  # handed over, not freed
+
+    ctrl.release()
+    assert ctrl.in_flight == 0
+
+
+def test_waiter_shed_after_max_queue_wait():
+    ctrl = AdmissionController(max_in_flight=1, max_queue_wait_ms=20)
+
+    async def go():
+        assert await ctrl.acquire()
+        admitted = await ctrl.acquire()
+        ctrl.release()
+        return admitted
+
+    assert asyncio.run(go()) is False
+    assert ctrl.in_flight == 0
+
+
+def test_slot_releases_on_exit_and_zero_limit_admits_all():
+    ctrl = AdmissionController(max_in_flight=1, max_queue_wait_ms=0)
+
+    async def go():
+        async with ctrl.slot() as first, ctrl.slot() as second:
+            assert (first, second) == (True, False)
+        async with AdmissionController(0, 0).slot() as unlimited:
+            assert unlimited
+
+    asyncio.run(go())
+    assert ctrl.in_flight == 0
+
+
+def test_max_wait_override_caps_queue_wait():
+    ctrl = AdmissionController(max_in_flight=1, max_queue_wait_ms=10_000)
+
+    async def go():
+        assert await ctrl.acquire()
+        return await ctrl.acquire(max_wait_ms=0)
+
+    assert asyncio.run(go()) is False
@@ -0,0 +1,128 @@
+import argparse
+import asyncio
+
+import httpx
+import pytest
+
+from backend.benchmarks import chat_load, retrieval
+from backend.main import app
+
+
+# -------------------------
+# Retrieval harness
+# -------------------------
+def test_quality_recall_and_mrr():
+    ranked = [["a", "b"], ["b", "a"], ["c", "d"]]
+    recall, mrr = retrieval.quality(ranked, ["a", "a", "a"])
+    assert recall == 2 / 3
+    assert mrr == (1 + 0.5) / 3
+
+
+def test_retrieval_harness_smoke(tmp_path):
+    out = tmp_path / "report.json"
+    retrieval.main(
+        [
+            "--chunks",
+            "60",
+            "--queries",
+            "5",
+            "--dim",
+            "16",
+            "--latent-dim",
+            "8",
+            "--pca-dim",
+            "4",
+            "--k",
+            "3",
+            "--out",
+            str(out),
+        ]
+    )
+    report = out.read_text()
+    for mode in retrieval.MODES:
+        assert f'"{mode}"' in report
+    assert '"recall@3"' in report
+
+
+def test_int8_and_hybrid_modes_track_exact():
+    args = argparse.Namespace(
+        chunks=90,
+        chunks_per_doc=3,
+        dim=16,
+        latent_dim=8,
+        clusters=5,
+        queries=20,
+        query_noise=0.3,
+        vocab=500,
+        doc_terms=8,
+        query_terms=3,
+        term_noise=0.0,
+        hybrid_weight=0.5,
+        seed=0,
+    )
+    corpus = retrieval.make_corpus(args)
+    ranked = {
+        mode: retrieval.MODES[mode](corpus, args)(
+            corpus.queries, corpus.query_texts, 5
+        )
+        for mode in ("exact", "int8", "hybrid")
+    }
+    assert [row[0] for row in ranked["int8"]] == [row[0] for row in ranked["exact"]]
+
+    # Keyword-only: every query carries its document's terms verbatim
+    args.hybrid_weight = 0.0
+    keyword = retrieval.build_hybrid(corpus, args)(corpus.queries, corpus.query_texts, 5)
+    assert [row[0] for row in keyword] == corpus.labels
+    assert retrieval.quality(ranked["hybrid"], corpus.labels)[0] == 1.0
+
+
+# -------------------------
+# Chat load generator
+# -------------------------
+def test_parse_mix_rejects_unknown_scenario():
+    assert chat_load.parse_mix("general=3,incident=1") == {"general": 3.0, "incident": 1.0}
+    with pytest.raises(argparse.ArgumentTypeError):
+        chat_load.parse_mix("general=1,shopping=2")
+
+
+def test_chat_load_drives_all_scenarios(client):
+    args = argparse.Namespace(
+        residents=3,
+        sessions=3,
+        mix=chat_load.parse_mix("general=1,status=1,incident=1"),
+        seed=0,
+    )
+
+    async def go():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as c:
+            return await chat_load.drive(c, args, ["NOPE0001"])
+
+    stats, wall_ms = asyncio.run(go())
+    assert stats.errors == {}
+    assert sum(stats.sessions.values()) == 9
+
+    rows = {"conversation": 0, "message": 0}
+    turns = sum(len(ms) for ms in stats.latencies.values())
+    result = chat_load.report(args, stats, wall_ms, rows, {"conversation": 9, "message": 2 * turns})
+    assert result["turns"] == turns
+    assert result["db_rows"]["per_turn"]["message"] == 2.0
+    assert set(result["latency_ms"]) >= {"all", *stats.latencies}
+
+
+# -------------------------
+# Public ID uniqueness
+# -------------------------
+def test_public_id_benchmark_smoke(tmp_path):
+    import json
+
+    from backend.benchmarks import public_ids
+
+    out = tmp_path / "ids.json"
+    public_ids.main(["--processes", "2", "--per-process", "2000", "--out", str(out)])
+    report = json.loads(out.read_text())
+    assert report["public_ids"]["ids"] == 4000
+    assert report["public_ids"]["duplicates"] == 0
+    assert report["public_ids"]["bad_check_symbols"] == 0
+    assert report["public_ids"]["ordered_within_process"] is True
+    assert "expected_duplicates" in report["legacy"]
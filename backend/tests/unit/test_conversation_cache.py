@@ -0,0 +1,76 @@
+from backend.utils.conversation_cache import CachedConversation, ConversationCache
+
+
+# -------------------------
+# Helpers
+# -------------------------
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def convo(session_id: str, **state) -> CachedConversation:
+    return CachedConversation(id=f"id-{session_id}", session_id=session_id, state=state)
+
+
+# -------------------------
+# Tests
+# -------------------------
+def test_put_stores_a_copy():
+    cache = ConversationCache(max_size=10, ttl_seconds=60)
+    live = convo("s1", step="title")
+    cache.put(live)
+    live.state["step"] = "category"
+    live.pending_intent = "incident_report_flow"
+
+    cached = cache.get("s1")
+    assert cached.state == {"step": "title"}
+    assert cached.pending_intent is None
+
+
+def test_get_returns_copy_and_counts_hits_and_misses():
+    cache = ConversationCache(max_size=10, ttl_seconds=60)
+    assert cache.get("s1") is None
+
+    cache.put(convo("s1", step="title"))
+    hit = cache.get("s1")
+    hit.state["step"] = "changed"
+
+    assert cache.get("s1").state == {"step": "title"}
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ConversationCache(max_size=2, ttl_seconds=60)
+    cache.put(convo("a"))
+    cache.put(convo("b"))
+    cache.get("a")  # "b" is now least recently used
+    cache.put(convo("c"))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+
+def test_idle_entries_expire():
+    clock = FakeClock()
+    cache = ConversationCache(max_size=10, ttl_seconds=30, clock=clock)
+    cache.put(convo("a"))
+
+    clock.now = 20
+    assert cache.get("a") is not None  # access refreshes idle time
+    clock.now = 45
+    assert cache.get("a") is not None
+    clock.now = 80
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_zero_size_disables_cache():
+    cache = ConversationCache(max_size=0, ttl_seconds=30)
+    cache.put(convo("a"))
+    assert cache.get("a") is None
+    assert len(cache) == 0
@@ -0,0 +1,59 @@
+import pytest
+from sqlalchemy import text
+from sqlmodel import SQLModel, create_engine
+
+from backend import db
+from backend.db import async_database_url, missing_indexes
+from backend.settings import settings
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        ("sqlite:///./dev.db", "sqlite+aiosqlite:///./dev.db"),
+        ("sqlite:///:memory:", "sqlite+aiosqlite:///:memory:"),
+        ("postgresql://u:p@db:5432/civic", "postgresql+asyncpg://u:p@db:5432/civic"),
+        ("postgres://u:p@db/civic", "postgresql+asyncpg://u:p@db/civic"),
+        ("postgresql+psycopg://u:p@db/civic", "postgresql+psycopg://u:p@db/civic"),
+        ("postgresql+asyncpg://u:p@db/civic", "postgresql+asyncpg://u:p@db/civic"),
+        ("postgresql+psycopg2://u:p@db/civic", "postgresql+asyncpg://u:p@db/civic"),
+        ("postgresql+pg8000://u:p@db/civic", "postgresql+asyncpg://u:p@db/civic"),
+        ("sqlite+pysqlite:///./dev.db", "sqlite+aiosqlite:///./dev.db"),
+    ],
+)
+def test_async_database_url(url: str, expected: str):
+    assert async_database_url(url) == expected
+
+
+def test_async_database_url_rejects_unknown_databases():
+    with pytest.raises(ValueError):
+        async_database_url("mysql+pymysql://u:p@db/civic")
+
+
+def test_async_engine_is_only_built_on_first_use(monkeypatch):
+    # Scripts on a database without an async driver still import db.py
+    monkeypatch.setattr(settings, "DATABASE_URL", "mysql+pymysql://u:p@db/civic")
+    monkeypatch.setattr(settings, "ASYNC_DATABASE_URL", None)
+    monkeypatch.setattr(db, "_async_engine", None)
+    with pytest.raises(ValueError):
+        db.get_async_engine()
+
+    monkeypatch.setattr(settings, "ASYNC_DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+    engine = db.get_async_engine()
+    assert db.get_async_engine() is engine
+
+
+def test_missing_indexes_empty_for_model_schema(engine):
+    assert missing_indexes(engine) == []
+
+
+def test_missing_indexes_reports_dropped_index(tmp_path):
+    scratch = create_engine(f"sqlite:///{tmp_path / 'schema.db'}")
+    SQLModel.metadata.create_all(scratch)
+    with scratch.begin() as conn:
+        conn.execute(text("DROP INDEX ix_message_conversation_id_timestamp"))
+        # A wider index with the same leading columns still counts
+        conn.execute(text("DROP INDEX ix_conversation_user_id"))
+        conn.execute(text("CREATE INDEX ix_other ON conversation (user_id, created_at)"))
+
+    assert missing_indexes(scratch) == ["message(conversation_id, timestamp)"]
@@ -0,0 +1,63 @@
+import pytest
+
+from backend.utils.deadline import Deadline, LatencyEstimate
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+# -------------------------
+# Deadline
+# -------------------------
+def test_deadline_counts_down_and_expires():
+    clock = FakeClock()
+    deadline = Deadline(300, clock=clock)
+    assert deadline.remaining_ms() == pytest.approx(300)
+    assert deadline.allows(250)
+
+    clock.now += 0.1
+    assert not deadline.allows(250)
+    assert not deadline.expired()
+
+    clock.now += 0.25
+    assert deadline.expired()
+
+
+def test_zero_budget_never_expires():
+    deadline = Deadline(0)
+    assert not deadline.expired()
+    assert deadline.allows(10**9)
+
+
+# -------------------------
+# Latency estimate
+# -------------------------
+def test_latency_estimate_smooths_from_initial_value():
+    est = LatencyEstimate(alpha=0.5, half_life_s=0)
+    assert est.value_ms == 0.0
+    est.observe(100)
+    assert est.value_ms == 50
+    est.observe(200)
+    assert est.value_ms == 125
+
+
+def test_one_slow_sample_does_not_lock_out_the_step():
+    clock = FakeClock()
+    est = LatencyEstimate(initial_ms=20, half_life_s=10, clock=clock)
+
+    est.observe(5000)  # one cold-start / GC-pause outlier
+    assert not Deadline(300, clock=clock).allows(est.value_ms)
+
+    # Skipped steps observe nothing; the estimate decays until one fits again
+    clock.now += 30
+    assert Deadline(300, clock=clock).allows(est.value_ms)
+
+    est.observe(25)  # the probe is fast, so the estimate keeps falling
+    assert est.value_ms < 300
+    clock.now += 60
+    assert est.value_ms < 25
@@ -0,0 +1,44 @@
+import asyncio
+import threading
+
+from backend.utils.incident_events import IncidentEventBus
+
+
+# -------------------------
+# Bus
+# -------------------------
+def test_publish_wakes_incident_and_feed_subscribers_only():
+    bus = IncidentEventBus()
+
+    async def go():
+        one = bus.subscribe("ABC")
+        other = bus.subscribe("XYZ")
+        feed = bus.subscribe()
+        bus.publish("ABC")
+        return [await sub.wait(0.05) for sub in (one, other, feed)]
+
+    assert asyncio.run(go()) == [True, False, True]
+
+
+def test_publish_from_another_thread():
+    bus = IncidentEventBus()
+
+    async def go():
+        sub = bus.subscribe("ABC")
+        threading.Thread(target=bus.publish, args=("ABC",)).start()
+        return await sub.wait(1)
+
+    assert asyncio.run(go()) is True
+
+
+def test_close_unsubscribes():
+    bus = IncidentEventBus()
+
+    async def go():
+        sub = bus.subscribe("ABC")
+        sub.close()
+        bus.publish("ABC")
+        return await sub.wait(0.05)
+
+    assert asyncio.run(go()) is False
+    assert bus._subs == {}
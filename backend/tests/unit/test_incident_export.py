@@ -0,0 +1,48 @@
+import csv
+import gzip
+import io
+import json
+
+from backend.utils.incident_export import CSV_COLUMNS, encode_batches, gzip_chunks
+
+
+# -------------------------
+# Helpers
+# -------------------------
+def record(public_id: str) -> dict:
+    return {
+        "incident_id": public_id,
+        "title": "Leak, big",
+        "description": "Line one\nline two",
+        "category": "water_supply",
+        "priority": None,
+        "status": "new",
+        "location_text": None,
+        "contact_email": None,
+        "created_at": "2024-01-01T00:00:00",
+        "updated_at": "2024-01-01T00:00:00",
+        "history": [{"status": "new", "note": "Incident created"}],
+    }
+
+
+# -------------------------
+# Encoding
+# -------------------------
+def test_csv_one_chunk_per_batch_with_header_first():
+    chunks = list(encode_batches([[record("A"), record("B")], [record("C")]], "csv"))
+    assert len(chunks) == 3
+    rows = list(csv.DictReader(io.StringIO("".join(chunks))))
+    assert list(rows[0]) == CSV_COLUMNS
+    assert [r["incident_id"] for r in rows] == ["A", "B", "C"]
+    assert rows[0]["description"] == "Line one\nline two"
+    assert json.loads(rows[0]["history"]) == record("A")["history"]
+
+
+def test_ndjson_round_trips():
+    text = "".join(encode_batches([[record("A")], [record("B")]], "ndjson"))
+    assert [json.loads(line) for line in text.splitlines()] == [record("A"), record("B")]
+
+
+def test_gzip_chunks_decompress_to_input():
+    chunks = ["header\n", "x" * 100_000, "tail\n"]
+    assert gzip.decompress(b"".join(gzip_chunks(chunks))).decode() == "".join(chunks)
@@ -0,0 +1,67 @@
+from backend.utils.incident_import import iter_records
+
+
+# -------------------------
+# Parsing
+# -------------------------
+def test_ndjson_records_and_errors_by_line():
+    lines = [
+        '{"title": "Leak", "category": "water_supply"}\n',
+        "\n",
+        "not json\n",
+        "[1, 2]\n",
+    ]
+    out = list(iter_records(lines, "ndjson"))
+    assert out[0] == (1, {"title": "Leak", "category": "water_supply"}, None)
+    assert [(line, record) for line, record, _ in out[1:]] == [(3, None), (4, None)]
+    assert out[1][2].startswith("invalid JSON")
+    assert out[2][2] == "expected a JSON object"
+
+
+def test_csv_uses_header_and_drops_empty_cells():
+    text = (
+        "title,description,category,contact_email\n"
+        "Leak,Pipe burst,water_supply,\n"
+        'Pothole,"Deep\nhole",road_maintenance,a@example.com\n'
+    )
+    out = list(iter_records(text.splitlines(keepends=True), "csv"))
+    assert out[0] == (
+        2,
+        {"title": "Leak", "description": "Pipe burst", "category": "water_supply"},
+        None,
+    )
+    line, record, error = out[1]
+    assert error is None and record["description"] == "Deep\nhole"
+    assert line == 4  # the line the quoted record ends on
+
+
+def test_iter_records_is_lazy():
+    def lines():
+        yield '{"title": "one"}\n'
+        raise AssertionError("read past the first record")
+
+    assert next(iter_records(lines(), "ndjson"))[0] == 1
+
+
+def test_csv_reports_malformed_record_and_keeps_going():
+    import csv
+
+    text = (
+        "title,description\n"
+        "Leak,Pipe burst\n"
+        f'Pothole,"{"x" * 30}"\n'  # over the field size limit below
+        "\n"
+        "Graffiti,On the bridge\n"
+    )
+    limit = csv.field_size_limit(20)
+    try:
+        out = list(iter_records(text.splitlines(keepends=True), "csv"))
+    finally:
+        csv.field_size_limit(limit)
+    assert [(line, record is None) for line, record, _ in out] == [
+        (2, False),
+        (3, True),
+        (5, False),
+    ]
+    assert out[1][2].startswith("invalid CSV:")
+    assert out[2][1] == {"title": "Graffiti", "description": "On the bridge"}
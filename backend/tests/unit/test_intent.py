@@ -0,0 +1,151 @@
+import asyncio
+import re
+
+import numpy as np
+import pytest
+
+from backend.settings import settings
+from backend.utils.intent import IntentClassifier, KeywordMatcher
+
+
+# -------------------------
+# KeywordMatcher
+# -------------------------
+def test_matcher_counts_hits_per_label_in_one_pass():
+    matcher = KeywordMatcher({"a": ["leak", "pothole"], "b": ["status", "leak"]})
+    assert matcher.count("Leak by the pothole, and another leak. Status?") == {
+        "a": 3,
+        "b": 3,
+    }
+
+
+def test_matcher_uses_word_boundaries():
+    matcher = KeywordMatcher({"status": ["done"], "query": ["how"]})
+    assert matcher.count("the car was abandoned, show me") == {"status": 0, "query": 0}
+
+
+def test_matcher_accepts_simple_inflections():
+    matcher = KeywordMatcher({"incident": ["report", "streetlight"]})
+    assert matcher.count("I reported two streetlights") == {"incident": 2}
+
+
+def test_matcher_handles_shared_prefixes_and_special_chars():
+    matcher = KeywordMatcher({"x": ["in", "information", "c++", "rates"]})
+    assert matcher.count("information in C++ rates") == {"x": 4}
+
+
+def test_matcher_with_thousands_of_keywords():
+    words = [f"term{i}" for i in range(5000)]
+    matcher = KeywordMatcher({"big": words})
+    assert matcher.count("term4999 and term12 but not term") == {"big": 2}
+    assert isinstance(matcher.pattern, re.Pattern)
+
+
+def test_matcher_without_keywords():
+    assert KeywordMatcher({"empty": []}).count("anything") == {"empty": 0}
+
+
+# -------------------------
+# IntentClassifier
+# -------------------------
+def test_classify_intent_priority_and_fallback():
+    classifier = IntentClassifier()
+    assert asyncio.run(classifier.classify_intent("How do I report a pothole?")) == (
+        "incident_report",
+        0.95,
+    )
+    assert asyncio.run(classifier.classify_intent("Check status")) == (
+        "status_check",
+        0.95,
+    )
+    assert asyncio.run(classifier.classify_intent("The car was abandoned")) == (
+        "unknown",
+        0.50,
+    )
+
+
+def test_classify_many_matches_single_calls():
+    classifier = IntentClassifier(extra_keywords={"general_query": ["permit"]})
+    messages = ["Broken pipe", "Any update?", "Permit for a party", "asdf"]
+    assert asyncio.run(classifier.classify_many(messages)) == [
+        ("incident_report", 0.95),
+        ("status_check", 0.95),
+        ("general_query", 0.90),
+        ("unknown", 0.50),
+    ]
+
+
+# -------------------------
+# Embedding centroids
+# -------------------------
+AXES = {"pothole": 0, "status": 1, "permit": 2}
+
+
+def fake_encode(texts):
+    """One axis per topic word; enough to give each intent its own direction."""
+    out = np.zeros((len(texts), 4), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for word, axis in AXES.items():
+            if word in text.lower():
+                out[row, axis] = 1.0
+        out[row, 3] = 0.1
+    return out
+
+
+EXAMPLES = {
+    "incident_report": ["pothole here", "another pothole"],
+    "status_check": ["status please", "what status"],
+    "general_query": ["permit info", "permit office"],
+}
+
+
+def test_centroid_intent_picks_nearest_centroid():
+    classifier = IntentClassifier(encode=fake_encode)
+    classifier.fit_centroids(EXAMPLES)
+
+    intent, similarity = classifier.centroid_intent(fake_encode(["Permit?"])[0])
+
+    assert intent == "general_query"
+    assert similarity > 0.9
+
+
+def test_classify_intent_uses_vector_then_falls_back_to_keywords(monkeypatch):
+    monkeypatch.setattr(settings, "INTENT_MIN_SIMILARITY", 0.5)
+    classifier = IntentClassifier(encode=fake_encode)
+    classifier.fit_centroids(EXAMPLES)
+
+    # No keyword hits, but the embedding is close to the status centroid
+    vec = fake_encode(["status"])[0]
+    assert asyncio.run(classifier.classify_intent("zzz", query_vec=vec))[0] == (
+        "status_check"
+    )
+
+    # Embedding is far from every centroid -> keyword rules decide
+    far = np.array([0.0, 0.0, 0.0, 1.0], dtype=np.float32)
+    assert asyncio.run(classifier.classify_intent("broken pipe", query_vec=far)) == (
+        "incident_report",
+        0.95,
+    )
+
+
+def test_classify_intent_fits_centroids_off_the_event_loop():
+    import threading
+
+    threads = []
+
+    def encode(texts):
+        threads.append(threading.current_thread())
+        return fake_encode(texts)
+
+    classifier = IntentClassifier(encode=encode)
+    with pytest.raises(RuntimeError):
+        classifier.centroid_intent(fake_encode(["status"])[0])
+
+    asyncio.run(classifier.classify_intent("zzz", query_vec=fake_encode(["status"])[0]))
+    assert classifier.centroids is not None
+    assert threads and threading.main_thread() not in threads
+
+
+def test_centroids_require_encode_function():
+    with pytest.raises(RuntimeError):
+        IntentClassifier().fit_centroids(EXAMPLES)
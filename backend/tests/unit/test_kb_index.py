@@ -0,0 +1,262 @@
+import json
+
+import numpy as np
+import pytest
+
+from backend.models import KBChunk, KBDoc, KBGeneration
+from backend.settings import settings
+from backend.utils import kb_index as kb_index_module
+from backend.utils.kb_index import (
+    KBIndex,
+    cached_kb_version,
+    kb_version,
+    keyword_docs,
+    load_or_build_index,
+    load_snapshot,
+    save_snapshot,
+)
+
+
+# -------------------------
+# Helpers
+# -------------------------
+def make_index() -> KBIndex:
+    rows = [
+        ("c1", "docA", json.dumps([1.0, 0.0, 0.0])),
+        ("c2", "docB", json.dumps([0.0, 1.0, 0.0])),
+        ("c3", "docA", json.dumps([0.0, 0.0, 2.0])),
+        ("c4", "docC", None),
+        ("c5", "docC", "not json"),
+    ]
+    return KBIndex.from_rows(rows, version="v1")
+
+
+# -------------------------
+# Building
+# -------------------------
+def test_from_rows_skips_missing_and_invalid_embeddings():
+    index = make_index()
+    assert len(index) == 3
+    assert index.dim == 3
+    assert index.doc_ids == ["docA", "docB"]
+    assert np.allclose(np.linalg.norm(index.matrix, axis=1), 1.0)
+
+
+def test_empty_index_returns_empty_results():
+    index = KBIndex.from_rows([])
+    assert len(index) == 0
+    assert index.search_many(np.ones((2, 3), dtype=np.float32)) == [[], []]
+
+
+# -------------------------
+# Scoring
+# -------------------------
+def test_search_many_max_pools_chunks_per_doc():
+    index = make_index()
+    queries = np.array([[0.0, 0.0, 5.0], [0.0, 3.0, 0.0]], dtype=np.float32)
+
+    results = index.search_many(queries, top_k=5, min_score=0.3)
+
+    assert results[0] == [("docA", 1.0)]
+    assert results[1] == [("docB", 1.0)]
+
+
+def test_search_many_respects_top_k_and_ordering():
+    index = make_index()
+    query = np.array([[1.0, 0.9, 0.0]], dtype=np.float32)
+
+    top1 = index.search_many(query, top_k=1, min_score=0.0)[0]
+    top2 = index.search_many(query, top_k=2, min_score=0.0)[0]
+
+    assert [doc for doc, _ in top1] == ["docA"]
+    assert [doc for doc, _ in top2] == ["docA", "docB"]
+    assert top2[0][1] >= top2[1][1]
+
+
+# -------------------------
+# PCA projection
+# -------------------------
+def test_pca_index_reduces_dimension_and_keeps_nearest_doc():
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(40, 16)).astype(np.float32)
+    chunk_ids = [f"c{i}" for i in range(40)]
+    doc_ids = [f"d{i}" for i in range(40)]
+
+    index = KBIndex(chunk_ids, doc_ids, vectors, pca_dim=8)
+
+    assert index.projection is not None
+    assert index.dim == 8
+    assert index.search_many(vectors[7:8], top_k=1, min_score=-1.0)[0][0][0] == "d7"
+
+
+def test_pca_matches_unprojected_top_k_and_threshold():
+    # Chunks and queries in a 6-dim subspace of 32 dims: an 8-dim projection
+    # loses nothing, so ranking, scores and the MIN_SCORE cut must not change
+    rng = np.random.default_rng(2)
+    basis = rng.normal(size=(6, 32))
+    vectors = (rng.normal(size=(60, 6)) @ basis).astype(np.float32)
+    queries = (rng.normal(size=(10, 6)) @ basis).astype(np.float32)
+    chunk_ids = [f"c{i}" for i in range(60)]
+    doc_ids = [f"d{i // 3}" for i in range(60)]
+
+    exact = KBIndex(chunk_ids, doc_ids, vectors).search_many(queries, top_k=20)
+    reduced = KBIndex(chunk_ids, doc_ids, vectors, pca_dim=8).search_many(
+        queries, top_k=20
+    )
+
+    assert any(len(hits) < 20 for hits in exact)  # the threshold does cut
+    for exact_hits, reduced_hits in zip(exact, reduced, strict=True):
+        assert [d for d, _ in reduced_hits] == [d for d, _ in exact_hits]
+        assert [s for _, s in reduced_hits] == pytest.approx(
+            [s for _, s in exact_hits], abs=1e-4
+        )
+
+
+def test_pca_skipped_when_target_dim_not_smaller():
+    index = make_index()
+    reduced = KBIndex(index.chunk_ids, ["docA", "docA", "docB"], index.matrix, pca_dim=3)
+    assert reduced.projection is None
+    assert reduced.dim == 3
+
+
+# -------------------------
+# Snapshots
+# -------------------------
+def test_snapshot_roundtrip(tmp_path):
+    rng = np.random.default_rng(1)
+    vectors = rng.normal(size=(10, 6)).astype(np.float32)
+    index = KBIndex(
+        [f"c{i}" for i in range(10)],
+        [f"d{i % 4}" for i in range(10)],
+        vectors,
+        version="v7",
+        pca_dim=3,
+    )
+    path = str(tmp_path / "kb_index.npz")
+
+    save_snapshot(index, path, pca_dim=3)
+    loaded, meta = load_snapshot(path)
+
+    assert meta["version"] == "v7"
+    assert meta["pca_dim"] == 3
+    assert loaded.chunk_ids == index.chunk_ids
+    assert loaded.doc_ids == index.doc_ids
+    assert loaded.search_many(vectors, top_k=2) == index.search_many(vectors, top_k=2)
+
+
+def test_snapshot_missing_or_corrupt_returns_none(tmp_path):
+    path = str(tmp_path / "kb_index.npz")
+    assert load_snapshot(path) is None
+
+    save_snapshot(make_index(), path)
+    with np.load(path) as data:
+        arrays = {name: data[name] for name in data.files}
+    arrays["matrix"] = arrays["matrix"] * 2
+    with open(path, "wb") as fh:
+        np.savez(fh, **arrays)
+
+    assert load_snapshot(path) is None
+
+
+def test_load_or_build_uses_matching_snapshot_only(tmp_path, session, monkeypatch):
+    path = str(tmp_path / "kb_index.npz")
+    monkeypatch.setattr(settings, "KB_SNAPSHOT_PATH", path)
+    version = kb_version(session)
+
+    built = load_or_build_index(session, version)
+    assert load_snapshot(path)[0].version == version
+
+    def fail_build(*args, **kwargs):
+        raise AssertionError("snapshot should have been used")
+
+    monkeypatch.setattr(kb_index_module.KBIndex, "build", fail_build)
+    assert load_or_build_index(session, version).chunk_ids == built.chunk_ids
+
+    with pytest.raises(AssertionError):
+        load_or_build_index(session, "some-other-version")
+
+
+# -------------------------
+# Versioning
+# -------------------------
+def test_kb_version_changes_on_every_chunk_write(session):
+    doc = KBDoc(title="Parking permits", body="Apply online.")
+    session.add(doc)
+    session.commit()
+    before = kb_version(session)
+    assert kb_version(session) == before  # other writes leave it alone
+
+    chunk = KBChunk(doc_id=doc.id, text=doc.body, embedding=json.dumps([1.0, 0.0]))
+    session.add(chunk)
+    session.commit()
+    added = kb_version(session)
+    assert added != before
+
+    # Re-embedded in place, same JSON length
+    chunk.embedding = json.dumps([0.0, 1.0])
+    session.add(chunk)
+    session.commit()
+    reembedded = kb_version(session)
+    assert reembedded != added
+
+    session.delete(chunk)
+    session.commit()
+    assert kb_version(session) not in (before, added, reembedded)
+
+
+def test_cached_kb_version_rereads_after_ttl_or_local_write(session, engine, monkeypatch):
+    from sqlalchemy import update
+
+    monkeypatch.setattr(settings, "KB_VERSION_TTL_SECONDS", 60.0)
+    monkeypatch.setattr(kb_index_module, "_checked_version", None)
+    version = cached_kb_version(session)
+
+    # Another process's write is not seen until the TTL runs out
+    with engine.begin() as conn:
+        conn.execute(
+            update(KBGeneration).values(generation=KBGeneration.generation + 1)
+        )
+    assert cached_kb_version(session) == version
+    monkeypatch.setattr(settings, "KB_VERSION_TTL_SECONDS", 0.0)
+    elsewhere = cached_kb_version(session)
+    assert elsewhere != version
+
+    # This process's own chunk writes expire it at once
+    monkeypatch.setattr(settings, "KB_VERSION_TTL_SECONDS", 60.0)
+    doc = KBDoc(title="Dog licences", body="Renew yearly.")
+    session.add(doc)
+    session.commit()
+    assert cached_kb_version(session) == elsewhere
+    chunk = KBChunk(doc_id=doc.id, text=doc.body, embedding=json.dumps([1.0]))
+    session.add(chunk)
+    session.commit()
+    assert cached_kb_version(session) not in (version, elsewhere)
+    session.delete(chunk)  # keep other tests' index at the model's dimension
+    session.commit()
+
+
+# -------------------------
+# Keyword fallback
+# -------------------------
+def test_keyword_docs_ranks_by_matched_terms(session):
+    both = KBDoc(title="Bulky waste pickup", body="Bulky waste is picked up on request.")
+    one = KBDoc(title="Waste sorting", body="Sort recyclables from general waste.")
+    session.add_all([both, one])
+    session.commit()
+
+    ranked = keyword_docs(session, "Where is bulky waste pickup?")
+    ids = [doc.id for doc, _ in ranked]
+    assert ids.index(both.id) < ids.index(one.id)
+    assert {doc.id: score for doc, score in ranked}[both.id] == 1.0
+    assert keyword_docs(session, "how do I?") == []
+
+
+def test_keyword_docs_treats_underscore_as_literal(session):
+    literal = KBDoc(title="Form zqv_permit", body="Request form.")
+    lookalike = KBDoc(title="Form zqvxpermit", body="Request form.")
+    session.add_all([literal, lookalike])
+    session.commit()
+
+    ids = [doc.id for doc, _ in keyword_docs(session, "zqv_permit")]
+    assert literal.id in ids
+    assert lookalike.id not in ids
@@ -0,0 +1,219 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from backend.settings import settings
+from backend.utils.public_ids import (
+    ALPHABET,
+    EPOCH,
+    MAX_SEQUENCE,
+    UNCONFIGURED_WORKER_IDS,
+    PublicIdGenerator,
+    parse_public_id,
+)
+
+
+# -------------------------
+# Helpers
+# -------------------------
+class FakeClock:
+    def __init__(self, now: float) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+NOW = datetime(2025, 6, 1, 12, 0, tzinfo=timezone.utc).timestamp()
+
+
+def generator(worker_id=None, clock=None) -> PublicIdGenerator:
+    clock = clock or FakeClock(NOW)
+    return PublicIdGenerator(worker_id=worker_id, clock=clock, sleep=clock.sleep)
+
+
+# -------------------------
+# Generation
+# -------------------------
+def test_ids_are_crockford_base32_with_valid_check():
+    public_id = generator(worker_id=7).next_id()
+    assert len(public_id) == 12
+    assert set(public_id) <= set(ALPHABET)
+
+    parts = parse_public_id(public_id)
+    assert parts.worker_id == 7
+    assert parts.sequence == 0
+    # Never in the second the generator started in
+    assert parts.issued_at == datetime.fromtimestamp(int(NOW) + 1, tz=timezone.utc)
+
+
+def test_ids_unique_and_ordered_past_sequence_overflow():
+    clock = FakeClock(NOW)
+    gen = generator(worker_id=1, clock=clock)
+    ids = [gen.next_id() for _ in range(MAX_SEQUENCE + 3)]
+    assert len(set(ids)) == len(ids)
+    assert ids == sorted(ids)
+    # Overflow waits for the next second rather than borrowing it
+    assert parse_public_id(ids[-1]).issued_at.timestamp() == int(NOW) + 2
+    assert clock.now == int(NOW) + 2
+
+    clock.now -= 1  # clock steps back: the current second's sequence continues
+    assert gen.next_id() > ids[-1]
+
+    # Far behind, once that second runs out there is nothing worth waiting for
+    clock.now -= 60
+    with pytest.raises(RuntimeError):
+        for _ in range(MAX_SEQUENCE):
+            gen.next_id()
+
+
+def test_workers_never_collide_in_the_same_second():
+    clock = FakeClock(NOW)
+    a = generator(worker_id=1, clock=clock)
+    b = generator(worker_id=2, clock=clock)
+    ids = [gen.next_id() for _ in range(500) for gen in (a, b)]
+    assert len(set(ids)) == len(ids)
+
+
+def test_workers_of_one_container_get_distinct_worker_ids(monkeypatch):
+    # One PUBLIC_ID_WORKER_ID per container, one slot per gunicorn worker
+    monkeypatch.setattr(settings, "PUBLIC_ID_WORKER_ID", 8)
+    clock = FakeClock(NOW)
+    gens, worker_ids = [], []
+    for slot in range(4):
+        monkeypatch.setenv("PUBLIC_ID_WORKER_INDEX", str(slot))
+        gens.append(generator(clock=clock))
+        worker_ids.append(gens[-1].worker_id)  # resolved in the worker itself
+
+    assert worker_ids == [8, 9, 10, 11]
+    ids = [gen.next_id() for _ in range(200) for gen in gens]
+    assert len(set(ids)) == len(ids)
+
+
+def test_restarted_worker_does_not_repeat_its_predecessors_ids():
+    clock = FakeClock(NOW)
+    old = generator(worker_id=5, clock=clock)
+    issued = {old.next_id() for _ in range(MAX_SEQUENCE + 10)}  # into the next second
+
+    # The replacement takes the same worker id within the same second
+    new = generator(worker_id=5, clock=clock)
+    assert not issued & {new.next_id() for _ in range(100)}
+
+
+def test_gunicorn_slots_are_unique_among_live_workers():
+    import importlib.util
+    from pathlib import Path
+    from types import SimpleNamespace
+
+    path = Path(__file__).parents[2] / "gunicorn_conf.py"
+    spec = importlib.util.spec_from_file_location("gunicorn_conf", path)
+    conf = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(conf)
+
+    server = SimpleNamespace(WORKERS={})
+    for pid in range(100, 104):
+        worker = SimpleNamespace()
+        conf.pre_fork(server, worker)
+        server.WORKERS[pid] = worker
+    assert sorted(w.slot for w in server.WORKERS.values()) == [0, 1, 2, 3]
+
+    del server.WORKERS[101]  # slot 1 exits and is replaced
+    replacement = SimpleNamespace()
+    conf.pre_fork(server, replacement)
+    assert replacement.slot == 1
+
+
+def test_worker_id_range_and_clock_range():
+    with pytest.raises(ValueError):
+        PublicIdGenerator(worker_id=1024)
+    with pytest.raises(ValueError):
+        generator(worker_id=0, clock=FakeClock(EPOCH - 2)).next_id()
+
+
+def test_after_fork_rederives_worker_id(monkeypatch):
+    import backend.utils.public_ids as public_ids
+
+    monkeypatch.delenv("PUBLIC_ID_WORKER_INDEX", raising=False)
+    monkeypatch.setattr(settings, "PUBLIC_ID_WORKER_ID", None)
+    monkeypatch.setattr(public_ids.os, "getpid", lambda: 5000)
+    gen = generator()
+    first = gen.worker_id
+    gen.next_id()
+
+    monkeypatch.setattr(public_ids.os, "getpid", lambda: 5001)
+    gen.after_fork()
+    assert gen.worker_id == first + 1
+    assert parse_public_id(gen.next_id()).sequence == 0
+
+
+def test_unconfigured_processes_never_share_a_gunicorn_worker_id(monkeypatch):
+    import backend.utils.public_ids as public_ids
+
+    monkeypatch.delenv("PUBLIC_ID_WORKER_INDEX", raising=False)
+    monkeypatch.setattr(settings, "PUBLIC_ID_WORKER_ID", None)
+    for pid in (1, 767, 768, 5000, 2**22 - 1):
+        monkeypatch.setattr(public_ids.os, "getpid", lambda pid=pid: pid)
+        assert generator().worker_id in UNCONFIGURED_WORKER_IDS
+
+    # A gunicorn slot may not reach into the reserved range
+    monkeypatch.setattr(settings, "PUBLIC_ID_WORKER_ID", UNCONFIGURED_WORKER_IDS.start - 2)
+    monkeypatch.setenv("PUBLIC_ID_WORKER_INDEX", "1")
+    assert generator().worker_id == UNCONFIGURED_WORKER_IDS.start - 1
+    monkeypatch.setenv("PUBLIC_ID_WORKER_INDEX", "2")
+    with pytest.raises(ValueError):
+        generator().next_id()
+
+
+def test_production_requires_a_worker_id_outside_gunicorn(monkeypatch):
+    monkeypatch.delenv("PUBLIC_ID_WORKER_INDEX", raising=False)
+    monkeypatch.setattr(settings, "PUBLIC_ID_WORKER_ID", None)
+    monkeypatch.setattr(settings, "ENV", "production")
+
+    gen = generator()  # resolved on first use, e.g. not in a preloading arbiter
+    with pytest.raises(RuntimeError, match="PUBLIC_ID_WORKER_ID"):
+        gen.next_id()
+
+    monkeypatch.setattr(settings, "PUBLIC_ID_WORKER_ID", 900)
+    assert parse_public_id(generator().next_id()).worker_id == 900
+
+
+# -------------------------
+# Parsing / check symbol
+# -------------------------
+def test_parse_accepts_lower_case_hyphens_and_lookalikes():
+    public_id = generator(worker_id=3).next_id()
+    expected = parse_public_id(public_id)
+    assert parse_public_id(f"{public_id[:6]}-{public_id[6:]}".lower()) == expected
+    if "1" in public_id:
+        assert parse_public_id(public_id.replace("1", "L")) == expected
+
+
+def test_check_symbol_catches_typos_and_transpositions():
+    gen = generator(worker_id=9)
+    for _ in range(50):
+        public_id = gen.next_id()
+        body = public_id[:-1]
+        for pos in range(len(body)):
+            for ch in ALPHABET:
+                diff = abs(ALPHABET.index(ch) - ALPHABET.index(body[pos]))
+                if diff in (0, 29):  # the only substitutions mod 29 cannot see
+                    continue
+                typo = body[:pos] + ch + body[pos + 1 :] + public_id[-1]
+                with pytest.raises(ValueError):
+                    parse_public_id(typo)
+        for pos in range(len(body) - 1):
+            a, b = body[pos], body[pos + 1]
+            if abs(ALPHABET.index(a) - ALPHABET.index(b)) in (0, 29):
+                continue
+            swapped = body[:pos] + b + a + body[pos + 2 :] + public_id[-1]
+            with pytest.raises(ValueError):
+                parse_public_id(swapped)
+
+
+def test_parse_rejects_malformed():
+    for bad in ("", "ABC", "U" * 12, "0" * 13):
+        with pytest.raises(ValueError):
+            parse_public_id(bad)
@@ -136,3 +136,24 @@ def test_unsupported_algorithm(settings: Settings):
 
     with pytest.raises(JWTError):
         security.decode_access_token(token, settings=bad_settings)
+
+
+# -------------------------
+# Chat flow tokens
+# -------------------------
+def test_flow_token_round_trip(settings: Settings):
+    token = security.create_flow_token(
+        "convo-1", "sess-1", "incident_report_flow", {"step": "category", "title": "Leak"},
+        settings=settings,
+    )
+    claims = security.decode_flow_token(token, settings=settings)
+    assert claims["cid"] == "convo-1"
+    assert claims["sid"] == "sess-1"
+    assert claims["pi"] == "incident_report_flow"
+    assert claims["st"] == {"step": "category", "title": "Leak"}
+
+
+def test_access_token_is_not_a_flow_token(settings: Settings):
+    token = security.create_access_token(data={"sub": "user123"}, settings=settings)
+    with pytest.raises(JWTError):
+        security.decode_flow_token(token, settings=settings)
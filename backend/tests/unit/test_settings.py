@@ -79,6 +79,13 @@ def test_jwt_secret_optional_in_development(monkeypatch: MonkeyPatch):
     assert s.JWT_SECRET_KEY is None
 
 
+def test_jwt_secret_required_for_chat_flow_tokens(monkeypatch: MonkeyPatch):
+    monkeypatch.setenv("ENV", "development")
+    monkeypatch.setenv("CHAT_FLOW_TOKENS", "true")
+    with pytest.raises(ValidationError):
+        Settings()
+
+
 # -------------------------
 # DATABASE_URL enforcement
 # -------------------------
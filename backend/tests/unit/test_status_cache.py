@@ -0,0 +1,77 @@
+from datetime import datetime, timezone
+
+from backend.schemas import IncidentStatusOut
+from backend.utils.status_cache import (
+    CachedStatus,
+    IncidentStatusCache,
+    etag_matches,
+    status_etag,
+)
+
+
+# -------------------------
+# Helpers
+# -------------------------
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def cached(status: str = "open") -> CachedStatus:
+    out = IncidentStatusOut(status=status, last_update=datetime(2024, 1, 1, tzinfo=timezone.utc))
+    return CachedStatus(out, status_etag("inc-1", out.last_update, 0))
+
+
+# -------------------------
+# ETags
+# -------------------------
+def test_etag_changes_with_updated_at_and_history():
+    base = status_etag("inc-1", datetime(2024, 1, 1, tzinfo=timezone.utc), 1)
+    assert base.startswith('"') and base.endswith('"')
+    assert status_etag("inc-1", datetime(2024, 1, 1, tzinfo=timezone.utc), 1) == base
+    assert status_etag("inc-1", datetime(2024, 1, 2, tzinfo=timezone.utc), 1) != base
+    assert status_etag("inc-1", datetime(2024, 1, 1, tzinfo=timezone.utc), 2) != base
+
+
+def test_etag_matches_lists_and_wildcard():
+    assert etag_matches('"a", "b"', '"b"')
+    assert etag_matches("*", '"b"')
+    assert not etag_matches('"a"', '"b"')
+    assert not etag_matches(None, '"b"')
+
+
+def test_etag_matches_weakly():
+    # e.g. a compressing proxy downgraded the ETag it passed on
+    assert etag_matches('W/"b"', '"b"')
+    assert etag_matches('"a", W/"b"', '"b"')
+    assert etag_matches('"b"', 'W/"b"')
+    assert not etag_matches('W/"a"', '"b"')
+
+
+# -------------------------
+# Cache
+# -------------------------
+def test_invalidate_drops_entry_and_blocks_stale_put():
+    cache = IncidentStatusCache(max_size=10, ttl_seconds=60)
+    generation = cache.generation
+    cache.put("ABC", cached(), generation)
+    assert cache.get("ABC") is not None
+
+    stale_generation = cache.generation
+    cache.invalidate("ABC")
+    assert cache.get("ABC") is None
+
+    cache.put("ABC", cached(), stale_generation)  # read raced with the update
+    assert cache.get("ABC") is None
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = IncidentStatusCache(max_size=10, ttl_seconds=30, clock=clock)
+    cache.put("ABC", cached(), cache.generation)
+    clock.now = 31
+    assert cache.get("ABC") is None
+    assert len(cache) == 0
@@ -0,0 +1,107 @@
+from contextlib import contextmanager
+
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session, select
+
+from backend.models import Conversation, Message, Sender
+from backend.utils.write_behind import MessageWriteBehind
+
+
+# -------------------------
+# Helpers
+# -------------------------
+def make_conversation(session: Session) -> Conversation:
+    convo = Conversation(state={})
+    session.add(convo)
+    session.commit()
+    session.refresh(convo)
+    return convo
+
+
+def messages_for(session: Session, convo: Conversation) -> list[Message]:
+    session.expire_all()
+    return session.exec(select(Message).where(Message.conversation_id == convo.id)).all()
+
+
+class FlakyEngine:
+    """Wraps an engine; the first `failures` transactions fail to connect."""
+
+    def __init__(self, engine, failures: int) -> None:
+        self.engine = engine
+        self.failures = failures
+
+    @contextmanager
+    def begin(self):
+        if self.failures > 0:
+            self.failures -= 1
+            raise OperationalError("INSERT INTO message", {}, Exception("database is locked"))
+        with self.engine.begin() as conn:
+            yield conn
+
+
+# -------------------------
+# Tests
+# -------------------------
+def test_submit_requires_running_writer(engine, session: Session):
+    writer = MessageWriteBehind(engine)
+    convo = make_conversation(session)
+    assert writer.submit([Message(conversation_id=convo.id, sender=Sender.bot, text="x")]) is False
+
+
+def test_batches_larger_than_max_batch_are_all_written(engine, session: Session):
+    writer = MessageWriteBehind(engine, max_batch=3, flush_interval_ms=60_000)
+    convo = make_conversation(session)
+    writer.start()
+    msgs = [Message(conversation_id=convo.id, sender=Sender.resident, text=f"m{i}") for i in range(7)]
+    assert writer.submit(msgs)
+    writer.stop()
+
+    assert writer.flush() == 0
+    assert sorted(m.text for m in messages_for(session, convo)) == [f"m{i}" for i in range(7)]
+
+
+def test_stop_flushes_remaining_rows(engine, session: Session):
+    writer = MessageWriteBehind(engine, max_batch=100, flush_interval_ms=60_000)
+    convo = make_conversation(session)
+    writer.start()
+    writer.submit([Message(conversation_id=convo.id, sender=Sender.bot, text="bye")])
+    writer.stop()
+
+    assert not writer.running
+    assert [m.text for m in messages_for(session, convo)] == ["bye"]
+
+
+def test_full_queue_rejects_submission(engine, session: Session):
+    writer = MessageWriteBehind(engine, max_queue=1, flush_interval_ms=60_000)
+    convo = make_conversation(session)
+    writer.start()
+    try:
+        msgs = [Message(conversation_id=convo.id, sender=Sender.bot, text=t) for t in "ab"]
+        assert writer.submit(msgs) is False
+    finally:
+        writer.stop()
+
+
+def test_failed_flush_is_retried_without_losing_messages(engine, session: Session):
+    flaky = FlakyEngine(engine, failures=2)
+    writer = MessageWriteBehind(flaky, max_attempts=3, retry_backoff_ms=1)
+    convo = make_conversation(session)
+    writer.start()
+    writer.submit([Message(conversation_id=convo.id, sender=Sender.bot, text=t) for t in "abc"])
+    writer.stop()
+
+    assert flaky.failures == 0
+    assert sorted(m.text for m in messages_for(session, convo)) == ["a", "b", "c"]
+
+
+def test_rejected_batch_falls_back_to_rows_and_drops_only_bad_ones(engine, session: Session):
+    writer = MessageWriteBehind(engine, flush_interval_ms=60_000)
+    convo = make_conversation(session)
+    good = Message(conversation_id=convo.id, sender=Sender.bot, text="good")
+    first = Message(conversation_id=convo.id, sender=Sender.bot, text="first")
+    duplicate = Message(id=first.id, conversation_id=convo.id, sender=Sender.bot, text="dup")
+    writer.start()
+    writer.submit([first, duplicate, good])
+    writer.stop()
+
+    assert sorted(m.text for m in messages_for(session, convo)) == ["first", "good"]
@@ -0,0 +1,129 @@
+# backend/utils/admission.py
+
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Deque, Optional
+
+from backend.metrics import (
+    RETRIEVAL_IN_FLIGHT,
+    RETRIEVAL_QUEUE_WAIT,
+    RETRIEVAL_QUEUED,
+    RETRIEVAL_SHED,
+)
+from backend.settings import settings
+
+
+class OverloadedError(Exception):
+    """Raised when a request is shed and should be retried after `retry_after` seconds."""
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__(f"overloaded; retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+@dataclass
+class _Waiter:
+    future: "asyncio.Future[None]"
+    granted: bool = False
+
+
+class AdmissionController:
+    """
+    Bounds how many callers run an expensive section at once.
+
+    Up to `max_in_flight` callers are admitted immediately; later ones wait
+    in FIFO order for at most `max_queue_wait_ms` and are then refused, so a
+    burst turns into fast degraded replies instead of an unbounded queue.
+    Slots are handed straight to the next waiter on release. Waiters may sit
+    on different event loops (one per worker thread or test client).
+    `max_in_flight=0` admits everyone.
+    """
+
+    def __init__(self, max_in_flight: int, max_queue_wait_ms: int) -> None:
+        self.max_in_flight = max_in_flight
+        self.max_queue_wait = max_queue_wait_ms / 1000
+        self.in_flight = 0
+        self._waiters: Deque[_Waiter] = deque()
+        self._lock = threading.Lock()
+
+    async def acquire(self, max_wait_ms: Optional[float] = None) -> bool:
+        """
+        Wait for a slot; False if none freed up within the max queue wait
+        (or `max_wait_ms`, if shorter).
+        """
+        if self.max_in_flight <= 0:
+            return True
+        wait = self.max_queue_wait
+        if max_wait_ms is not None:
+            wait = min(wait, max_wait_ms / 1000)
+        with self._lock:
+            if self.in_flight < self.max_in_flight and not self._waiters:
+                self.in_flight += 1
+                RETRIEVAL_IN_FLIGHT.set(self.in_flight)
+                return True
+            if wait <= 0:
+                RETRIEVAL_SHED.inc()
+                return False
+            waiter = _Waiter(asyncio.get_running_loop().create_future())
+            self._waiters.append(waiter)
+
+        RETRIEVAL_QUEUED.inc()
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(waiter.future, wait)
+        except TimeoutError:
+            pass
+        except asyncio.CancelledError:
+            if self._withdraw(waiter):
+                self.release()
+            raise
+        # A slot handed over just as the wait timed out is still ours
+        granted = self._withdraw(waiter)
+        RETRIEVAL_QUEUE_WAIT.observe(time.perf_counter() - start)
+        if not granted:
+            RETRIEVAL_SHED.inc()
+        return granted
+
+    def _withdraw(self, waiter: _Waiter) -> bool:
+        """Leave the queue; True if a slot was already handed to `waiter`."""
+        with self._lock:
+            if not waiter.granted:
+                self._waiters.remove(waiter)
+            return waiter.granted
+
+    def release(self) -> None:
+        if self.max_in_flight <= 0:
+            return
+        with self._lock:
+            if self._waiters:
+                waiter = self._waiters.popleft()
+                waiter.granted = True
+                waiter.future.get_loop().call_soon_threadsafe(_wake, waiter.future)
+                return
+            self.in_flight -= 1
+            RETRIEVAL_IN_FLIGHT.set(self.in_flight)
+
+    @asynccontextmanager
+    async def slot(self, max_wait_ms: Optional[float] = None) -> AsyncIterator[bool]:
+        """`async with controller.slot() as admitted:`; releases on exit if admitted."""
+        admitted = await self.acquire(max_wait_ms)
+        try:
+            yield admitted
+        finally:
+            if admitted:
+                self.release()
+
+
+def _wake(future: "asyncio.Future[None]") -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+retrieval_admission = AdmissionController(
+    max_in_flight=settings.RETRIEVAL_MAX_IN_FLIGHT,
+    max_queue_wait_ms=settings.RETRIEVAL_MAX_QUEUE_WAIT_MS,
+)
@@ -0,0 +1,134 @@
+# backend/utils/conversation_cache.py
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, Optional
+
+from backend.metrics import (
+    CONVERSATION_CACHE_HIT_RATIO,
+    CONVERSATION_CACHE_HITS,
+    CONVERSATION_CACHE_MISSES,
+    CONVERSATION_CACHE_SIZE,
+)
+from backend.models import Conversation
+from backend.settings import settings
+
+
+@dataclass
+class CachedConversation:
+    """
+    The parts of a `Conversation` row a chat turn reads and writes. `version`
+    is the row version this copy was read at; None if it did not come from
+    the row (e.g. a flow token).
+    """
+
+    id: str
+    session_id: str
+    pending_intent: Optional[str] = None
+    state: Dict[str, Any] = field(default_factory=dict)
+    version: Optional[int] = None
+
+    @classmethod
+    def from_row(cls, row: Conversation) -> "CachedConversation":
+        return cls(
+            id=row.id,
+            session_id=row.session_id,
+            pending_intent=row.pending_intent,
+            state=dict(row.state or {}),
+            version=row.version,
+        )
+
+
+class ConversationCache:
+    """
+    LRU cache of active conversations keyed by session_id.
+
+    Entries idle for longer than `ttl_seconds` are dropped on access. Callers
+    write changes through to the database before `put`, so a miss (eviction,
+    expiry) only costs one SELECT. `max_size=0` disables it.
+
+    The cache is per process and nothing invalidates it when another worker
+    advances the same conversation. Writes are conditional on the cached
+    `version`, so a stale entry can never overwrite newer flow state (the
+    turn reloads and re-runs instead), but a turn that writes nothing still
+    answers from the stale copy. Enable it only where a session sticks to
+    one worker.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[str, tuple[float, CachedConversation]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _record(self, hit: bool) -> None:
+        if hit:
+            self.hits += 1
+            CONVERSATION_CACHE_HITS.inc()
+        else:
+            self.misses += 1
+            CONVERSATION_CACHE_MISSES.inc()
+        CONVERSATION_CACHE_HIT_RATIO.set(self.hits / (self.hits + self.misses))
+        CONVERSATION_CACHE_SIZE.set(len(self._entries))
+
+    def get(self, session_id: str) -> Optional[CachedConversation]:
+        """Return a copy of the cached conversation, or None on a miss."""
+        if self.max_size <= 0:
+            return None
+        now = self._clock()
+        with self._lock:
+            item = self._entries.get(session_id)
+            if item is not None and now - item[0] > self.ttl_seconds:
+                del self._entries[session_id]
+                item = None
+            if item is not None:
+                self._entries[session_id] = (now, item[1])
+                self._entries.move_to_end(session_id)
+            self._record(item is not None)
+        if item is None:
+            return None
+        convo = item[1]
+        return replace(convo, state=dict(convo.state))
+
+    def put(self, convo: CachedConversation) -> None:
+        """Cache a copy, so later changes to `convo` need another `put`."""
+        if self.max_size <= 0:
+            return
+        convo = replace(convo, state=dict(convo.state))
+        with self._lock:
+            self._entries[convo.session_id] = (self._clock(), convo)
+            self._entries.move_to_end(convo.session_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            CONVERSATION_CACHE_SIZE.set(len(self._entries))
+
+    def invalidate(self, session_id: str) -> None:
+        with self._lock:
+            self._entries.pop(session_id, None)
+            CONVERSATION_CACHE_SIZE.set(len(self._entries))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            CONVERSATION_CACHE_SIZE.set(0)
+
+
+conversation_cache = ConversationCache(
+    max_size=settings.CONVERSATION_CACHE_SIZE,
+    ttl_seconds=settings.CONVERSATION_CACHE_TTL_SECONDS,
+)
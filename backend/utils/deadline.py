@@ -0,0 +1,71 @@
+# backend/utils/deadline.py
+
+import math
+import threading
+import time
+from typing import Callable
+
+
+class Deadline:
+    """A per-request latency budget; `budget_ms <= 0` means no deadline."""
+
+    def __init__(
+        self, budget_ms: float, clock: Callable[[], float] = time.perf_counter
+    ) -> None:
+        self._clock = clock
+        self.expires_at = clock() + budget_ms / 1000 if budget_ms > 0 else math.inf
+
+    def remaining_ms(self) -> float:
+        return (self.expires_at - self._clock()) * 1000
+
+    def expired(self) -> bool:
+        return self.remaining_ms() <= 0
+
+    def allows(self, cost_ms: float) -> bool:
+        """Whether a step expected to take `cost_ms` still fits."""
+        return self.remaining_ms() > cost_ms
+
+
+class LatencyEstimate:
+    """
+    Exponentially weighted moving average of how long a step takes.
+
+    Every sample, the first included, moves the estimate from `initial_ms`
+    by `alpha`, so one outlier cannot set it alone. While nothing is
+    observed the estimate decays back toward `initial_ms` with a half-life
+    of `half_life_s` (0 disables decay): a caller that skips the step while
+    the estimate is over its budget gets to try it again later, rather than
+    never observing the recovery.
+    """
+
+    def __init__(
+        self,
+        alpha: float = 0.2,
+        initial_ms: float = 0.0,
+        half_life_s: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.alpha = alpha
+        self.initial_ms = initial_ms
+        self.half_life_s = half_life_s
+        self._clock = clock
+        self._value_ms = initial_ms
+        self._observed_at = clock()
+        self._lock = threading.Lock()
+
+    def _current(self, now: float) -> float:
+        if self.half_life_s <= 0:
+            return self._value_ms
+        decay = math.pow(0.5, max(now - self._observed_at, 0.0) / self.half_life_s)
+        return self.initial_ms + (self._value_ms - self.initial_ms) * decay
+
+    @property
+    def value_ms(self) -> float:
+        return self._current(self._clock())
+
+    def observe(self, ms: float) -> None:
+        with self._lock:
+            now = self._clock()
+            current = self._current(now)
+            self._value_ms = current + self.alpha * (ms - current)
+            self._observed_at = now
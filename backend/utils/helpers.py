@@ -1,8 +1,30 @@
+import base64
+import json
 import random, string
+from datetime import datetime
+from typing import Tuple
 
 def generate_public_id(length: int = 8) -> str:
-    """Generate a random alphanumeric public ID."""
+    """
+    Generate a random alphanumeric ID. Not collision-checked; incident
+    public IDs come from `public_ids.incident_ids` instead.
+    """
     if length < 0:
         raise ValueError("length must be non-negative")
     return "".join(random.choices(string.ascii_uppercase + string.digits, k=length))
 
+
+def encode_cursor(ts: datetime, row_id: str) -> str:
+    """Opaque keyset cursor for the (timestamp, id) of the last row returned."""
+    raw = json.dumps({"u": ts.isoformat(), "i": row_id})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Inverse of `encode_cursor`. Raises ValueError if malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        return datetime.fromisoformat(data["u"]), str(data["i"])
+    except (ValueError, KeyError, TypeError) as exc:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from exc
@@ -0,0 +1,226 @@
+# backend/utils/incident_events.py
+
+import asyncio
+import contextlib
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import tuple_
+from sqlmodel import col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.models import Incident, IncidentHistory
+from backend.settings import settings
+from backend.utils.helpers import encode_cursor
+
+# Subscription key for the staff-wide feed
+ALL_INCIDENTS = "*"
+
+# History rows read per catch-up query
+REPLAY_BATCH = 100
+
+Cursor = Tuple[datetime, str]  # (timestamp, history id)
+
+
+class Subscription:
+    """Wakes its owner when a subscribed incident changes. Bound to the subscriber's loop."""
+
+    def __init__(self, bus: "IncidentEventBus", key: str) -> None:
+        self.bus = bus
+        self.key = key
+        self._loop = asyncio.get_running_loop()
+        self._event = asyncio.Event()
+
+    def notify(self) -> None:
+        with contextlib.suppress(RuntimeError):  # subscriber's loop already closed
+            self._loop.call_soon_threadsafe(self._event.set)
+
+    async def wait(self, timeout: float) -> bool:
+        """True if notified within `timeout` seconds."""
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except TimeoutError:
+            return False
+        self._event.clear()
+        return True
+
+    def close(self) -> None:
+        self.bus.unsubscribe(self)
+
+
+class IncidentEventBus:
+    """
+    In-process pub/sub for incident changes. Publishing only wakes
+    subscribers; the events themselves are read back from `IncidentHistory`,
+    so delivery is ordered, survives reconnects (via the cursor) and picks up
+    changes made by other workers on the next heartbeat.
+    """
+
+    def __init__(self) -> None:
+        self._subs: Dict[str, Set[Subscription]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, public_id: Optional[str] = None) -> Subscription:
+        """Subscribe to one incident, or to all of them with `public_id=None`."""
+        sub = Subscription(self, public_id or ALL_INCIDENTS)
+        with self._lock:
+            self._subs.setdefault(sub.key, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            subs = self._subs.get(sub.key)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._subs[sub.key]
+
+    def publish(self, public_id: str) -> None:
+        """Signal that `public_id` changed (safe to call from any thread)."""
+        with self._lock:
+            targets = [
+                *self._subs.get(public_id, ()),
+                *self._subs.get(ALL_INCIDENTS, ()),
+            ]
+        for sub in targets:
+            sub.notify()
+
+
+incident_events = IncidentEventBus()
+
+
+# ---------- Change cursor ----------
+async def latest_cursor(
+    session: AsyncSession, incident_id: Optional[str] = None
+) -> Optional[Cursor]:
+    """(timestamp, id) of the newest history row, or None if there is none."""
+    stmt = select(IncidentHistory.timestamp, IncidentHistory.id)
+    if incident_id is not None:
+        stmt = stmt.where(IncidentHistory.incident_id == incident_id)
+    stmt = stmt.order_by(
+        IncidentHistory.timestamp.desc(), IncidentHistory.id.desc()  # type: ignore[attr-defined]
+    ).limit(1)
+    row = (await session.exec(stmt)).first()
+    return (row[0], row[1]) if row else None
+
+
+def _naive_utc(ts: datetime) -> datetime:
+    # History timestamps come back from the database as naive UTC
+    return ts.astimezone(timezone.utc).replace(tzinfo=None) if ts.tzinfo else ts
+
+
+async def history_since(
+    session: AsyncSession,
+    after: Optional[Cursor],
+    incident_id: Optional[str] = None,
+    limit: int = REPLAY_BATCH,
+) -> List[Tuple[IncidentHistory, str]]:
+    """
+    History rows (with their incident's public_id) past the `after` cursor
+    in (timestamp, id) order, oldest first.
+    """
+    stmt = select(IncidentHistory, Incident.public_id).join(
+        Incident, Incident.id == IncidentHistory.incident_id  # type: ignore[arg-type]
+    )
+    if incident_id is not None:
+        stmt = stmt.where(IncidentHistory.incident_id == incident_id)
+    if after is not None:
+        past = tuple_(*after)  # type: ignore[arg-type]
+        stmt = stmt.where(
+            tuple_(col(IncidentHistory.timestamp), col(IncidentHistory.id)) > past
+        )
+    stmt = stmt.order_by(
+        IncidentHistory.timestamp, IncidentHistory.id  # type: ignore[arg-type]
+    ).limit(limit)
+    return list((await session.exec(stmt)).all())
+
+
+async def history_through(
+    session: AsyncSession,
+    since: datetime,
+    cursor: Cursor,
+    incident_id: Optional[str] = None,
+) -> Dict[str, datetime]:
+    """{id: timestamp} of history rows stamped at or after `since`, up to `cursor`."""
+    upto = tuple_(*cursor)  # type: ignore[arg-type]
+    stmt = select(IncidentHistory.id, IncidentHistory.timestamp).where(
+        IncidentHistory.timestamp >= since,
+        tuple_(col(IncidentHistory.timestamp), col(IncidentHistory.id)) <= upto,
+    )
+    if incident_id is not None:
+        stmt = stmt.where(IncidentHistory.incident_id == incident_id)
+    return dict((await session.exec(stmt)).all())
+
+
+def _frame(hist: IncidentHistory, public_id: str, cursor: Cursor) -> str:
+    data = {
+        "incident_id": public_id,
+        "status": hist.status.value,
+        "note": hist.note,
+        "timestamp": hist.timestamp.isoformat(),
+    }
+    event_id = encode_cursor(*cursor)
+    return f"id: {event_id}\nevent: status\ndata: {json.dumps(data)}\n\n"
+
+
+async def event_stream(
+    session: AsyncSession,
+    public_id: Optional[str] = None,
+    incident_id: Optional[str] = None,
+    after: Optional[Cursor] = None,
+    heartbeat_seconds: Optional[float] = None,
+) -> AsyncIterator[str]:
+    """
+    SSE frames for changes to one incident (`public_id`/`incident_id`) or to
+    all incidents. Starts after `after` if given (a client resuming), else
+    after the newest existing change. Each frame's `id:` is the cursor to
+    resume from. The session is closed between reads, so an idle stream holds
+    no connection.
+
+    History is stamped before its transaction commits, so a row can become
+    visible behind rows already sent. Each read therefore pages through the
+    rows from INCIDENT_EVENTS_OVERLAP_SECONDS behind the cursor onwards, in
+    (timestamp, id) keyset order, and skips those this stream already sent
+    (or, on start, that already existed). The ids sent are kept in memory
+    only, so no query grows with them.
+    """
+    heartbeat = heartbeat_seconds or settings.INCIDENT_EVENTS_HEARTBEAT_SECONDS
+    overlap = timedelta(seconds=settings.INCIDENT_EVENTS_OVERLAP_SECONDS)
+    sub = incident_events.subscribe(public_id)  # before reading, so no change is missed
+    try:
+        cursor = after if after is not None else await latest_cursor(session, incident_id)
+        seen: Dict[str, datetime] = {}
+        if cursor is not None:
+            cursor = (_naive_utc(cursor[0]), cursor[1])
+            seen = await history_through(session, cursor[0] - overlap, cursor, incident_id)
+        while True:
+            # "" sorts before every id, so the page starts at the horizon itself
+            page: Optional[Cursor] = (
+                (cursor[0] - overlap, "") if cursor is not None else None
+            )
+            while True:
+                rows = await history_since(session, page, incident_id, REPLAY_BATCH)
+                await session.close()
+                for hist, pid in rows:
+                    position = (_naive_utc(hist.timestamp), hist.id)
+                    page = position
+                    if hist.id in seen:
+                        continue
+                    seen[hist.id] = hist.timestamp
+                    if cursor is None or position > cursor:
+                        cursor = position
+                    yield _frame(hist, pid, cursor)
+                if len(rows) < REPLAY_BATCH:
+                    break
+            if cursor is not None:
+                horizon = cursor[0] - overlap
+                seen = {
+                    row_id: ts for row_id, ts in seen.items() if _naive_utc(ts) >= horizon
+                }
+            if not await sub.wait(heartbeat):
+                yield ": keepalive\n\n"
+    finally:
+        sub.close()
+        await session.close()
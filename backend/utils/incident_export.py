@@ -0,0 +1,118 @@
+# backend/utils/incident_export.py
+
+import csv
+import io
+import json
+import zlib
+from itertools import groupby
+from typing import Any, Dict, Iterable, Iterator, List, Literal, Sequence
+
+from sqlalchemy import Row
+from sqlalchemy.sql import ColumnElement
+from sqlmodel import Session, col, select
+
+from backend.models import Incident, IncidentHistory
+
+ExportFormat = Literal["ndjson", "csv"]
+
+CSV_COLUMNS = [
+    "incident_id",
+    "title",
+    "description",
+    "category",
+    "priority",
+    "status",
+    "location_text",
+    "contact_email",
+    "created_at",
+    "updated_at",
+    "history",  # JSON list in CSV
+]
+
+
+def export_record(inc: Row, history: List[Row]) -> Dict[str, Any]:
+    return {
+        "incident_id": inc.public_id,
+        "title": inc.title,
+        "description": inc.description,
+        "category": inc.category,
+        "priority": inc.priority,
+        "status": inc.status.value,
+        "location_text": inc.location_text,
+        "contact_email": inc.contact_email,
+        "created_at": inc.created_at.isoformat(),
+        "updated_at": inc.updated_at.isoformat(),
+        "history": [
+            {
+                "status": h.status.value,
+                "note": h.note,
+                "actor_user_id": h.actor_user_id,
+                "timestamp": h.timestamp.isoformat(),
+            }
+            for h in history
+        ],
+    }
+
+
+def iter_export(
+    session: Session,
+    filters: Sequence[ColumnElement[bool]],
+    batch_size: int,
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Batches of export records for the incidents matching `filters`, newest
+    update first. Incidents are read with `yield_per` (a server-side cursor
+    where the driver supports one) and each batch's history is loaded with
+    one IN query, so memory is bounded by `batch_size`. Plain rows are
+    selected, so nothing accumulates in the session's identity map.
+    """
+    stmt = (
+        select(*Incident.__table__.columns)  # type: ignore[attr-defined]
+        .where(*filters)
+        .order_by(Incident.updated_at.desc(), Incident.id.desc())  # type: ignore[attr-defined]
+        .execution_options(yield_per=batch_size)
+    )
+    for incidents in session.exec(stmt).partitions():
+        history = session.exec(
+            select(*IncidentHistory.__table__.columns)  # type: ignore[attr-defined]
+            .where(
+                IncidentHistory.incident_id.in_([inc.id for inc in incidents])  # type: ignore[attr-defined]
+            )
+            .order_by(col(IncidentHistory.incident_id), col(IncidentHistory.timestamp))
+        ).all()
+        by_incident = {
+            incident_id: list(rows)
+            for incident_id, rows in groupby(history, key=lambda h: h.incident_id)
+        }
+        yield [export_record(inc, by_incident.get(inc.id, [])) for inc in incidents]
+
+
+def encode_batches(
+    batches: Iterable[List[Dict[str, Any]]], fmt: ExportFormat
+) -> Iterator[str]:
+    """Serialise record batches as NDJSON or CSV (header first), one chunk per batch."""
+    if fmt == "ndjson":
+        for records in batches:
+            yield "".join(json.dumps(record) + "\n" for record in records)
+        return
+
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=CSV_COLUMNS)
+    writer.writeheader()
+    yield buf.getvalue()
+    for records in batches:
+        buf.seek(0)
+        buf.truncate()
+        for record in records:
+            writer.writerow({**record, "history": json.dumps(record["history"])})
+        yield buf.getvalue()
+
+
+def gzip_chunks(chunks: Iterable[str]) -> Iterator[bytes]:
+    """Gzip a stream of text chunks incrementally."""
+    compressor = zlib.compressobj(wbits=31)  # 31 = gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode())
+        if data:
+            yield data
+    yield compressor.flush()
@@ -0,0 +1,194 @@
+# backend/utils/incident_import.py
+
+import csv
+import json
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Literal, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlmodel import Session
+
+from backend.models import Incident, IncidentHistory, IncidentStatus
+from backend.schemas import IncidentCreate
+from backend.utils.incident_events import incident_events
+from backend.utils.public_ids import incident_ids
+
+ImportFormat = Literal["ndjson", "csv"]
+
+# Per-line errors kept in the report; later ones are only counted
+MAX_REPORTED_ERRORS = 1000
+
+IMPORT_NOTE = "Incident imported"
+
+
+@dataclass
+class ImportReport:
+    imported: int = 0
+    failed: int = 0
+    errors: List[Tuple[int, str]] = field(default_factory=list)  # (line, message)
+
+    def error(self, line: int, message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, message))
+
+
+class _CountedLines:
+    """Iterator over `lines` that counts how many it has handed out."""
+
+    def __init__(self, lines: Iterable[str]) -> None:
+        self._lines = iter(lines)
+        self.count = 0
+
+    def __iter__(self) -> "_CountedLines":
+        return self
+
+    def __next__(self) -> str:
+        line = next(self._lines)
+        self.count += 1
+        return line
+
+
+def iter_records(
+    lines: Iterable[str], fmt: ImportFormat
+) -> Iterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+    """
+    Lazily parse NDJSON or CSV (with a header row) into (line, record, error)
+    triples; exactly one of record and error is set. Blank lines are skipped.
+    A malformed CSV record is reported and parsing resumes after it; only a
+    malformed header ends the parse.
+    """
+    if fmt == "csv":
+        counted = _CountedLines(lines)
+        reader = csv.DictReader(counted)
+        try:
+            if reader.fieldnames is None:  # empty input
+                return
+        except csv.Error as exc:
+            yield counted.count, None, f"invalid CSV header: {exc}"
+            return
+        while True:
+            try:
+                row = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as exc:
+                # line_num is not advanced for a failed record; the count is
+                yield counted.count, None, f"invalid CSV: {exc}"
+                continue
+            # Empty cells mean "not given", not an empty string
+            record = {
+                key: value
+                for key, value in row.items()
+                if key is not None and value not in ("", None)
+            }
+            yield reader.line_num, record, None
+
+    for line_no, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield line_no, None, f"invalid JSON: {exc}"
+            continue
+        if not isinstance(record, dict):
+            yield line_no, None, "expected a JSON object"
+            continue
+        yield line_no, record, None
+
+
+def describe(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}"
+        for err in exc.errors()
+    )
+
+
+def import_incidents(
+    session: Session,
+    lines: Iterable[str],
+    fmt: ImportFormat,
+    batch_size: int,
+    actor_user_id: Optional[str] = None,
+) -> ImportReport:
+    """
+    Validate each record with `IncidentCreate` and insert the valid ones,
+    with their initial history entry, one transaction per `batch_size`
+    records. `lines` is consumed lazily, so memory stays bounded by the
+    batch. A batch the database rejects is rolled back and its lines are
+    reported as failed; earlier batches stay committed.
+    """
+    report = ImportReport()
+    batch: List[Tuple[int, IncidentCreate]] = []
+    for line_no, record, error in iter_records(lines, fmt):
+        if error is not None:
+            report.error(line_no, error)
+            continue
+        try:
+            batch.append((line_no, IncidentCreate.model_validate(record)))
+        except ValidationError as exc:
+            report.error(line_no, describe(exc))
+            continue
+        if len(batch) >= batch_size:
+            _write_batch(session, batch, actor_user_id, report)
+            batch = []
+    if batch:
+        _write_batch(session, batch, actor_user_id, report)
+    return report
+
+
+def _write_batch(
+    session: Session,
+    batch: List[Tuple[int, IncidentCreate]],
+    actor_user_id: Optional[str],
+    report: ImportReport,
+) -> None:
+    now = datetime.now(timezone.utc)
+    incidents: List[Dict[str, Any]] = []
+    history: List[Dict[str, Any]] = []
+    for _, payload in batch:
+        incident_id = str(uuid.uuid4())
+        incidents.append(
+            {
+                "id": incident_id,
+                "public_id": incident_ids.next_id(),
+                "title": payload.title,
+                "description": payload.description,
+                "category": payload.category.value,
+                "location_text": payload.location_text,
+                "contact_email": payload.contact_email,
+                "status": IncidentStatus.new,
+                "created_at": now,
+                "updated_at": now,
+            }
+        )
+        history.append(
+            {
+                "id": str(uuid.uuid4()),
+                "incident_id": incident_id,
+                "status": IncidentStatus.new,
+                "note": IMPORT_NOTE,
+                "actor_user_id": actor_user_id,
+                "timestamp": now,
+            }
+        )
+
+    try:
+        session.exec(insert(Incident), params=incidents)  # type: ignore[call-overload]
+        session.exec(insert(IncidentHistory), params=history)  # type: ignore[call-overload]
+        session.commit()
+    except SQLAlchemyError as exc:
+        session.rollback()
+        message = f"batch rejected by the database: {type(exc).__name__}"
+        for line_no, _ in batch:
+            report.error(line_no, message)
+        return
+
+    report.imported += len(batch)
+    for row in incidents:
+        incident_events.publish(row["public_id"])
@@ -1,14 +1,126 @@
+import asyncio
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
-from typing import Tuple
+import numpy as np
+from numpy.typing import NDArray
+
+from backend.settings import settings
+
+# Example utterances per intent; their mean embedding is the intent centroid
+INTENT_EXAMPLES: Dict[str, List[str]] = {
+    "incident_report": [
+        "I want to report a pothole on my street",
+        "The streetlight outside my house is broken",
+        "There is a water leak on the main road",
+        "Someone dumped garbage in the park",
+        "The drain is blocked and the road is flooding",
+        "There has been no electricity in our area since morning",
+        "I'd like to file a complaint about graffiti",
+    ],
+    "status_check": [
+        "What is the status of my incident?",
+        "Has my report been resolved yet?",
+        "Any update on the issue I reported?",
+        "Can you check on my complaint?",
+        "Is the pothole I reported fixed?",
+        "I want to track my incident ID",
+    ],
+    "general_query": [
+        "When is trash collected in my area?",
+        "How do I apply for a business permit?",
+        "Where can I pay my water bill?",
+        "What are the opening hours of the city office?",
+        "Who do I contact about noise complaints?",
+        "When is the next scheduled water maintenance?",
+        "How do I get a parking permit?",
+    ],
+}
+
+# Inflections a keyword may carry and still count ("reports", "reported", ...)
+_SUFFIXES = r"(?:s|es|d|ed|ing)?"
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """
+    Compile literal words into one regex alternation factored as a trie, so
+    matching cost grows with the message length rather than the word count.
+    """
+    trie: Dict[str, Any] = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def emit(node: Dict[str, Any]) -> str:
+        alts = [
+            re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch
+        ]
+        if not alts:
+            return ""
+        optional = "" in node
+        if len(alts) == 1 and not optional:
+            return alts[0]
+        group = "(?:" + "|".join(alts) + ")"
+        return group + "?" if optional else group
+
+    return emit(trie)
+
+
+class KeywordMatcher:
+    """
+    Counts keyword hits per label in a single pass over a message.
+    Keywords match whole words only ("done" does not match "abandoned").
+    """
+
+    def __init__(self, keywords: Dict[str, Iterable[str]]) -> None:
+        self.labels: List[str] = list(keywords)
+        self._owners: Dict[str, List[str]] = {}
+        for label, words in keywords.items():
+            for word in words:
+                owners = self._owners.setdefault(word.strip().lower(), [])
+                if label not in owners:
+                    owners.append(label)
+        self._owners.pop("", None)
+
+        self.pattern: Optional[re.Pattern[str]] = (
+            re.compile(
+                rf"(?<!\w)({_trie_pattern(self._owners)}){_SUFFIXES}(?!\w)",
+                re.IGNORECASE,
+            )
+            if self._owners
+            else None
+        )
+
+    def count(self, message: str) -> Dict[str, int]:
+        """Return {label: number of keyword hits} for one message."""
+        hits = {label: 0 for label in self.labels}
+        if self.pattern is None:
+            return hits
+        for match in self.pattern.finditer(message):
+            for label in self._owners.get(match.group(1).lower(), ()):
+                hits[label] += 1
+        return hits
 
 
 class IntentClassifier:
     """
     A simple rule-based intent classifier for CivicNavigator.
     Returns an (intent, confidence) tuple.
+
+    Given an `encode` function and a message embedding, it first compares the
+    embedding against per-intent centroids (built from `INTENT_EXAMPLES` by
+    `fit_centroids`: at startup in embedding mode, else on first use in a
+    worker thread) and falls back to the keyword rules when no centroid is
+    similar enough.
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        extra_keywords: Optional[Dict[str, List[str]]] = None,
+        encode: Optional[Callable[[List[str]], NDArray[np.float32]]] = None,
+    ) -> None:
         # Keyword groups for different intents
         self.incident_keywords = [
             "report", "issue", "problem", "broken", "damaged",
@@ -23,25 +135,92 @@ class IntentClassifier:
             "information", "details", "process", "apply"
         ]
 
-    async def classify_intent(self, message: str) -> Tuple[str, float]:
+        # Checked in this order; the first intent with any hit wins
+        self.rules: List[Tuple[str, float, List[str]]] = [
+            ("incident_report", 0.95, self.incident_keywords),
+            ("status_check", 0.95, self.status_keywords),
+            ("general_query", 0.90, self.query_keywords),
+        ]
+        for intent, _, words in self.rules:
+            words.extend((extra_keywords or {}).get(intent, []))
+
+        self.matcher = KeywordMatcher(
+            {intent: words for intent, _, words in self.rules}
+        )
+
+        self.encode = encode
+        self.centroid_intents: List[str] = []
+        self.centroids: Optional[NDArray[np.float32]] = None
+
+    def fit_centroids(
+        self, examples: Dict[str, List[str]] = INTENT_EXAMPLES
+    ) -> None:
+        """Embed the example utterances and keep one unit-length centroid per intent."""
+        if self.encode is None:
+            raise RuntimeError("IntentClassifier has no encode function")
+        intents = [intent for intent, texts in examples.items() if texts]
+        rows: List[NDArray[np.float32]] = []
+        for intent in intents:
+            vecs = np.asarray(self.encode(examples[intent]), dtype=np.float32)
+            vecs /= np.maximum(np.linalg.norm(vecs, axis=1, keepdims=True), 1e-12)
+            rows.append(vecs.mean(axis=0))
+        centroids = np.stack(rows)
+        self.centroids = centroids / np.maximum(
+            np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12
+        )
+        self.centroid_intents = intents
+
+    def centroid_intent(self, query_vec: NDArray[np.float32]) -> Tuple[str, float]:
+        """Nearest intent centroid to a message embedding, with its cosine similarity."""
+        if self.centroids is None:
+            raise RuntimeError("call fit_centroids first")
+        vec = np.asarray(query_vec, dtype=np.float32).ravel()
+        norm = float(np.linalg.norm(vec))
+        if norm == 0.0:
+            return "unknown", 0.0
+        sims = self.centroids @ (vec / norm)
+        best = int(np.argmax(sims))
+        return self.centroid_intents[best], float(sims[best])
+
+    def keyword_intent(self, message: str) -> Tuple[str, float]:
+        """Synchronous core of `classify_intent`."""
+        hits = self.matcher.count(message)
+        for intent, confidence, _ in self.rules:
+            if hits[intent]:
+                return intent, confidence
+        return "unknown", 0.50
+
+    async def classify_intent(
+        self, message: str, query_vec: Optional[NDArray[np.float32]] = None
+    ) -> Tuple[str, float]:
         """
         Classify the intent of a user message.
 
         Args:
             message (str): The user input message.
+            query_vec (Optional[NDArray]): The message embedding, if already
+                computed; enables centroid matching without another model call.
 
         Returns:
             Tuple[str, float]: (intent, confidence score)
         """
-        message_lower = message.lower()
+        if query_vec is not None and self.encode is not None:
+            if self.centroids is None:
+                # Encoding every example takes a while; keep it off the event loop
+                await asyncio.to_thread(self.fit_centroids)
+            intent, similarity = self.centroid_intent(query_vec)
+            if similarity >= settings.INTENT_MIN_SIMILARITY:
+                return intent, similarity
+        return self.keyword_intent(message)
 
-        if any(word in message_lower for word in self.incident_keywords):
-            return "incident_report", 0.95
-
-        elif any(word in message_lower for word in self.status_keywords):
-            return "status_check", 0.95
+    async def classify_many(self, messages: List[str]) -> List[Tuple[str, float]]:
+        """
+        Classify a batch of messages.
 
-        elif any(word in message_lower for word in self.query_keywords):
-            return "general_query", 0.90
+        Args:
+            messages (List[str]): The user input messages.
 
-        return "unknown", 0.50
+        Returns:
+            List[Tuple[str, float]]: (intent, confidence score) per message, in order
+        """
+        return [self.keyword_intent(message) for message in messages]
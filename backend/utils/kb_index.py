@@ -0,0 +1,469 @@
+# backend/utils/kb_index.py
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+from sqlalchemy import event, or_
+from sqlalchemy.orm import Session as OrmSession
+from sqlmodel import Session, col, select
+
+from backend.db import engine
+from backend.models import KBChunk, KBDoc, KBGeneration
+from backend.settings import settings
+
+logger = logging.getLogger("civicnavigator")
+
+# Same cut-off the per-document `score_text` loops use
+MIN_SCORE: float = 0.3
+
+# Rows `keyword_docs` scores in Python after the SQL prefilter
+KEYWORD_CANDIDATES: int = 200
+
+_STOPWORDS = frozenset(
+    "the and for are was were you your what when where which who why how "
+    "can could does did this that with from have has about into there".split()
+)
+
+# Bump whenever the snapshot layout changes; older files are then rebuilt
+SNAPSHOT_FORMAT: int = 2
+
+
+def normalize_rows(mat: NDArray[np.float32]) -> NDArray[np.float32]:
+    """L2-normalize each row; zero rows stay zero."""
+    norms = np.linalg.norm(mat, axis=1, keepdims=True)
+    norms[norms == 0.0] = 1.0
+    out: NDArray[np.float32] = (mat / norms).astype(np.float32, copy=False)
+    return out
+
+
+class PCAProjection:
+    """
+    Linear projection onto the principal axes of the chunk vectors, fitted
+    with a thin SVD.
+
+    `fit` does not center the data (its mean stays zero): for unit vectors,
+    dot products in the reduced space then approximate the original cosines
+    (exactly, for vectors inside the kept subspace), so the same `MIN_SCORE`
+    cut-off applies with or without PCA. Centered scores would shift every
+    similarity and change which documents pass the threshold.
+    """
+
+    def __init__(
+        self, mean: NDArray[np.float32], components: NDArray[np.float32]
+    ) -> None:
+        self.mean = mean.astype(np.float32, copy=False)
+        self.components = components.astype(np.float32, copy=False)  # (k, dim)
+
+    @property
+    def n_components(self) -> int:
+        return int(self.components.shape[0])
+
+    @classmethod
+    def fit(cls, matrix: NDArray[np.float32], n_components: int) -> "PCAProjection":
+        _, _, vt = np.linalg.svd(matrix, full_matrices=False)
+        return cls(np.zeros(matrix.shape[1], dtype=np.float32), vt[:n_components])
+
+    def transform(self, vecs: NDArray[np.float32]) -> NDArray[np.float32]:
+        return ((vecs - self.mean) @ self.components.T).astype(np.float32, copy=False)
+
+
+class KBIndex:
+    """
+    In-memory matrix of KB chunk embeddings.
+
+    Rows are L2-normalized and grouped by document so that one matrix
+    multiplication scores a whole batch of queries, and a `maximum.reduceat`
+    max-pools chunk scores per document (the same "best chunk wins" rule
+    `score_text` applies).
+
+    With `pca_dim` set, a PCA projection is fitted on the chunk vectors when
+    the index is built; chunks are stored, and queries scored, in the reduced
+    space. Projected rows are not re-normalized, so scores stay on the
+    unprojected cosine scale (see `PCAProjection`).
+    """
+
+    def __init__(
+        self,
+        chunk_ids: List[str],
+        chunk_doc_ids: List[str],
+        matrix: NDArray[np.float32],
+        version: str = "",
+        pca_dim: Optional[int] = None,
+    ) -> None:
+        order = sorted(range(len(chunk_ids)), key=lambda i: chunk_doc_ids[i])
+        self.chunk_ids: List[str] = [chunk_ids[i] for i in order]
+        chunk_docs = [chunk_doc_ids[i] for i in order]
+        self.matrix: NDArray[np.float32] = (
+            normalize_rows(np.asarray(matrix, dtype=np.float32)[order])
+            if order
+            else np.zeros((0, 0), dtype=np.float32)
+        )
+        self.version = version
+
+        self.projection: Optional[PCAProjection] = None
+        if pca_dim and len(order) > 1 and pca_dim < self.matrix.shape[1]:
+            self.projection = PCAProjection.fit(self.matrix, pca_dim)
+            self.matrix = self.projection.transform(self.matrix)
+
+        # doc_ids[j] owns the chunk rows doc_starts[j] .. doc_starts[j + 1]
+        self.doc_ids: List[str] = []
+        starts: List[int] = []
+        for row, doc_id in enumerate(chunk_docs):
+            if not self.doc_ids or self.doc_ids[-1] != doc_id:
+                self.doc_ids.append(doc_id)
+                starts.append(row)
+        self.doc_starts: NDArray[np.intp] = np.array(starts, dtype=np.intp)
+
+    @classmethod
+    def from_state(
+        cls,
+        chunk_ids: List[str],
+        doc_ids: List[str],
+        doc_starts: NDArray[np.intp],
+        matrix: NDArray[np.float32],
+        version: str,
+        projection: Optional[PCAProjection] = None,
+    ) -> "KBIndex":
+        """Rebuild an index from already-prepared arrays (e.g. a snapshot)."""
+        index = cls.__new__(cls)
+        index.chunk_ids = chunk_ids
+        index.doc_ids = doc_ids
+        index.doc_starts = doc_starts.astype(np.intp, copy=False)
+        index.matrix = matrix.astype(np.float32, copy=False)
+        index.version = version
+        index.projection = projection
+        return index
+
+    def __len__(self) -> int:
+        return len(self.chunk_ids)
+
+    @property
+    def dim(self) -> int:
+        return int(self.matrix.shape[1]) if len(self) else 0
+
+    @classmethod
+    def from_rows(
+        cls,
+        rows: Sequence[Tuple[str, str, Optional[str]]],
+        version: str = "",
+        pca_dim: Optional[int] = None,
+    ) -> "KBIndex":
+        """Build from (chunk_id, doc_id, embedding_json) rows, skipping bad embeddings."""
+        chunk_ids: List[str] = []
+        doc_ids: List[str] = []
+        vectors: List[List[float]] = []
+        dim: Optional[int] = None
+        for chunk_id, doc_id, emb_json in rows:
+            if not emb_json:
+                continue
+            try:
+                vec = json.loads(emb_json)
+            except (TypeError, ValueError):
+                continue
+            if dim is None:
+                dim = len(vec)
+            if len(vec) != dim:
+                continue
+            chunk_ids.append(chunk_id)
+            doc_ids.append(doc_id)
+            vectors.append(vec)
+
+        matrix = np.array(vectors, dtype=np.float32).reshape(len(vectors), dim or 0)
+        return cls(chunk_ids, doc_ids, matrix, version=version, pca_dim=pca_dim)
+
+    @classmethod
+    def build(
+        cls,
+        session: Session,
+        version: Optional[str] = None,
+        pca_dim: Optional[int] = None,
+    ) -> "KBIndex":
+        """Load every embedded `KBChunk` row into a fresh index."""
+        rows = session.exec(
+            select(KBChunk.id, KBChunk.doc_id, KBChunk.embedding).where(
+                KBChunk.embedding.is_not(None)  # type: ignore[union-attr]
+            )
+        ).all()
+        return cls.from_rows(
+            rows,
+            version=version if version is not None else kb_version(session),
+            pca_dim=pca_dim,
+        )
+
+    def search_many(
+        self,
+        query_vecs: NDArray[np.float32],
+        top_k: int = 10,
+        min_score: float = MIN_SCORE,
+    ) -> List[List[Tuple[str, float]]]:
+        """
+        Score a (Q, dim) batch of query vectors against every chunk at once.
+        Returns, per query, up to `top_k` (doc_id, score) pairs above `min_score`.
+        """
+        queries = np.atleast_2d(np.asarray(query_vecs, dtype=np.float32))
+        if not len(self) or queries.shape[0] == 0:
+            return [[] for _ in range(queries.shape[0])]
+
+        queries = normalize_rows(queries)
+        if self.projection is not None:
+            queries = self.projection.transform(queries)
+
+        sims = queries @ self.matrix.T  # (Q, chunks)
+        doc_scores = np.maximum.reduceat(sims, self.doc_starts, axis=1)  # (Q, docs)
+
+        k = min(top_k, doc_scores.shape[1])
+        if k < doc_scores.shape[1]:
+            top = np.argpartition(-doc_scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.tile(np.arange(doc_scores.shape[1]), (doc_scores.shape[0], 1))
+
+        out: List[List[Tuple[str, float]]] = []
+        for qi in range(doc_scores.shape[0]):
+            cols = top[qi][np.argsort(-doc_scores[qi, top[qi]], kind="stable")]
+            out.append(
+                [
+                    (self.doc_ids[c], float(doc_scores[qi, c]))
+                    for c in cols
+                    if doc_scores[qi, c] > min_score
+                ]
+            )
+        return out
+
+
+def kb_version(session: Session) -> str:
+    """
+    The KB generation, which every transaction writing chunks bumps (see
+    `KBGeneration`); a built index is current while its version matches.
+    One primary-key read.
+    """
+    generation = session.exec(
+        select(KBGeneration.generation).where(KBGeneration.id == 1)
+    ).first()
+    return str(generation or 0)
+
+
+# (checked at, version) of the last `kb_version` read, per process
+_checked_version: Optional[Tuple[float, str]] = None
+
+
+def cached_kb_version(session: Session) -> str:
+    """
+    `kb_version`, re-read at most every KB_VERSION_TTL_SECONDS. Chunk writes
+    committed by this process expire it at once; another process's writes
+    show up within the TTL.
+    """
+    global _checked_version
+    checked = _checked_version
+    now = time.monotonic()
+    if checked is not None and now - checked[0] < settings.KB_VERSION_TTL_SECONDS:
+        return checked[1]
+    version = kb_version(session)
+    _checked_version = (now, version)
+    return version
+
+
+@event.listens_for(OrmSession, "after_commit")
+def _expire_checked_version(session: OrmSession) -> None:
+    global _checked_version
+    if session.info.pop("kb_changed", False):
+        _checked_version = None
+
+
+@event.listens_for(OrmSession, "after_rollback")
+def _forget_kb_change(session: OrmSession) -> None:
+    session.info.pop("kb_changed", None)
+
+
+# ---------- Snapshots ----------
+def _snapshot_arrays(index: KBIndex) -> Dict[str, NDArray[np.generic]]:
+    arrays: Dict[str, NDArray[np.generic]] = {
+        "matrix": index.matrix,
+        "doc_starts": index.doc_starts,
+        "chunk_ids": np.array(index.chunk_ids, dtype=np.str_),
+        "doc_ids": np.array(index.doc_ids, dtype=np.str_),
+    }
+    if index.projection is not None:
+        arrays["pca_mean"] = index.projection.mean
+        arrays["pca_components"] = index.projection.components
+    return arrays
+
+
+def _checksum(arrays: Dict[str, NDArray[np.generic]]) -> str:
+    digest = hashlib.sha256()
+    for name in sorted(arrays):
+        digest.update(name.encode())
+        digest.update(np.ascontiguousarray(arrays[name]).tobytes())
+    return digest.hexdigest()
+
+
+def save_snapshot(index: KBIndex, path: str, pca_dim: Optional[int] = None) -> None:
+    """Write the index to a single .npz file (atomically, via a temp file)."""
+    arrays = _snapshot_arrays(index)
+    meta = {
+        "format": SNAPSHOT_FORMAT,
+        "version": index.version,
+        "pca_dim": pca_dim,
+        "checksum": _checksum(arrays),
+    }
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as fh:
+        np.savez(fh, meta=np.array(json.dumps(meta)), **arrays)
+    os.replace(tmp_path, path)
+
+
+def load_snapshot(path: str) -> Optional[Tuple[KBIndex, Dict[str, object]]]:
+    """
+    Load a snapshot written by `save_snapshot`.
+    Returns (index, meta), or None if the file is missing, from another
+    format version, or fails its checksum.
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            arrays = {name: data[name] for name in data.files if name != "meta"}
+    except (OSError, ValueError, KeyError) as exc:
+        logger.warning(f"Unreadable KB index snapshot {path}: {exc}")
+        return None
+
+    if meta.get("format") != SNAPSHOT_FORMAT:
+        return None
+    if meta.get("checksum") != _checksum(arrays):
+        logger.warning(f"KB index snapshot {path} failed its checksum; ignoring")
+        return None
+
+    projection = (
+        PCAProjection(arrays["pca_mean"], arrays["pca_components"])
+        if "pca_components" in arrays
+        else None
+    )
+    index = KBIndex.from_state(
+        chunk_ids=arrays["chunk_ids"].tolist(),
+        doc_ids=arrays["doc_ids"].tolist(),
+        doc_starts=arrays["doc_starts"],
+        matrix=arrays["matrix"],
+        version=str(meta["version"]),
+        projection=projection,
+    )
+    return index, meta
+
+
+def load_or_build_index(session: Session, version: str) -> KBIndex:
+    """
+    Use the on-disk snapshot when it matches the DB's KB version (and the
+    configured PCA dim); otherwise rebuild from `KBChunk` rows and refresh it.
+    """
+    path = settings.KB_SNAPSHOT_PATH
+    if path:
+        loaded = load_snapshot(path)
+        if loaded is not None:
+            index, meta = loaded
+            same_pca = meta.get("pca_dim") == settings.KB_PCA_DIM
+            if index.version == version and same_pca:
+                return index
+
+    index = KBIndex.build(session, version=version, pca_dim=settings.KB_PCA_DIM)
+    if path:
+        try:
+            save_snapshot(index, path, pca_dim=settings.KB_PCA_DIM)
+        except OSError as exc:
+            logger.warning(f"Could not write KB index snapshot {path}: {exc}")
+    return index
+
+
+# ---------- Process-wide index ----------
+_index: Optional[KBIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_kb_index(session: Session) -> KBIndex:
+    """Return the process-wide index, reloading it if the KB has changed."""
+    global _index
+    version = cached_kb_version(session)
+    current = _index
+    if current is not None and current.version == version:
+        return current
+    with _index_lock:
+        if _index is None or _index.version != version:
+            _index = load_or_build_index(session, version)
+        return _index
+
+
+def warm_kb_index() -> None:
+    """Load (or build) the index at startup so the first search doesn't pay for it."""
+    with Session(engine) as session:
+        index = get_kb_index(session)
+    logger.info(f"KB index ready: {len(index)} chunks, version {index.version}")
+
+
+def top_docs(
+    session: Session,
+    query_vecs: NDArray[np.float32],
+    top_k: int = 10,
+    min_score: float = MIN_SCORE,
+) -> List[List[Tuple[KBDoc, float]]]:
+    """
+    Rank KB documents for a batch of query vectors against the process-wide
+    index, loading the matched `KBDoc` rows with one IN query.
+    """
+    ranked = get_kb_index(session).search_many(
+        query_vecs, top_k=top_k, min_score=min_score
+    )
+    doc_ids = {doc_id for hits in ranked for doc_id, _ in hits}
+    docs = (
+        {
+            d.id: d
+            for d in session.exec(
+                select(KBDoc).where(KBDoc.id.in_(doc_ids))  # type: ignore[attr-defined]
+            ).all()
+        }
+        if doc_ids
+        else {}
+    )
+    return [
+        [(docs[doc_id], score) for doc_id, score in hits if doc_id in docs]
+        for hits in ranked
+    ]
+
+
+def query_terms(query: str) -> List[str]:
+    """Distinct lowercase words of a query, minus stopwords and short words."""
+    words = re.findall(r"\w+", query.lower())
+    return list(dict.fromkeys(w for w in words if len(w) > 2 and w not in _STOPWORDS))
+
+
+def keyword_docs(
+    session: Session, query: str, top_k: int = 10
+) -> List[Tuple[KBDoc, float]]:
+    """
+    Keyword-only KB ranking for when the query cannot be embedded: documents
+    whose title or body contains query terms, scored by the fraction of terms
+    they contain.
+    """
+    terms = query_terms(query)
+    if not terms:
+        return []
+    # autoescape: "_" in a term is a literal, not a LIKE wildcard
+    matches = [
+        col(KBDoc.title).icontains(term, autoescape=True)
+        | col(KBDoc.body).icontains(term, autoescape=True)
+        for term in terms
+    ]
+    docs = session.exec(
+        select(KBDoc).where(or_(*matches)).limit(KEYWORD_CANDIDATES)
+    ).all()
+    scored: List[Tuple[KBDoc, float]] = []
+    for doc in docs:
+        text = f"{doc.title} {doc.body}".lower()
+        scored.append((doc, sum(term in text for term in terms) / len(terms)))
+    scored.sort(key=lambda t: t[1], reverse=True)
+    return scored[:top_k]
@@ -0,0 +1,199 @@
+# backend/utils/public_ids.py
+
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, NamedTuple, Optional
+
+from backend.settings import settings
+
+# Crockford base32: no I, L, O or U, so IDs survive being read out or retyped
+ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_DECODE = {ch: i for i, ch in enumerate(ALPHABET)}
+_DECODE.update({"I": 1, "L": 1, "O": 0})
+
+# 31 bits of seconds since EPOCH (until 2092) | 10 bits worker | 14 bits sequence
+EPOCH = int(datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp())
+WORKER_BITS = 10
+SEQUENCE_BITS = 14
+TIME_BITS = 31
+MAX_WORKER_ID = (1 << WORKER_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+BODY_LENGTH = (TIME_BITS + WORKER_BITS + SEQUENCE_BITS) // 5  # 11 symbols
+
+# Check symbol = body mod 29. Crockford's own mod-37 check needs symbols
+# (*~$=) that don't belong in URLs; 29 is the largest prime whose check
+# still catches adjacent transpositions (32 ≡ 1 mod 31, so 31 would not).
+CHECK_MODULUS = 29
+
+# Longest `next_id` waits for the clock (sequence exhausted, or stepped back)
+MAX_WAIT_SECONDS = 2.0
+
+# Worker ids for processes that are not gunicorn workers and have no
+# PUBLIC_ID_WORKER_ID (dev servers, scripts); gunicorn slots stay below them
+UNCONFIGURED_WORKER_IDS = range(768, MAX_WORKER_ID + 1)
+
+
+class PublicIdParts(NamedTuple):
+    issued_at: datetime
+    worker_id: int
+    sequence: int
+
+
+def default_worker_id() -> int:
+    """
+    PUBLIC_ID_WORKER_ID (the host's base, default 0) plus the worker index
+    that gunicorn_conf.py exports to each worker as PUBLIC_ID_WORKER_INDEX;
+    the sum must stay below UNCONFIGURED_WORKER_IDS. Outside gunicorn,
+    PUBLIC_ID_WORKER_ID as given.
+
+    With neither, production raises: such a process (a script, `uvicorn
+    --workers`) could share a live worker's id. Elsewhere the id is derived
+    from the process id within UNCONFIGURED_WORKER_IDS, which no gunicorn
+    worker uses; two such processes can still collide with each other.
+    """
+    index = os.environ.get("PUBLIC_ID_WORKER_INDEX")
+    if index is not None:
+        worker_id = (settings.PUBLIC_ID_WORKER_ID or 0) + int(index)
+        if worker_id >= UNCONFIGURED_WORKER_IDS.start:
+            raise ValueError(
+                f"gunicorn worker id {worker_id} must be below "
+                f"{UNCONFIGURED_WORKER_IDS.start}; lower PUBLIC_ID_WORKER_ID"
+            )
+        return worker_id
+    if settings.PUBLIC_ID_WORKER_ID is not None:
+        return settings.PUBLIC_ID_WORKER_ID
+    if settings.ENV == "production":
+        raise RuntimeError(
+            "PUBLIC_ID_WORKER_ID must be set for processes not started "
+            "through gunicorn_conf.py"
+        )
+    reserved = UNCONFIGURED_WORKER_IDS
+    return reserved.start + os.getpid() % len(reserved)
+
+
+def _encode(value: int, length: int) -> str:
+    out = []
+    for _ in range(length):
+        value, digit = divmod(value, 32)
+        out.append(ALPHABET[digit])
+    return "".join(reversed(out))
+
+
+def _check_worker_id(worker_id: int) -> int:
+    if not 0 <= worker_id <= MAX_WORKER_ID:
+        raise ValueError(f"worker_id must be between 0 and {MAX_WORKER_ID}")
+    return worker_id
+
+
+class PublicIdGenerator:
+    """
+    Incident public IDs that are unique by construction: a seconds
+    timestamp, this worker's id and a per-second sequence, Crockford
+    base32-encoded with a trailing check symbol (12 characters). No lookup
+    is needed; two IDs can only collide if two live processes share a
+    worker id. IDs sort by issue time.
+
+    IDs are never issued for a second the clock has not reached, nor for the
+    second the generator started in, so a replacement process that reuses
+    a worker id cannot repeat its predecessor's IDs. Past MAX_SEQUENCE IDs
+    in one second, or if the clock steps back, `next_id` waits for the next
+    second (at most MAX_WAIT_SECONDS, then RuntimeError).
+
+    Without an explicit `worker_id`, `default_worker_id` is resolved on
+    first use, so a preloading gunicorn arbiter never needs one.
+    """
+
+    def __init__(
+        self,
+        worker_id: Optional[int] = None,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self._configured_worker_id = worker_id
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._worker_id = self._configured_worker_id
+        if self._worker_id is not None:
+            _check_worker_id(self._worker_id)
+        # The start second counts as used up: a predecessor with this worker
+        # id may have issued IDs in it
+        self._last_second = int(self._clock()) - EPOCH
+        self._sequence = MAX_SEQUENCE
+
+    @property
+    def worker_id(self) -> int:
+        if self._worker_id is None:
+            self._worker_id = _check_worker_id(default_worker_id())
+        return self._worker_id
+
+    def after_fork(self) -> None:
+        """Re-derive the worker id in a forked child (pre-forking servers)."""
+        self._lock = threading.Lock()
+        self._reset()
+
+    def next_id(self) -> str:
+        worker_id = self.worker_id
+        with self._lock:
+            while True:
+                now = self._clock()
+                second = int(now) - EPOCH
+                if second > self._last_second:
+                    self._last_second, self._sequence = second, 0
+                    break
+                if self._sequence < MAX_SEQUENCE:
+                    self._sequence += 1
+                    break
+                wait = self._last_second + 1 + EPOCH - now
+                if wait > MAX_WAIT_SECONDS:
+                    raise RuntimeError(
+                        f"clock is {wait:.1f}s behind the last public ID issued"
+                    )
+                self._sleep(wait)
+            second, sequence = self._last_second, self._sequence
+
+        if not 0 <= second < 1 << TIME_BITS:
+            raise ValueError("clock outside the public ID time range")
+        body = (
+            (second << (WORKER_BITS + SEQUENCE_BITS))
+            | (worker_id << SEQUENCE_BITS)
+            | sequence
+        )
+        return _encode(body, BODY_LENGTH) + ALPHABET[body % CHECK_MODULUS]
+
+
+def parse_public_id(public_id: str) -> PublicIdParts:
+    """
+    Decode an ID from `PublicIdGenerator`, accepting lower case, hyphens and
+    the Crockford look-alikes (I/L for 1, O for 0). Raises ValueError if it
+    is malformed or the check symbol does not match.
+    """
+    symbols = public_id.strip().upper().replace("-", "")
+    if len(symbols) != BODY_LENGTH + 1:
+        raise ValueError(f"Invalid public ID: {public_id!r}")
+    body = 0
+    try:
+        for ch in symbols[:-1]:
+            body = body * 32 + _DECODE[ch]
+        check = _DECODE[symbols[-1]]
+    except KeyError:
+        raise ValueError(f"Invalid public ID: {public_id!r}") from None
+    if body % CHECK_MODULUS != check:
+        raise ValueError(f"Public ID check symbol mismatch: {public_id!r}")
+
+    second = body >> (WORKER_BITS + SEQUENCE_BITS)
+    return PublicIdParts(
+        issued_at=datetime.fromtimestamp(EPOCH + second, tz=timezone.utc),
+        worker_id=(body >> SEQUENCE_BITS) & MAX_WORKER_ID,
+        sequence=body & MAX_SEQUENCE,
+    )
+
+
+incident_ids = PublicIdGenerator()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=incident_ids.after_fork)
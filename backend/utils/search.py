@@ -47,6 +47,21 @@ def score_text(query: str, embeddings_json: List[Optional[str]]) -> float:
     return max_score
 
 
+def embed_queries(queries: List[str], batch_size: int = 64) -> NDArray[np.float32]:
+    """Encode many queries in a single batched model call, one row per query."""
+    if not queries:
+        return np.zeros((0, 0), dtype=np.float32)
+    return np.asarray(
+        _embedder.encode(
+            queries,
+            batch_size=batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=False,
+        ),
+        dtype=np.float32,
+    )
+
+
 def best_snippet(query: str, text: str, window: int = 20) -> str:
     """
     Return a snippet of text around the most relevant word in the KB entry.
@@ -86,3 +86,44 @@ def get_user_role_from_token(token: str, settings: Settings = settings) -> UserR
         return UserRole(role)
     except ValueError:
         raise JWTError(f"Invalid role claim: {role}")
+
+
+# -------------------------
+# Chat flow tokens
+# -------------------------
+FLOW_TOKEN_TYPE = "chat_flow"
+
+
+def create_flow_token(
+    conversation_id: str,
+    session_id: str,
+    pending_intent: str,
+    state: dict[str, Any],
+    settings: Settings = settings,
+) -> str:
+    """
+    Sign the pending state of a multi-turn chat flow, so the client can carry
+    it between turns instead of the conversation row.
+    """
+    return create_access_token(
+        data={
+            "typ": FLOW_TOKEN_TYPE,
+            "cid": conversation_id,
+            "sid": session_id,
+            "pi": pending_intent,
+            "st": state,
+        },
+        settings=settings,
+        expires_delta=timedelta(minutes=settings.CHAT_FLOW_TOKEN_EXPIRE_MINUTES),
+    )
+
+
+def decode_flow_token(token: str, settings: Settings = settings) -> dict[str, Any]:
+    """
+    Decode a chat flow token.
+    Raises JWTError if invalid, expired or not a flow token.
+    """
+    payload = decode_access_token(token, settings=settings)
+    if payload.get("typ") != FLOW_TOKEN_TYPE:
+        raise JWTError("Not a chat flow token")
+    return payload
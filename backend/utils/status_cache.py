@@ -0,0 +1,112 @@
+# backend/utils/status_cache.py
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, NamedTuple, Optional
+
+from backend.metrics import STATUS_CACHE_HITS, STATUS_CACHE_MISSES
+from backend.schemas import IncidentStatusOut
+from backend.settings import settings
+
+
+class CachedStatus(NamedTuple):
+    status: IncidentStatusOut
+    etag: str
+
+
+def status_etag(incident_id: str, updated_at: datetime, history_count: int) -> str:
+    """Strong ETag for an incident's public status; changes with every status write."""
+    raw = f"{incident_id}:{updated_at.isoformat()}:{history_count}"
+    return '"' + hashlib.sha256(raw.encode()).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Whether an If-None-Match header value matches `etag` (or is `*`). Uses
+    the weak comparison RFC 9110 prescribes for If-None-Match, so a `W/`
+    prefix (which proxies may add when they re-encode) is ignored.
+    """
+    if not if_none_match:
+        return False
+    candidates = {_opaque_tag(tag) for tag in if_none_match.split(",")}
+    return "*" in candidates or _opaque_tag(etag) in candidates
+
+
+def _opaque_tag(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+class IncidentStatusCache:
+    """
+    LRU cache of public incident status responses keyed by public_id.
+
+    `update_incident` invalidates an entry after committing; entries also
+    expire `ttl_seconds` after being stored, which bounds staleness for
+    writes made by other workers. A lookup that started before an
+    invalidation is not stored (see `generation`). `max_size=0` disables it.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[str, tuple[float, CachedStatus]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def generation(self) -> int:
+        """Bumped by every invalidation; read it before querying, pass it to `put`."""
+        return self._generation
+
+    def get(self, public_id: str) -> Optional[CachedStatus]:
+        if self.max_size <= 0:
+            return None
+        with self._lock:
+            item = self._entries.get(public_id)
+            if item is not None and self._clock() - item[0] > self.ttl_seconds:
+                del self._entries[public_id]
+                item = None
+            if item is not None:
+                self._entries.move_to_end(public_id)
+        (STATUS_CACHE_HITS if item is not None else STATUS_CACHE_MISSES).inc()
+        return item[1] if item is not None else None
+
+    def put(self, public_id: str, value: CachedStatus, generation: int) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            if generation != self._generation:
+                return  # an update landed while this value was being read
+            self._entries[public_id] = (self._clock(), value)
+            self._entries.move_to_end(public_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, public_id: str) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(public_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+
+status_cache = IncidentStatusCache(
+    max_size=settings.STATUS_CACHE_SIZE,
+    ttl_seconds=settings.STATUS_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,177 @@
+# backend/utils/write_behind.py
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+
+from backend.db import engine
+from backend.metrics import (
+    MESSAGE_FLUSH_FAILURES,
+    MESSAGE_FLUSH_LAG,
+    MESSAGE_FLUSH_SIZE,
+    MESSAGE_QUEUE_DEPTH,
+    MESSAGE_QUEUE_REJECTED,
+    MESSAGE_ROWS_DROPPED,
+)
+from backend.models import Message
+from backend.settings import settings
+
+logger = logging.getLogger("civicnavigator")
+
+
+class MessageWriteBehind:
+    """
+    Buffers `Message` inserts in memory and writes them from a background
+    thread in bulk (one executemany per batch), flushing every
+    `flush_interval_ms` or as soon as `max_batch` rows are waiting.
+
+    The queue is bounded: `submit` returns False when it is full (or the
+    writer isn't running) and the caller should insert synchronously.
+
+    A batch that fails with an OperationalError (lock timeout, lost
+    connection) is retried up to `max_attempts` times with exponential
+    backoff; if it still fails, or fails otherwise (e.g. one bad row), its
+    rows are inserted one per transaction and only those that still fail
+    are logged and dropped.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        max_batch: int = 100,
+        flush_interval_ms: int = 50,
+        max_queue: int = 10_000,
+        max_attempts: int = 3,
+        retry_backoff_ms: int = 100,
+    ) -> None:
+        self.engine = engine
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_queue = max_queue
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff_ms / 1000
+        self._buffer: Deque[Tuple[float, Dict[str, Any]]] = deque()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(
+            target=self._run, name="message-write-behind", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Stop the writer after flushing everything still queued."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def submit(self, messages: List[Message]) -> bool:
+        """Queue messages for insertion; False means the caller must write them."""
+        if not self.running:
+            return False
+        with self._cond:
+            if len(self._buffer) + len(messages) > self.max_queue:
+                MESSAGE_QUEUE_REJECTED.inc(len(messages))
+                return False
+            now = time.monotonic()
+            self._buffer.extend((now, m.model_dump()) for m in messages)
+            MESSAGE_QUEUE_DEPTH.set(len(self._buffer))
+            if len(self._buffer) >= self.max_batch:
+                self._cond.notify()
+        return True
+
+    def flush(self) -> int:
+        """Write one batch now; returns the number of queued rows it took."""
+        with self._cond:
+            batch = [
+                self._buffer.popleft()
+                for _ in range(min(self.max_batch, len(self._buffer)))
+            ]
+            MESSAGE_QUEUE_DEPTH.set(len(self._buffer))
+        if not batch:
+            return 0
+
+        written = self._write_batch([row for _, row in batch])
+        done = time.monotonic()
+        MESSAGE_FLUSH_SIZE.observe(written)
+        for queued_at, _ in batch:
+            MESSAGE_FLUSH_LAG.observe(done - queued_at)
+        return len(batch)
+
+    def _write_batch(self, rows: List[Dict[str, Any]]) -> int:
+        """Insert rows, retrying and then going row by row; returns rows written."""
+        for attempt in range(self.max_attempts):
+            try:
+                with self.engine.begin() as conn:
+                    conn.execute(insert(Message), rows)
+                return len(rows)
+            except OperationalError:
+                MESSAGE_FLUSH_FAILURES.inc()
+                logger.warning(
+                    f"Write-behind flush of {len(rows)} messages failed "
+                    f"(attempt {attempt + 1}/{self.max_attempts})",
+                    exc_info=True,
+                )
+                if attempt + 1 < self.max_attempts:
+                    time.sleep(self.retry_backoff * 2**attempt)
+            except Exception:
+                MESSAGE_FLUSH_FAILURES.inc()
+                logger.warning(
+                    f"Write-behind flush of {len(rows)} messages failed", exc_info=True
+                )
+                break
+
+        written = 0
+        for row in rows:
+            try:
+                with self.engine.begin() as conn:
+                    conn.execute(insert(Message), [row])
+                written += 1
+            except Exception:
+                MESSAGE_ROWS_DROPPED.inc()
+                logger.exception(
+                    f"Dropped write-behind message {row.get('id')} "
+                    f"for conversation {row.get('conversation_id')}"
+                )
+        return written
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._stopping or len(self._buffer) >= self.max_batch,
+                    timeout=self.flush_interval,
+                )
+                stopping = self._stopping
+            while self.flush() == self.max_batch:
+                pass  # a full batch may mean more is waiting
+            if stopping:
+                with self._cond:
+                    if not self._buffer:
+                        return
+
+
+message_writer = MessageWriteBehind(
+    engine,
+    max_batch=settings.MESSAGE_WRITE_BEHIND_BATCH,
+    flush_interval_ms=settings.MESSAGE_WRITE_BEHIND_INTERVAL_MS,
+    max_queue=settings.MESSAGE_WRITE_BEHIND_MAX_QUEUE,
+)